@@ -0,0 +1,176 @@
+"""
+Benchmark the text-extraction backends
+
+Reports throughput, peak Python memory and text fidelity (line-level similarity
+to the default backend) for every installed backend, over resources/sow-docs and
+a generated synthetic corpus.
+
+Usage:
+    python benchmark_extractors.py [--docs resources/sow-docs] [--synthetic 5] [--pages 40] [--repeat 3]
+"""
+import argparse
+import difflib
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.app.services.extraction_backends import DEFAULT_BACKENDS, available_backends, get_backend
+
+SAMPLE_PARAGRAPHS = [
+    "The Supplier shall provide the Services described in this Statement of Work.",
+    "Rates may be adjusted annually by CPI, not to exceed three percent (3%).",
+    "Invoices are payable within forty-five (45) days of receipt.",
+    "Either party may terminate this SOW upon thirty (30) days written notice.",
+]
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def _paragraph_xml(text: str) -> str:
+    return f'<w:p><w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+
+
+def make_synthetic_docx(path: Path, pages: int):
+    """Write a DOCX of roughly `pages` pages with section headings and a rate table"""
+    body = []
+    for page in range(pages):
+        body.append(_paragraph_xml(f"Section {page + 1}. Scope of Services"))
+        body.extend(_paragraph_xml(p) for p in SAMPLE_PARAGRAPHS * 6)
+        rows = "".join(
+            f'<w:tr><w:tc>{_paragraph_xml(f"Role {r}")}</w:tc><w:tc>{_paragraph_xml(f"${100 + r}/hr")}</w:tc></w:tr>'
+            for r in range(5)
+        )
+        body.append(f"<w:tbl>{rows}</w:tbl>")
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{"".join(body)}</w:body></w:document>'
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _DOCX_RELS)
+        zf.writestr("word/document.xml", document)
+
+
+def make_synthetic_pdf(path: Path, pages: int) -> bool:
+    """Write a text PDF with reportlab; returns False if reportlab is not installed"""
+    try:
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfgen import canvas
+    except ImportError:
+        return False
+
+    c = canvas.Canvas(str(path), pagesize=letter)
+    for page in range(pages):
+        y = 740
+        c.drawString(72, y, f"Section {page + 1}. Scope of Services")
+        for line in SAMPLE_PARAGRAPHS * 8:
+            y -= 18
+            c.drawString(72, y, line)
+        c.showPage()
+    c.save()
+    return True
+
+
+def build_synthetic_corpus(out_dir: Path, count: int, pages: int):
+    files = []
+    for i in range(count):
+        size = max(1, pages * (i + 1) // count)
+        docx_path = out_dir / f"synthetic_{i}_{size}p.docx"
+        make_synthetic_docx(docx_path, size)
+        files.append(docx_path)
+        pdf_path = out_dir / f"synthetic_{i}_{size}p.pdf"
+        if make_synthetic_pdf(pdf_path, size):
+            files.append(pdf_path)
+    return files
+
+
+def fidelity(reference: str, text: str) -> float:
+    """Line-level similarity ratio between two extractions"""
+    return difflib.SequenceMatcher(None, reference.splitlines(), text.splitlines(), autojunk=False).ratio()
+
+
+def run_backend(name: str, file_type: str, path: Path, repeat: int):
+    backend = get_backend(file_type, name)
+    timings = []
+    text = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = backend.extract(path)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    backend.extract(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return text, min(timings), peak
+
+
+def benchmark(files, repeat: int):
+    print(f"{'file':40} {'backend':12} {'ms':>9} {'MB/s':>8} {'peak MB':>8} {'chars':>9} {'fidelity':>8}")
+    for path in files:
+        file_type = path.suffix.lower().lstrip(".")
+        if file_type not in DEFAULT_BACKENDS:
+            continue
+        size_mb = path.stat().st_size / (1024 * 1024)
+        reference = None
+        names = available_backends(file_type)
+        # Compare every backend against the default one
+        names.sort(key=lambda n: n != DEFAULT_BACKENDS[file_type])
+        for name in names:
+            try:
+                text, seconds, peak = run_backend(name, file_type, path, repeat)
+            except Exception as e:
+                print(f"{path.name[:40]:40} {name:12} failed: {e}")
+                continue
+            if reference is None:
+                reference = text
+            print(
+                f"{path.name[:40]:40} {name:12} {seconds * 1000:9.1f} {size_mb / max(seconds, 1e-9):8.2f} "
+                f"{peak / (1024 * 1024):8.2f} {len(text):9} {fidelity(reference, text):8.3f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark text-extraction backends")
+    parser.add_argument("--docs", default=str(Path(__file__).parent / "resources" / "sow-docs"))
+    parser.add_argument("--synthetic", type=int, default=3, help="Number of synthetic documents per type")
+    parser.add_argument("--pages", type=int, default=40, help="Page count of the largest synthetic document")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for file_type in DEFAULT_BACKENDS:
+        print(f"{file_type} backends installed: {', '.join(available_backends(file_type)) or 'none'}")
+
+    files = sorted(p for p in Path(args.docs).glob("*") if p.suffix.lower() in (".pdf", ".docx"))
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.synthetic:
+            files += build_synthetic_corpus(Path(tmp), args.synthetic, args.pages)
+        benchmark(files, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
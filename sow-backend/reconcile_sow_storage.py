@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Reconcile uploaded_documents with SOW storage
+
+The /sows listing is served from uploaded_documents; this job enumerates the
+uploads container once and reports drift between the two:
+
+  - blobs with no live uploaded_documents row (orphans)
+  - live rows whose blob no longer exists (missing)
+  - rows whose recorded size differs from the blob
+
+Rows are read before storage is listed, so an upload that finishes during the
+listing is never reported as missing. --apply refuses to soft-delete anything
+when the listing is empty but the table is not, or when more than
+--max-missing-fraction of the live rows would be deleted (e.g. a wrong
+LOCAL_STORAGE_DIR or container).
+
+Usage:
+    python reconcile_sow_storage.py          # report only
+    python reconcile_sow_storage.py --apply  # fix sizes and soft-delete rows with missing blobs
+"""
+import argparse
+import os
+import sys
+import psycopg2
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+DEFAULT_MAX_MISSING_FRACTION = 0.1
+
+def reconcile(apply: bool = False, max_missing_fraction: float = DEFAULT_MAX_MISSING_FRACTION):
+    """Compare storage with uploaded_documents and optionally fix the database"""
+
+    # Get database URL from environment
+    db_url = os.getenv('DATABASE_URL')
+
+    if not db_url:
+        print("❌ DATABASE_URL environment variable not set")
+        print("Please set DATABASE_URL in your .env file")
+        return False
+
+    try:
+        from src.app.services.storage_backend import get_storage
+
+        storage = get_storage()
+
+        print(f"🔌 Connecting to database...")
+        conn = psycopg2.connect(db_url)
+        cursor = conn.cursor()
+
+        # Read rows before listing storage so rows inserted by uploads finishing
+        # during the listing are not mistaken for rows with a missing blob
+        cursor.execute("SELECT NOW()")
+        snapshot_at = cursor.fetchone()[0]
+        cursor.execute("SELECT blob_name, file_size_bytes FROM uploaded_documents WHERE is_deleted = FALSE")
+        rows = dict(cursor.fetchall())
+        conn.commit()
+        print(f"  ✓ {len(rows)} live document rows")
+
+        print(f"📦 Listing SOWs in {storage.name} storage...")
+        blobs = {blob['blob_name']: blob['size'] for blob in storage.list_sows(limit=None)}
+        print(f"  ✓ {len(blobs)} blobs")
+
+        orphans = sorted(set(blobs) - set(rows))
+        missing = sorted(set(rows) - set(blobs))
+        size_mismatches = sorted(name for name in set(blobs) & set(rows) if blobs[name] != rows[name])
+
+        print(f"\n🔍 {len(orphans)} blobs without a document row")
+        for name in orphans:
+            print(f"  - {name} ({blobs[name]} bytes)")
+        print(f"🔍 {len(missing)} document rows without a blob")
+        for name in missing:
+            print(f"  - {name}")
+        print(f"🔍 {len(size_mismatches)} size mismatches")
+        for name in size_mismatches:
+            print(f"  - {name}: row {rows[name]} bytes, blob {blobs[name]} bytes")
+
+        refuse_reason = None
+        if rows and not blobs:
+            refuse_reason = "storage listing is empty but uploaded_documents is not"
+        elif rows and len(missing) / len(rows) > max_missing_fraction:
+            refuse_reason = (f"{len(missing)} of {len(rows)} live rows would be soft-deleted "
+                             f"(more than --max-missing-fraction {max_missing_fraction:g})")
+
+        if apply and missing and refuse_reason:
+            print(f"\n❌ Refusing to apply: {refuse_reason}")
+            print("📝 Check the storage configuration (STORAGE_BACKEND, LOCAL_STORAGE_DIR, container)")
+            cursor.close()
+            conn.close()
+            return False
+
+        if apply and (missing or size_mismatches):
+            print("\n⚙️  Applying fixes...")
+            for name in size_mismatches:
+                cursor.execute(
+                    "UPDATE uploaded_documents SET file_size_bytes = %s, updated_at = NOW() WHERE blob_name = %s",
+                    (blobs[name], name)
+                )
+            if missing:
+                cursor.execute("""
+                    UPDATE uploaded_documents
+                    SET is_deleted = TRUE, deleted_at = NOW(), updated_at = NOW()
+                    WHERE blob_name = ANY(%s) AND is_deleted = FALSE AND upload_date < %s
+                """, (missing, snapshot_at))
+            conn.commit()
+            print(f"  ✓ {len(size_mismatches)} sizes updated, {len(missing)} rows soft-deleted")
+        elif orphans or missing or size_mismatches:
+            print("\n📝 Re-run with --apply to fix sizes and soft-delete rows with missing blobs")
+            print("📝 Orphan blobs have no owner and are left for manual review")
+        else:
+            print("\n✅ Storage and uploaded_documents are in sync")
+
+        cursor.close()
+        conn.close()
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Reconciliation failed: {str(e)}")
+        if 'conn' in locals():
+            conn.rollback()
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    try:
+        from dotenv import load_dotenv
+        env_file = project_root / '.env'
+        if env_file.exists():
+            load_dotenv(env_file)
+    except ImportError:
+        pass
+
+    parser = argparse.ArgumentParser(description="Reconcile uploaded_documents with SOW storage")
+    parser.add_argument('--apply', action='store_true', help="fix sizes and soft-delete rows with missing blobs")
+    parser.add_argument('--max-missing-fraction', type=float, default=DEFAULT_MAX_MISSING_FRACTION,
+                        help="refuse --apply if more than this share of live rows would be soft-deleted "
+                             f"(default {DEFAULT_MAX_MISSING_FRACTION})")
+    args = parser.parse_args()
+
+    success = reconcile(apply=args.apply, max_missing_fraction=args.max_missing_fraction)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Run analysis history index migration
+"""
+import os
+import sys
+import psycopg2
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+def run_migration():
+    """Execute the analysis history index migration"""
+
+    # Get database URL from environment
+    db_url = os.getenv('DATABASE_URL')
+
+    if not db_url:
+        print("❌ DATABASE_URL environment variable not set")
+        print("Please set DATABASE_URL in your .env file")
+        return False
+
+    migration_file = Path(__file__).parent / 'src' / 'app' / 'db' / 'migrations' / 'add_analysis_history_indexes.sql'
+
+    if not migration_file.exists():
+        print(f"❌ Migration file not found: {migration_file}")
+        return False
+
+    print("🔄 Running analysis history index migration...")
+    print(f"📄 Migration file: {migration_file}")
+
+    try:
+        with open(migration_file, 'r', encoding='utf-8') as f:
+            migration_sql = f.read()
+
+        print(f"🔌 Connecting to database...")
+        conn = psycopg2.connect(db_url)
+        cursor = conn.cursor()
+
+        print("⚙️  Executing migration...")
+        cursor.execute(migration_sql)
+        conn.commit()
+
+        print("✅ Migration completed successfully!")
+
+        # Verify the changes
+        cursor.execute("""
+            SELECT tablename, indexname
+            FROM pg_indexes
+            WHERE (tablename = 'analysis_results' AND indexname LIKE '%history')
+               OR (tablename = 'uploaded_documents' AND indexname LIKE 'idx_uploaded_documents_unanalysed%')
+            ORDER BY tablename, indexname
+        """)
+        for table_name, index_name in cursor.fetchall():
+            print(f"  ✓ {table_name}.{index_name}")
+
+        cursor.close()
+        conn.close()
+
+        print("\n📝 overall_risk is filled in as analyses complete; earlier results have no risk")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        if 'conn' in locals():
+            conn.rollback()
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    try:
+        from dotenv import load_dotenv
+        env_file = project_root / '.env'
+        if env_file.exists():
+            load_dotenv(env_file)
+    except ImportError:
+        pass
+
+    success = run_migration()
+    sys.exit(0 if success else 1)
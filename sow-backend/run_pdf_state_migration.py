@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Run analysis PDF state migration and backfill PDF state from blob storage
+"""
+import os
+import sys
+import psycopg2
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+def run_migration():
+    """Execute the analysis PDF state migration"""
+
+    # Get database URL from environment
+    db_url = os.getenv('DATABASE_URL')
+
+    if not db_url:
+        print("❌ DATABASE_URL environment variable not set")
+        print("Please set DATABASE_URL in your .env file")
+        return False
+
+    migration_file = Path(__file__).parent / 'src' / 'app' / 'db' / 'migrations' / 'add_analysis_pdf_state.sql'
+
+    if not migration_file.exists():
+        print(f"❌ Migration file not found: {migration_file}")
+        return False
+
+    print("🔄 Running analysis PDF state migration...")
+    print(f"📄 Migration file: {migration_file}")
+
+    try:
+        with open(migration_file, 'r', encoding='utf-8') as f:
+            migration_sql = f.read()
+
+        print(f"🔌 Connecting to database...")
+        conn = psycopg2.connect(db_url)
+        cursor = conn.cursor()
+
+        print("⚙️  Executing migration...")
+        cursor.execute(migration_sql)
+        conn.commit()
+
+        print("✅ Migration completed successfully!")
+
+        # Backfill from a single listing of the PDF container (no per-row HEAD requests)
+        print("\n📦 Backfilling PDF state from blob storage...")
+        from src.app.services.azure_blob_service import PDFS_CONTAINER, get_blob_service
+
+        container_client = get_blob_service().blob_service_client.get_container_client(PDFS_CONTAINER)
+        pdfs = 0
+        updated = 0
+        for blob in container_client.list_blobs():
+            if not blob.name.endswith('.pdf'):
+                continue
+            pdfs += 1
+            result_blob_name = blob.name[:-len('.pdf')] + '.json'
+            cursor.execute("""
+                UPDATE analysis_results
+                SET pdf_blob_name = %s, pdf_size_bytes = %s, pdf_etag = %s,
+                    pdf_generated_at = COALESCE(%s, pdf_generated_at, NOW())
+                WHERE result_blob_name = %s
+            """, (blob.name, blob.size, blob.etag, blob.last_modified, result_blob_name))
+            updated += cursor.rowcount
+        conn.commit()
+
+        print(f"  ✓ {pdfs} PDFs in {PDFS_CONTAINER}, {updated} analysis results updated")
+
+        cursor.close()
+        conn.close()
+
+        print("\n📝 New PDFs are recorded automatically when they are generated")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        if 'conn' in locals():
+            conn.rollback()
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    try:
+        from dotenv import load_dotenv
+        env_file = project_root / '.env'
+        if env_file.exists():
+            load_dotenv(env_file)
+    except ImportError:
+        pass
+
+    success = run_migration()
+    sys.exit(0 if success else 1)
@@ -229,13 +229,9 @@ async def update_profile(
     """
     Update current user's profile information
     """
-    import psycopg2
-    from src.app.db.client import get_db_connection_dict
+    from src.app.db.async_client import execute_query_async
     
     try:
-        conn = get_db_connection_dict()
-        cursor = conn.cursor()
-        
         # Build update query dynamically based on provided fields
         updates = []
         params = []
@@ -277,12 +273,7 @@ async def update_profile(
             RETURNING id, email, full_name, phone, location, bio, job_title, department
         """
         
-        cursor.execute(query, params)
-        updated_user = cursor.fetchone()
-        conn.commit()
-        
-        cursor.close()
-        conn.close()
+        updated_user = await execute_query_async(query, tuple(params), fetch_one=True)
         
         if not updated_user:
             raise HTTPException(status_code=404, detail="User not found")
@@ -308,9 +299,9 @@ async def change_password(
     """
     Change current user's password
     """
-    import psycopg2
     import bcrypt
-    from src.app.db.client import get_db_connection_dict
+    from fastapi.concurrency import run_in_threadpool
+    from src.app.db.async_client import execute_query_async
     
     try:
         # Validate new password
@@ -320,38 +311,34 @@ async def change_password(
         if len(request.new_password) < 8:
             raise HTTPException(status_code=400, detail="Password must be at least 8 characters long")
         
-        conn = get_db_connection_dict()
-        cursor = conn.cursor()
-        
         # Verify current password
-        cursor.execute("SELECT password_hash FROM users WHERE id = %s", (user_id,))
-        result = cursor.fetchone()
+        result = await execute_query_async(
+            "SELECT password_hash FROM users WHERE id = %s", (user_id,), fetch_one=True
+        )
         
         if not result:
-            cursor.close()
-            conn.close()
             raise HTTPException(status_code=404, detail="User not found")
         
         current_hash = result['password_hash']
         
-        # Check current password
-        if not bcrypt.checkpw(request.current_password.encode('utf-8'), current_hash.encode('utf-8')):
-            cursor.close()
-            conn.close()
+        # Check current password (bcrypt is CPU-bound, keep it off the event loop)
+        password_ok = await run_in_threadpool(
+            bcrypt.checkpw, request.current_password.encode('utf-8'), current_hash.encode('utf-8')
+        )
+        if not password_ok:
             raise HTTPException(status_code=400, detail="Current password is incorrect")
         
         # Hash new password
-        new_hash = bcrypt.hashpw(request.new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        new_hash = (await run_in_threadpool(
+            bcrypt.hashpw, request.new_password.encode('utf-8'), bcrypt.gensalt()
+        )).decode('utf-8')
         
         # Update password
-        cursor.execute(
+        await execute_query_async(
             "UPDATE users SET password_hash = %s, updated_at = NOW() WHERE id = %s",
-            (new_hash, user_id)
+            (new_hash, user_id),
+            fetch_all=False
         )
-        conn.commit()
-        
-        cursor.close()
-        conn.close()
         
         logger.info(f"Password changed for user {user_id}")
         
@@ -9,7 +9,7 @@ import logging
 
 from src.app.api.v1.auth import get_current_user
 from src.app.services.auth_service import get_user_permissions
-from src.app.db.client import execute_query
+from src.app.db.async_client import execute_query_async
 
 router = APIRouter()
 
@@ -61,7 +61,7 @@ async def get_countries(
             FROM countries
             ORDER BY country_name
         """
-        countries = execute_query(query)
+        countries = await execute_query_async(query)
         return {"countries": countries}
     except HTTPException:
         raise
@@ -86,7 +86,7 @@ async def create_country(
             VALUES (%s, %s, %s, %s, %s, %s, %s)
             RETURNING id, country_name, iso_code_2, iso_code_3, numeric_code, region, is_active
         """
-        result = execute_query(
+        result = await execute_query_async(
             query,
             (country_data.country_name, country_data.iso_code_2, country_data.iso_code_3,
              country_data.numeric_code, country_data.region, country_data.is_active, current_user),
@@ -119,7 +119,7 @@ async def update_country(
             WHERE id = %s
             RETURNING id, country_name, iso_code_2, iso_code_3, numeric_code, region, is_active
         """
-        result = execute_query(
+        result = await execute_query_async(
             query,
             (country_data.country_name, country_data.iso_code_2, country_data.iso_code_3,
              country_data.numeric_code, country_data.region, country_data.is_active, 
@@ -148,7 +148,7 @@ async def delete_country(
             raise HTTPException(status_code=403, detail="Insufficient permissions")
         
         query = "DELETE FROM countries WHERE id = %s RETURNING id"
-        result = execute_query(query, (country_id,), fetch_one=True)
+        result = await execute_query_async(query, (country_id,), fetch_one=True)
         if not result:
             raise HTTPException(status_code=404, detail="Country not found")
         return {"message": "Country deleted successfully"}
@@ -183,7 +183,7 @@ async def get_categories(
                      c.is_active, c.created_at, c.updated_at, c.created_by, c.modified_by
             ORDER BY c.display_order, c.category_name
         """
-        categories = execute_query(query)
+        categories = await execute_query_async(query)
         return {"categories": categories}
     except HTTPException:
         raise
@@ -208,7 +208,7 @@ async def create_category(
             VALUES (%s, %s, %s, %s, %s, %s)
             RETURNING id, category_name, category_code, description, display_order, is_active
         """
-        result = execute_query(
+        result = await execute_query_async(
             query,
             (category_data.category_name, category_data.category_code, category_data.description,
              category_data.display_order, category_data.is_active, current_user),
@@ -241,7 +241,7 @@ async def update_category(
             WHERE id = %s
             RETURNING id, category_name, category_code, description, display_order, is_active
         """
-        result = execute_query(
+        result = await execute_query_async(
             query,
             (category_data.category_name, category_data.category_code, category_data.description,
              category_data.display_order, category_data.is_active, current_user, category_id),
@@ -269,7 +269,7 @@ async def delete_category(
             raise HTTPException(status_code=403, detail="Insufficient permissions")
         
         query = "DELETE FROM categories WHERE id = %s RETURNING id"
-        result = execute_query(query, (category_id,), fetch_one=True)
+        result = await execute_query_async(query, (category_id,), fetch_one=True)
         if not result:
             raise HTTPException(status_code=404, detail="Category not found")
         return {"message": "Category deleted successfully"}
@@ -303,7 +303,7 @@ async def get_sub_categories(
             JOIN categories c ON sc.category_id = c.id
             ORDER BY c.display_order, sc.display_order, sc.sub_category_name
         """
-        sub_categories = execute_query(query)
+        sub_categories = await execute_query_async(query)
         return {"sub_categories": sub_categories}
     except HTTPException:
         raise
@@ -328,7 +328,7 @@ async def create_sub_category(
             VALUES (%s, %s, %s, %s, %s, %s, %s)
             RETURNING id, category_id, sub_category_name, sub_category_code, description, display_order, is_active
         """
-        result = execute_query(
+        result = await execute_query_async(
             query,
             (sub_category_data.category_id, sub_category_data.sub_category_name, 
              sub_category_data.sub_category_code, sub_category_data.description,
@@ -362,7 +362,7 @@ async def update_sub_category(
             WHERE id = %s
             RETURNING id, category_id, sub_category_name, sub_category_code, description, display_order, is_active
         """
-        result = execute_query(
+        result = await execute_query_async(
             query,
             (sub_category_data.category_id, sub_category_data.sub_category_name,
              sub_category_data.sub_category_code, sub_category_data.description,
@@ -392,7 +392,7 @@ async def delete_sub_category(
             raise HTTPException(status_code=403, detail="Insufficient permissions")
         
         query = "DELETE FROM sub_categories WHERE id = %s RETURNING id"
-        result = execute_query(query, (sub_category_id,), fetch_one=True)
+        result = await execute_query_async(query, (sub_category_id,), fetch_one=True)
         if not result:
             raise HTTPException(status_code=404, detail="Sub-category not found")
         return {"message": "Sub-category deleted successfully"}
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, BackgroundTasks, Request, Response, UploadFile, File, HTTPException, Depends
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from azure.core.exceptions import ResourceNotFoundError
 from src.app.core.config import settings
 from src.app.api.v1.auth import get_current_user
 from src.app.services.auth_service import get_user_permissions
-from src.app.db.client import execute_query
 import subprocess
 import sys
+from datetime import datetime
 from pathlib import Path
 import logging
 import json
@@ -56,6 +57,7 @@ async def get_config():
 
 @router.post("/upload-sow")
 async def upload_sow(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     user_id: int = Depends(get_current_user)
 ):
@@ -65,6 +67,12 @@ async def upload_sow(
     Requires: document.upload permission
     Accepts: PDF, DOCX, TXT files
     Returns: Blob metadata including blob_name for processing
+    
+    The file is streamed to storage in blocks with its SHA-256 computed on the
+    way; files over MAX_UPLOAD_BYTES are rejected with 413.
+    
+    Extraction, section tree and trigger scan are queued as a background task
+    (PREPROCESS_ON_UPLOAD) so analysis only has to run the LLM stage.
     """
     # Check permission
     permissions = get_user_permissions(user_id)
@@ -81,27 +89,28 @@ async def upload_sow(
                 detail=f"Invalid file type. Allowed: {', '.join(allowed_extensions)}"
             )
         
-        # Read file content
-        content = await file.read()
-        
-        if len(content) == 0:
-            raise HTTPException(status_code=400, detail="Empty file")
-        
-        # Upload to Azure Blob Storage
-        from src.app.services.azure_blob_service import AzureBlobService
+        # Stream to Azure Blob Storage in blocks without blocking the event loop
+        from fastapi.concurrency import run_in_threadpool
+        from src.app.services.storage_backend import EmptyUploadError, UploadTooLargeError, get_async_storage
         from src.app.services.file_management_service import FileManagementService
         
-        blob_service = AzureBlobService()
+        blob_service = get_async_storage()
         
-        result = blob_service.upload_sow(
-            file_content=content,
-            filename=file.filename,
-            content_type=file.content_type or "application/octet-stream"
-        )
+        try:
+            result = await blob_service.upload_sow_stream(
+                file,
+                filename=file.filename,
+                content_type=file.content_type or "application/octet-stream"
+            )
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except EmptyUploadError:
+            raise HTTPException(status_code=400, detail="Empty file")
         
         # Create document record in database with user ownership
         file_service = FileManagementService()
-        document_id = file_service.create_document_record(
+        document_id = await run_in_threadpool(
+            file_service.create_document_record,
             blob_name=result['blob_name'],
             original_filename=result['original_filename'],
             file_size_bytes=result['size'],
@@ -111,14 +120,22 @@ async def upload_sow(
             metadata={
                 'upload_method': 'web_ui',
                 'original_content_type': file.content_type
-            }
+            },
+            content_hash=result.get('content_hash')
         )
         
         logging.info(f"Uploaded SOW: {result['blob_name']} by user {user_id}, document_id={document_id}")
         
+        # Pre-process while the user is still on the upload screen
+        from src.app.services.preprocessing_service import preprocess_document, preprocessing_enabled
+        if document_id and preprocessing_enabled():
+            background_tasks.add_task(preprocess_document, result['blob_name'])
+        
         return {
             "message": "SOW uploaded successfully",
             "document_id": document_id,
+            # Record state until the background task picks it up (pending -> processing -> ready/failed)
+            "preprocessing_status": "pending",
             **result
         }
         
@@ -156,18 +173,16 @@ async def process_sow_async(
     
     file_service = FileManagementService()
     
-    # Check if user has access to this document
-    if not file_service.user_can_access_document(user_id, blob_name):
+    # Check access and mark the document as processing in one query
+    document = await file_service.claim_document_for_analysis_async(user_id, blob_name)
+    if not document or not document['can_access']:
         raise HTTPException(
             status_code=403, 
             detail="Permission denied: You can only analyze files you uploaded or have file.view_all permission"
         )
     
-    # Update document status to processing immediately
-    file_service.update_analysis_status(blob_name, 'processing')
-    
-    # Add background task to process the document
-    background_tasks.add_task(_process_sow_background, blob_name, user_id)
+    # Add background task to process the document; it reuses the row instead of looking it up again
+    background_tasks.add_task(_process_sow_background, blob_name, user_id, document)
     
     logging.info(f"Analysis queued for {blob_name} by user {user_id}")
     
@@ -178,20 +193,28 @@ async def process_sow_async(
         "note": "Analysis is running in the background. Check analysis history for results."
     }
 
-def _process_sow_background(blob_name: str, user_id: int):
+def _overall_risk(results: dict) -> str:
+    """Highest overall_risk across the per-prompt analyses of a result"""
+    from src.app.services.escalation_rules import max_risk
+    analyses = (results.get("results") or {}).values()
+    return max_risk(*(analysis.get("overall_risk") for analysis in analyses if isinstance(analysis, dict)))
+
+def _process_sow_background(blob_name: str, user_id: int, document: Optional[dict] = None):
     """Background task to process SOW document"""
     from datetime import datetime
     from src.app.services.sow_processor import SOWProcessor
-    from src.app.services.azure_blob_service import AzureBlobService
+    from src.app.services.storage_backend import get_storage
     from src.app.services.file_management_service import FileManagementService
     
-    blob_service = AzureBlobService()
+    blob_service = get_storage()
     file_service = FileManagementService()
     start_time = datetime.now()
     
     try:
+        doc = document or file_service.get_document_by_blob_name(blob_name)
+        
         processor = SOWProcessor()
-        results = processor.process_sow_from_blob(blob_name)
+        results = processor.process_sow_from_blob(blob_name, doc)
         
         # Add timestamp and processing metadata
         end_time = datetime.now()
@@ -204,15 +227,15 @@ def _process_sow_background(blob_name: str, user_id: int):
         logging.info(f"[BACKGROUND] Analysis results stored: {storage_result['result_blob_name']}")
         
         # Update document status and create analysis result record
-        doc = file_service.get_document_by_blob_name(blob_name)
         if doc:
-            file_service.update_analysis_status(blob_name, 'completed', end_time)
-            file_service.create_analysis_result(
+            file_service.complete_analysis(
                 document_id=doc['id'],
                 result_blob_name=storage_result['result_blob_name'],
                 analyzed_by=user_id,
+                analyzed_at=end_time,
                 analysis_duration_ms=analysis_duration_ms,
-                status='completed' if results.get('status') != 'partial' else 'partial'
+                status='completed' if results.get('status') != 'partial' else 'partial',
+                overall_risk=_overall_risk(results)
             )
         
         logging.info(f"[BACKGROUND] Analysis completed for {blob_name}")
@@ -263,26 +286,24 @@ def process_sow_from_blob(
     
     from datetime import datetime
     from src.app.services.sow_processor import SOWProcessor
-    from src.app.services.azure_blob_service import AzureBlobService
+    from src.app.services.storage_backend import get_storage
     from src.app.services.file_management_service import FileManagementService
     
-    blob_service = AzureBlobService()
+    blob_service = get_storage()
     file_service = FileManagementService()
     start_time = datetime.now()
     
-    # Check if user has access to this document
-    if not file_service.user_can_access_document(user_id, blob_name):
+    # Check access and mark the document as processing in one query
+    doc = file_service.claim_document_for_analysis(user_id, blob_name)
+    if not doc or not doc['can_access']:
         raise HTTPException(
             status_code=403, 
             detail="Permission denied: You can only analyze files you uploaded or have file.view_all permission"
         )
     
-    # Update document status to processing
-    file_service.update_analysis_status(blob_name, 'processing')
-    
     try:
         processor = SOWProcessor()
-        results = processor.process_sow_from_blob(blob_name)
+        results = processor.process_sow_from_blob(blob_name, doc)
         
         # Add timestamp and processing metadata
         end_time = datetime.now()
@@ -297,16 +318,15 @@ def process_sow_from_blob(
             logging.info(f"Analysis results stored: {storage_result['result_blob_name']}")
             
             # Update document status and create analysis result record
-            doc = file_service.get_document_by_blob_name(blob_name)
-            if doc:
-                file_service.update_analysis_status(blob_name, 'completed', end_time)
-                file_service.create_analysis_result(
-                    document_id=doc['id'],
-                    result_blob_name=storage_result['result_blob_name'],
-                    analyzed_by=user_id,
-                    analysis_duration_ms=analysis_duration_ms,
-                    status='completed' if results.get('status') != 'partial' else 'partial'
-                )
+            file_service.complete_analysis(
+                document_id=doc['id'],
+                result_blob_name=storage_result['result_blob_name'],
+                analyzed_by=user_id,
+                analyzed_at=end_time,
+                analysis_duration_ms=analysis_duration_ms,
+                status='completed' if results.get('status') != 'partial' else 'partial',
+                overall_risk=_overall_risk(results)
+            )
             
         except Exception as storage_error:
             logging.error(f"Failed to store analysis results in blob storage: {storage_error}")
@@ -360,6 +380,13 @@ def process_sow_from_blob(
 @router.get("/analysis-history")
 async def get_analysis_history(
     request: Request,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    uploaded_by: Optional[int] = None,
+    risk: Optional[str] = None,
     user_id: int = Depends(get_current_user)
 ):
     """
@@ -368,6 +395,18 @@ async def get_analysis_history(
     Requires: analysis.view permission
     
     Returns only files uploaded by the user, unless user has file.view_all permission
+    
+    Newest first with keyset pagination; pass next_cursor from the response
+    to get the following page.
+    
+    Args:
+        limit: Page size (1-500, default 100)
+        cursor: next_cursor from the previous page
+        status: Filter by analysis status (completed, partial, failed, pending, ...)
+        date_from: Only history on or after this date
+        date_to: Only history before this date
+        uploaded_by: Filter by uploader (requires file.view_all for other users)
+        risk: Filter by overall risk (none, low, medium, high)
     """
     # Check permission
     permissions = get_user_permissions(user_id)
@@ -376,92 +415,28 @@ async def get_analysis_history(
     
     try:
         from src.app.services.file_management_service import FileManagementService
-        from src.app.db.client import get_db_connection_dict
-        import psycopg2
-        from psycopg2.extras import RealDictCursor
         
-        file_service = FileManagementService()
+        if not 1 <= limit <= 500:
+            raise HTTPException(status_code=400, detail="limit must be between 1 and 500")
         
         # Check if user has file.view_all permission
         has_view_all = 'file.view_all' in permissions
+        if not has_view_all:
+            if uploaded_by not in (None, user_id):
+                raise HTTPException(status_code=403, detail="Permission denied: file.view_all required")
+            uploaded_by = user_id
         
         logging.info(f"User {user_id} fetching analysis history (has_view_all={has_view_all})")
         
         # Query database for analysis history with document metadata
-        conn = get_db_connection_dict()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Build query based on permissions
-        if has_view_all:
-            # Manager/Admin: Get all documents with analysis results
-            query = """
-                SELECT 
-                    ud.id as document_id,
-                    ud.blob_name as source_blob,
-                    ud.original_filename,
-                    ud.file_size_bytes,
-                    ud.upload_date,
-                    ud.uploaded_by,
-                    ud.analysis_status,
-                    ud.last_analyzed_at,
-                    u.full_name as uploaded_by_name,
-                    u.email as uploaded_by_email,
-                    ar.id as analysis_id,
-                    ar.result_blob_name,
-                    ar.analyzed_by,
-                    ar.analysis_date,
-                    ar.analysis_duration_ms,
-                    ar.status as analysis_result_status,
-                    ar.error_message,
-                    ar.prompts_executed,
-                    analyzer.full_name as analyzed_by_name
-                FROM uploaded_documents ud
-                LEFT JOIN analysis_results ar ON ud.id = ar.document_id
-                LEFT JOIN users u ON ud.uploaded_by = u.id
-                LEFT JOIN users analyzer ON ar.analyzed_by = analyzer.id
-                WHERE ud.is_deleted = FALSE
-                ORDER BY 
-                    COALESCE(ar.analysis_date, ud.upload_date) DESC
-                LIMIT 100
-            """
-            cursor.execute(query)
-        else:
-            # Analyst/Viewer: Get only own documents
-            query = """
-                SELECT 
-                    ud.id as document_id,
-                    ud.blob_name as source_blob,
-                    ud.original_filename,
-                    ud.file_size_bytes,
-                    ud.upload_date,
-                    ud.uploaded_by,
-                    ud.analysis_status,
-                    ud.last_analyzed_at,
-                    u.full_name as uploaded_by_name,
-                    u.email as uploaded_by_email,
-                    ar.id as analysis_id,
-                    ar.result_blob_name,
-                    ar.analyzed_by,
-                    ar.analysis_date,
-                    ar.analysis_duration_ms,
-                    ar.status as analysis_result_status,
-                    ar.error_message,
-                    ar.prompts_executed,
-                    analyzer.full_name as analyzed_by_name
-                FROM uploaded_documents ud
-                LEFT JOIN analysis_results ar ON ud.id = ar.document_id
-                LEFT JOIN users u ON ud.uploaded_by = u.id
-                LEFT JOIN users analyzer ON ar.analyzed_by = analyzer.id
-                WHERE ud.uploaded_by = %s AND ud.is_deleted = FALSE
-                ORDER BY 
-                    COALESCE(ar.analysis_date, ud.upload_date) DESC
-                LIMIT 100
-            """
-            cursor.execute(query, (user_id,))
-        
-        results = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        try:
+            page = await FileManagementService.get_analysis_history_async(
+                limit=limit, cursor=cursor, uploaded_by=uploaded_by, status=status,
+                date_from=date_from, date_to=date_to, risk=risk
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        results = page["rows"]
         
         # Transform database results to history format
         history = []
@@ -491,6 +466,7 @@ async def get_analysis_history(
                     "has_errors": False,
                     "error_count": 0,
                     "error_message": None,
+                    "overall_risk": None,
                     "analyzed_by_name": None,
                     "pdf_available": False,
                     "pdf_url": None
@@ -521,9 +497,10 @@ async def get_analysis_history(
                 "has_errors": has_errors,
                 "error_count": 1 if has_errors else 0,
                 "error_message": row['error_message'],
+                "overall_risk": row['overall_risk'],
                 "analyzed_by": row['analyzed_by'],
                 "analyzed_by_name": row['analyzed_by_name'],
-                "pdf_available": False,  # Will be lazy loaded or checked per request
+                "pdf_available": row['pdf_generated_at'] is not None,
                 "pdf_url": f"{api_base}/api/v1/analysis-history/{row['result_blob_name']}/download-pdf" if row['result_blob_name'] else None
             }
             
@@ -543,9 +520,12 @@ async def get_analysis_history(
             "success_count": success_count,
             "error_count": error_count,
             "view_mode": "all" if has_view_all else "own",
-            "user_id": user_id
+            "user_id": user_id,
+            "next_cursor": page["next_cursor"]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error fetching analysis history: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -576,15 +556,16 @@ async def generate_analysis_pdf(
         raise HTTPException(status_code=403, detail="Permission denied: analysis.export required")
     logging.info(f"[PDF GENERATE] Starting PDF generation for: {result_blob_name}")
     try:
-        from src.app.services.azure_blob_service import AzureBlobService
+        from fastapi.concurrency import run_in_threadpool
+        from src.app.services.storage_backend import get_async_storage
         from src.app.services.pdf_generator import PDFGenerator
-        import json
+        from src.app.utils.result_codec import decode_result
         
-        blob_service = AzureBlobService()
+        blob_service = get_async_storage()
         
         # Check if PDF already exists
         logging.info(f"[PDF GENERATE] Checking if PDF already exists for: {result_blob_name}")
-        pdf_exists = blob_service.pdf_exists(result_blob_name)
+        pdf_exists = await blob_service.pdf_exists(result_blob_name)
         if pdf_exists:
             logging.info(f"[PDF GENERATE] PDF already exists, returning existing URL")
             api_base = str(request.base_url).rstrip('/')
@@ -599,30 +580,24 @@ async def generate_analysis_pdf(
             }
         
         # Get analysis result data
-        results_container = "sow-analysis-results"
-        blob_client = blob_service.blob_service_client.get_blob_client(
-            container=results_container,
-            blob=result_blob_name
-        )
-        
-        if not blob_client.exists():
+        logging.info(f"[PDF GENERATE] Downloading analysis data from blob storage")
+        content = await blob_service.download_analysis_result(result_blob_name)
+        if content is None:
             logging.error(f"[PDF GENERATE] Analysis result not found: {result_blob_name}")
             raise HTTPException(status_code=404, detail="Analysis result not found")
         
-        logging.info(f"[PDF GENERATE] Downloading analysis data from blob storage")
-        content = blob_client.download_blob().readall()
-        analysis_data = json.loads(content.decode('utf-8'))
+        analysis_data = decode_result(content)
         logging.info(f"[PDF GENERATE] Analysis data loaded, size: {len(content)} bytes")
         
-        # Generate PDF
+        # Generate PDF (CPU-bound, so off the event loop)
         logging.info(f"[PDF GENERATE] Starting PDF generation with PDFGenerator")
         pdf_generator = PDFGenerator()
-        pdf_buffer = pdf_generator.generate_analysis_pdf(analysis_data)
+        pdf_buffer = await run_in_threadpool(pdf_generator.generate_analysis_pdf, analysis_data)
         logging.info(f"[PDF GENERATE] PDF generated, buffer size: {pdf_buffer.getbuffer().nbytes} bytes")
         
         # Upload PDF to blob storage
         logging.info(f"[PDF GENERATE] Uploading PDF to Azure Blob Storage")
-        pdf_info = blob_service.store_analysis_pdf(result_blob_name, pdf_buffer)
+        pdf_info = await blob_service.store_analysis_pdf(result_blob_name, pdf_buffer)
         logging.info(f"[PDF GENERATE] PDF uploaded successfully: {pdf_info['pdf_blob_name']}, size: {pdf_info['size']}")
         
         # Return our API endpoint instead of Azure blob URL
@@ -667,12 +642,11 @@ def get_analysis_pdf_url(
         raise HTTPException(status_code=403, detail="Permission denied: analysis.view required")
     logging.info(f"[PDF URL CHECK] Checking PDF availability for: {result_blob_name}")
     try:
-        from src.app.services.azure_blob_service import AzureBlobService
+        from src.app.services.storage_backend import get_storage
         
-        blob_service = AzureBlobService()
+        blob_service = get_storage()
         pdf_exists = blob_service.pdf_exists(result_blob_name)
         logging.info(f"[PDF URL CHECK] PDF exists: {pdf_exists}")
-        logging.info(f"[PDF URL CHECK] PDF exists: {pdf_exists}")
         
         if pdf_exists:
             # Return our API endpoint instead of Azure blob URL
@@ -696,8 +670,9 @@ def get_analysis_pdf_url(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/analysis-history/{result_blob_name:path}/download-pdf")
-def download_analysis_pdf(
+async def download_analysis_pdf(
     result_blob_name: str,
+    request: Request,
     user_id: int = Depends(get_current_user)
 ):
     """
@@ -705,6 +680,9 @@ def download_analysis_pdf(
     
     Requires: analysis.view permission
     
+    The PDF is streamed from blob storage chunk by chunk. Supports Range
+    (206 Partial Content, for resumed downloads) and If-None-Match (304).
+    
     Args:
         result_blob_name: Name of the result blob
         
@@ -717,46 +695,57 @@ def download_analysis_pdf(
         raise HTTPException(status_code=403, detail="Permission denied: analysis.view required")
     logging.info(f"[PDF DOWNLOAD] Download request received for: {result_blob_name}")
     try:
-        from src.app.services.azure_blob_service import AzureBlobService
+        from src.app.services.storage_backend import get_async_storage, pdf_blob_name_for
+        from src.app.utils.http_ranges import RangeNotSatisfiable, content_range, etag_matches, parse_range_header
         from fastapi.responses import StreamingResponse
-        import io
         
-        blob_service = AzureBlobService()
-        pdfs_container = "sow-analysis-pdfs"
-        base_name = result_blob_name.replace('.json', '')
-        pdf_blob_name = f"{base_name}.pdf"
+        blob_service = get_async_storage()
+        pdf_blob_name = pdf_blob_name_for(result_blob_name)
         
-        logging.info(f"[PDF DOWNLOAD] Looking for PDF: {pdf_blob_name} in container: {pdfs_container}")
-        
-        # Get PDF blob client
-        blob_client = blob_service.blob_service_client.get_blob_client(
-            container=pdfs_container,
-            blob=pdf_blob_name
-        )
-        
-        if not blob_client.exists():
+        properties = await blob_service.get_pdf_properties(result_blob_name)
+        if properties is None:
             logging.error(f"[PDF DOWNLOAD] PDF not found in blob storage: {pdf_blob_name}")
             raise HTTPException(
                 status_code=404, 
                 detail="PDF not found. Generate it first using the generate-pdf endpoint."
             )
         
-        # Download PDF
-        logging.info(f"[PDF DOWNLOAD] Downloading PDF from Azure Blob Storage")
-        pdf_data = blob_client.download_blob().readall()
-        logging.info(f"[PDF DOWNLOAD] PDF downloaded, size: {len(pdf_data)} bytes")
+        size = properties.size
+        etag = properties.etag
+        headers = {
+            "Accept-Ranges": "bytes",
+            "ETag": etag,
+            "Content-Disposition": f"attachment; filename={pdf_blob_name}"
+        }
+        
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            logging.info(f"[PDF DOWNLOAD] Not modified: {pdf_blob_name}")
+            return Response(status_code=304, headers={"ETag": etag})
         
-        logging.info(f"[PDF DOWNLOAD] Creating StreamingResponse with Content-Disposition: attachment; filename={pdf_blob_name}")
-        response = StreamingResponse(
-            io.BytesIO(pdf_data),
+        try:
+            byte_range = parse_range_header(request.headers.get("range"), size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = content_range(start, end, size)
+            headers["Content-Length"] = str(end - start + 1)
+            logging.info(f"[PDF DOWNLOAD] Streaming {pdf_blob_name} bytes {start}-{end} of {size}")
+            return StreamingResponse(
+                blob_service.stream_pdf(result_blob_name, offset=start, length=end - start + 1, etag=etag),
+                status_code=206,
+                media_type="application/pdf",
+                headers=headers
+            )
+        
+        headers["Content-Length"] = str(size)
+        logging.info(f"[PDF DOWNLOAD] Streaming {pdf_blob_name} ({size} bytes)")
+        return StreamingResponse(
+            blob_service.stream_pdf(result_blob_name, etag=etag),
             media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename={pdf_blob_name}",
-                "Content-Length": str(len(pdf_data))
-            }
+            headers=headers
         )
-        logging.info(f"[PDF DOWNLOAD] StreamingResponse created successfully")
-        return response
         
     except HTTPException:
         raise
@@ -786,37 +775,19 @@ def get_analysis_detail(
     if 'analysis.view' not in permissions:
         raise HTTPException(status_code=403, detail="Permission denied: analysis.view required")
     try:
-        from src.app.services.azure_blob_service import AzureBlobService
-        import json
-        
-        blob_service = AzureBlobService()
-        results_container = "sow-analysis-results"
+        from src.app.services.storage_backend import get_storage
         
-        # Get blob client
-        blob_client = blob_service.blob_service_client.get_blob_client(
-            container=results_container,
-            blob=result_blob_name
-        )
+        blob_service = get_storage()
         
-        # Check if blob exists
-        if not blob_client.exists():
+        # One (conditional) download returns content and properties; unchanged
+        # results are served from the local cache without re-parsing
+        entry = blob_service.get_analysis_result(result_blob_name)
+        if entry is None:
             raise HTTPException(status_code=404, detail="Analysis result not found")
         
-        # Download and parse result
-        content = blob_client.download_blob().readall()
-        result_data = json.loads(content.decode('utf-8'))
-        
-        # Get blob properties
-        properties = blob_client.get_blob_properties()
-        
-        # Add metadata
-        result_data["_metadata"] = {
-            "result_blob_name": result_blob_name,
-            "created": properties.creation_time.isoformat() if properties.creation_time else None,
-            "last_modified": properties.last_modified.isoformat() if properties.last_modified else None,
-            "size": properties.size,
-            "url": blob_client.url
-        }
+        # Copy so the cached result is never mutated
+        result_data = dict(entry["data"])
+        result_data["_metadata"] = dict(entry["metadata"])
         
         return result_data
         
@@ -827,24 +798,67 @@ def get_analysis_detail(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/sows")
-def list_sows(limit: int = 100):
+def list_sows(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: str = "upload_date",
+    order: str = "desc",
+    status: Optional[str] = None,
+    content_type: Optional[str] = None,
+    uploaded_by: Optional[int] = None,
+    prefix: Optional[str] = None
+):
     """
-    List all SOW documents in Azure Blob Storage
+    List uploaded SOW documents, newest first by default
+    
+    Served from uploaded_documents with keyset pagination; pass next_cursor
+    from the response to get the following page.
     
     Args:
-        limit: Maximum number of results (default 100)
+        limit: Page size (1-500, default 100)
+        cursor: next_cursor from the previous page
+        sort: upload_date, original_filename or file_size_bytes
+        order: asc or desc
+        status: Filter by analysis status
+        content_type: Filter by MIME type
+        uploaded_by: Filter by uploader user ID
+        prefix: Filter by blob name prefix
     """
     try:
-        from src.app.services.azure_blob_service import AzureBlobService
+        from src.app.services.file_management_service import FileManagementService
         
-        blob_service = AzureBlobService()
-        sows = blob_service.list_sows(limit=limit)
+        if not 1 <= limit <= 500:
+            raise HTTPException(status_code=400, detail="limit must be between 1 and 500")
+        
+        try:
+            page = FileManagementService.list_documents(
+                limit=limit, cursor=cursor, sort=sort, order=order, status=status,
+                content_type=content_type, uploaded_by=uploaded_by, prefix=prefix
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        sows = [{
+            "blob_name": doc["blob_name"],
+            "original_filename": doc["original_filename"],
+            "size": doc["file_size_bytes"],
+            "created": doc["upload_date"].isoformat() if doc["upload_date"] else None,
+            "last_modified": doc["updated_at"].isoformat() if doc["updated_at"] else None,
+            "content_type": doc["content_type"],
+            "uploaded_by": doc["uploaded_by"],
+            "analysis_status": doc["analysis_status"],
+            "preprocessing_status": doc["preprocessing_status"],
+            "metadata": doc["metadata"]
+        } for doc in page["documents"]]
         
         return {
             "sows": sows,
-            "count": len(sows)
+            "count": len(sows),
+            "next_cursor": page["next_cursor"]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error listing SOWs: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -858,9 +872,9 @@ def get_sow_metadata(blob_name: str):
         blob_name: Name of the blob
     """
     try:
-        from src.app.services.azure_blob_service import AzureBlobService
+        from src.app.services.storage_backend import get_storage
         
-        blob_service = AzureBlobService()
+        blob_service = get_storage()
         metadata = blob_service.get_blob_metadata(blob_name)
         
         return metadata
@@ -888,16 +902,18 @@ async def delete_sow(
         raise HTTPException(status_code=403, detail="Permission denied: document.delete required")
     
     try:
-        from src.app.services.azure_blob_service import AzureBlobService
+        from src.app.services.storage_backend import get_async_storage
         
-        blob_service = AzureBlobService()
-        blob_service.delete_sow(blob_name)
+        blob_service = get_async_storage()
+        await blob_service.delete_sow(blob_name)
         
         return {
             "message": "SOW deleted successfully",
             "blob_name": blob_name
         }
         
+    except ResourceNotFoundError:
+        raise HTTPException(status_code=404, detail="SOW not found")
     except Exception as e:
         logging.error(f"Error deleting SOW: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -933,11 +949,11 @@ def process_sows():
     if result.stderr:
         logging.error(f"Script stderr:\n{result.stderr}")
     
-    # Find the latest .json file in output_dir
-    json_files = sorted(output_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
-    if not json_files:
+    # Find the latest .json file in output_dir via the result index
+    from src.app.services.result_index import ResultIndex
+    latest_json = ResultIndex(output_dir).latest()
+    if not latest_json:
         return Response(content="{}", media_type="application/json")
-    latest_json = json_files[0]
     content = latest_json.read_text(encoding="utf-8")
     return Response(content=content, media_type="application/json")
 
@@ -1079,7 +1095,7 @@ async def get_prompts(
             raise HTTPException(status_code=403, detail="Insufficient permissions")
         
         from src.app.services.prompt_service import get_all_prompts
-        prompts = get_all_prompts(clause_id_filter=clause_id)
+        prompts = await get_all_prompts(clause_id_filter=clause_id)
         
         logging.info(f"📋 User {current_user} fetched {len(prompts)} prompts{f' (filtered by clause_id: {clause_id})' if clause_id else ''}")
         
@@ -1126,7 +1142,7 @@ async def get_prompt(
             raise HTTPException(status_code=403, detail="Insufficient permissions")
         
         from src.app.services.prompt_service import get_prompt_by_id
-        prompt = get_prompt_by_id(prompt_id)
+        prompt = await get_prompt_by_id(prompt_id)
         
         if not prompt:
             raise HTTPException(status_code=404, detail="Prompt not found")
@@ -1153,7 +1169,7 @@ async def create_prompt(
             raise HTTPException(status_code=403, detail="Insufficient permissions")
         
         from src.app.services.prompt_service import create_prompt
-        prompt = create_prompt(
+        prompt = await create_prompt(
             clause_id=prompt_data.clause_id,
             name=prompt_data.name,
             prompt_text=prompt_data.prompt_text,
@@ -1190,7 +1206,7 @@ async def update_prompt(
         logging.info(f"📝 Prompt text length: {len(prompt_data.prompt_text)} characters")
         
         from src.app.services.prompt_service import update_prompt
-        prompt = update_prompt(
+        prompt = await update_prompt(
             prompt_id=prompt_id,
             clause_id=prompt_data.clause_id,
             name=prompt_data.name,
@@ -1231,7 +1247,7 @@ async def delete_prompt(
         logging.info(f"🗑️ User {current_user} attempting to delete prompt ID {prompt_id}")
         
         from src.app.services.prompt_service import delete_prompt
-        success = delete_prompt(prompt_id)
+        success = await delete_prompt(prompt_id)
         
         if not success:
             logging.warning(f"⚠️ Prompt {prompt_id} not found for deletion")
@@ -1260,7 +1276,7 @@ async def get_prompt_variables(
             raise HTTPException(status_code=403, detail="Insufficient permissions")
         
         from src.app.services.prompt_service import get_prompt_variables
-        variables = get_prompt_variables(prompt_id)
+        variables = await get_prompt_variables(prompt_id)
         
         return {"variables": variables}
         
@@ -1284,7 +1300,7 @@ async def add_prompt_variable(
             raise HTTPException(status_code=403, detail="Insufficient permissions")
         
         from src.app.services.prompt_service import add_variable
-        variable = add_variable(
+        variable = await add_variable(
             prompt_id=prompt_id,
             variable_name=variable_data.variable_name,
             variable_value=variable_data.variable_value,
@@ -1316,7 +1332,7 @@ async def delete_prompt_variable(
         logging.info(f"🗑️ User {current_user} attempting to delete variable {variable_id} from prompt {prompt_id}")
         
         from src.app.services.prompt_service import delete_variable
-        success = delete_variable(variable_id)
+        success = await delete_variable(variable_id)
         
         if not success:
             logging.warning(f"⚠️ Variable {variable_id} not found for deletion")
@@ -1361,7 +1377,7 @@ async def get_my_documents(
         from src.app.services.file_management_service import FileManagementService
         
         file_service = FileManagementService()
-        documents = file_service.get_user_documents(user_id, include_deleted=False, limit=100)
+        documents = await file_service.get_user_documents_async(user_id, include_deleted=False, limit=100)
         
         has_view_all = 'file.view_all' in permissions
         
@@ -1398,19 +1414,16 @@ async def get_document_info(
         
         file_service = FileManagementService()
         
-        # Check if user can access this document
-        if not file_service.user_can_access_document(user_id, blob_name):
+        # Document row and access decision in one query
+        document = await file_service.get_accessible_document_async(user_id, blob_name)
+        
+        # A missing document is reported as forbidden, as before
+        if not document or not document.pop('can_access'):
             raise HTTPException(
                 status_code=403,
                 detail="Permission denied: You can only view files you uploaded or have file.view_all permission"
             )
         
-        # Get document info
-        document = file_service.get_document_by_blob_name(blob_name)
-        
-        if not document:
-            raise HTTPException(status_code=404, detail="Document not found")
-        
         return {
             "document": document,
             "can_access": True,
@@ -1441,22 +1454,15 @@ async def get_document_stats(
         
         from src.app.services.file_management_service import FileManagementService
         
-        file_service = FileManagementService()
-        documents = file_service.get_user_documents(user_id, include_deleted=False, limit=1000)
-        
-        # Calculate stats
-        total_count = len(documents)
-        total_size = sum(doc['file_size_bytes'] for doc in documents)
-        
-        status_counts = {}
-        for doc in documents:
-            status = doc.get('analysis_status', 'pending')
-            status_counts[status] = status_counts.get(status, 0) + 1
-        
         has_view_all = 'file.view_all' in permissions
         
+        # Counted in SQL (or read from the rollup table), so totals cover every visible document
+        stats = await FileManagementService.get_document_stats_async(None if has_view_all else user_id)
+        total_size = stats["total_size_bytes"]
+        status_counts = stats["status_counts"]
+        
         return {
-            "total_documents": total_count,
+            "total_documents": stats["total_documents"],
             "total_size_bytes": total_size,
             "total_size_mb": round(total_size / (1024 * 1024), 2),
             "status_breakdown": status_counts,
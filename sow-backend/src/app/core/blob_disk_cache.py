@@ -0,0 +1,268 @@
+"""
+Read-through disk cache for blob downloads.
+
+Source SOWs and analysis results are downloaded repeatedly (re-analysis, PDF
+generation, detail views). Downloads go through this cache on local disk:
+
+- Entries are keyed by container + blob name and valid for one ETag; the
+  caller revalidates with a conditional download (If-None-Match), so a warm
+  read costs one 304 round trip and is served from disk
+- Size-bounded: least recently used entries are evicted once the cache
+  exceeds BLOB_CACHE_MAX_BYTES
+- Survives restarts: the index is rebuilt from the cache directory at startup
+- Hit/miss/eviction counters are reported by /health
+
+The index, LRU order and byte budget are per process. Several workers can
+share BLOB_CACHE_DIR (every write is a unique temp file moved into place, and
+startup only clears temp files older than STALE_TEMP_SECONDS), but together
+they may use up to workers x BLOB_CACHE_MAX_BYTES, so size the budget per worker.
+
+Settings:
+    BLOB_CACHE_DIR        cache directory (default resources/cache/blobs)
+    BLOB_CACHE_MAX_BYTES  byte budget (default 2 GB); 0 disables the cache
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Temp files older than this are left over from a crashed process, not an in-progress download
+STALE_TEMP_SECONDS = 3600
+
+
+class BlobDiskCache:
+    """
+    Size-bounded LRU cache of blob content on local disk.
+    
+    Each entry is a data file plus a JSON sidecar (etag, size and caller info
+    such as blob properties), stored under <root>/<key[:2]>/<key>. Writes go to
+    a temp file and are moved into place with os.replace.
+    """
+    
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypassed = 0
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._load()
+    
+    @staticmethod
+    def _key(container: str, blob_name: str) -> str:
+        return hashlib.sha256(f"{container}/{blob_name}".encode("utf-8")).hexdigest()
+    
+    def _data_path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+    
+    def _meta_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+    
+    def _load(self):
+        """Rebuild the index from disk, oldest access first"""
+        # Partial writes from an interrupted process; newer ones may belong to
+        # another worker sharing the directory
+        stale_before = time.time() - STALE_TEMP_SECONDS
+        for temp_path in self.root.glob("*/.tmp-*"):
+            try:
+                if temp_path.stat().st_mtime < stale_before:
+                    temp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+        
+        found = []
+        for meta_path in self.root.glob("*/*.json"):
+            if meta_path.name.startswith(".tmp-"):
+                continue
+            key = meta_path.stem
+            data_path = self._data_path(key)
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                stat = data_path.stat()
+                if stat.st_size != meta["size"]:
+                    raise ValueError("size mismatch")
+            except (OSError, ValueError, KeyError):
+                # Skip entries another worker may be replacing right now; remove old broken ones
+                try:
+                    if meta_path.stat().st_mtime < stale_before:
+                        self._remove_files(key)
+                except OSError:
+                    pass
+                continue
+            found.append((stat.st_mtime, key, meta))
+        
+        for _, key, meta in sorted(found, key=lambda item: item[0]):
+            self._entries[key] = meta
+            self._bytes += meta["size"]
+        with self._lock:
+            self._evict()
+        logger.info(f"Blob disk cache: {len(self._entries)} entries, {self._bytes} bytes in {self.root}")
+    
+    def _remove_files(self, key: str):
+        self._meta_path(key).unlink(missing_ok=True)
+        self._data_path(key).unlink(missing_ok=True)
+    
+    def _drop(self, key: str):
+        """Remove an entry (caller holds the lock)"""
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._bytes -= entry["size"]
+        self._remove_files(key)
+    
+    def _evict(self):
+        """Evict least recently used entries until within budget (caller holds the lock)"""
+        while self._bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._drop(key)
+            self.evictions += 1
+    
+    def etag(self, container: str, blob_name: str) -> Optional[str]:
+        """ETag of the cached copy, to revalidate with a conditional download"""
+        with self._lock:
+            entry = self._entries.get(self._key(container, blob_name))
+            return entry["etag"] if entry else None
+    
+    def open(self, container: str, blob_name: str, etag: str) -> Optional[Tuple[BinaryIO, dict]]:
+        """
+        Open the cached copy if it matches the ETag.
+        
+        Returns:
+            (file positioned at the start, info stored with the entry), or None
+        """
+        key = self._key(container, blob_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry or entry["etag"] != etag:
+                return None
+            try:
+                f = open(self._data_path(key), "rb")
+            except FileNotFoundError:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        
+        # Record the access so LRU order survives a restart
+        try:
+            os.utime(self._data_path(key))
+        except OSError:
+            pass
+        return f, entry["info"]
+    
+    def read(self, container: str, blob_name: str, etag: str) -> Optional[bytes]:
+        """Cached content if it matches the ETag, else None"""
+        hit = self.open(container, blob_name, etag)
+        if hit is None:
+            return None
+        f, _ = hit
+        with f:
+            return f.read()
+    
+    def store(self, container: str, blob_name: str, etag: str, size: Optional[int],
+              info: dict, writer: Callable[[BinaryIO], object]) -> Optional[Tuple[BinaryIO, dict]]:
+        """
+        Cache freshly downloaded content.
+        
+        Args:
+            container: Blob container
+            blob_name: Blob name
+            etag: ETag of the downloaded content
+            size: Expected size in bytes, if known (blobs over the budget are not cached)
+            info: JSON-serialisable details returned with later hits (e.g. blob properties)
+            writer: Writes the content into the given file (e.g. downloader.readinto)
+        
+        Returns:
+            (cached file positioned at the start, info), or None if the blob is
+            too large to cache; the caller then downloads it without the cache
+        """
+        with self._lock:
+            self.misses += 1
+            if size is not None and size > self.max_bytes:
+                self.bypassed += 1
+                return None
+        
+        key = self._key(container, blob_name)
+        data_path = self._data_path(key)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=data_path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                writer(f)
+            actual_size = os.path.getsize(temp_name)
+            meta = {"container": container, "blob_name": blob_name, "etag": etag,
+                    "size": actual_size, "info": info}
+            
+            with self._lock:
+                self._drop(key)
+                os.replace(temp_name, data_path)
+                meta_fd, meta_temp = tempfile.mkstemp(dir=data_path.parent, prefix=".tmp-", suffix=".json")
+                with os.fdopen(meta_fd, "w", encoding="utf-8") as meta_file:
+                    json.dump(meta, meta_file)
+                os.replace(meta_temp, self._meta_path(key))
+                self._entries[key] = meta
+                self._bytes += actual_size
+                f = open(data_path, "rb")
+                self._evict()
+            return f, info
+        
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+    
+    def invalidate(self, container: str, blob_name: str):
+        with self._lock:
+            self._drop(self._key(container, blob_name))
+    
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "bypassed": self.bypassed
+            }
+
+
+_cache: Optional[BlobDiskCache] = None
+_cache_loaded = False
+_cache_lock = threading.Lock()
+
+
+def get_blob_disk_cache() -> Optional[BlobDiskCache]:
+    """Shared BlobDiskCache for this process, or None if BLOB_CACHE_MAX_BYTES is 0"""
+    global _cache, _cache_loaded
+    if not _cache_loaded:
+        with _cache_lock:
+            if not _cache_loaded:
+                max_bytes = int(os.getenv("BLOB_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+                if max_bytes > 0:
+                    default_dir = Path(__file__).resolve().parents[3] / "resources" / "cache" / "blobs"
+                    try:
+                        _cache = BlobDiskCache(os.getenv("BLOB_CACHE_DIR", str(default_dir)), max_bytes)
+                    except OSError as e:
+                        logger.warning(f"Blob disk cache disabled: {e}")
+                _cache_loaded = True
+    return _cache
+
+
+def blob_disk_cache_stats() -> Optional[dict]:
+    """Stats for /health, or None if the cache is disabled or not used yet"""
+    return _cache.stats() if _cache else None
@@ -43,6 +43,7 @@ class InProcessCache:
         "roles": TTLCache(maxsize=200, ttl=1800),         # 30 min, 200 items
         "prompts": TTLCache(maxsize=1000, ttl=3600),      # 1 hour, 1000 items
         "general": TTLCache(maxsize=1000, ttl=300),       # 5 min, 1000 items
+        "analysis_results": TTLCache(maxsize=200, ttl=3600),  # 1 hour, 200 parsed results (ETag-revalidated)
     }
     
     # Thread locks for cache access
@@ -0,0 +1,175 @@
+"""
+Async database client for PostgreSQL connections
+
+Async endpoints use this instead of db/client.py so a query awaits on the
+event loop rather than blocking it. It keeps its own psycopg 3 connection pool
+next to the threaded psycopg2 pool used by sync endpoints and background jobs.
+Queries use the same %s placeholders and return rows as dicts, so SQL can be
+shared between both clients.
+"""
+import asyncio
+import os
+import logging
+from contextlib import asynccontextmanager
+
+from psycopg import AsyncConnection
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from src.app.db.client import get_connection_params
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = asyncio.Lock()
+
+async def get_async_pool():
+    """
+    Shared async connection pool for this process, or None if pooling is disabled
+    
+    Settings: DB_ASYNC_POOL_MIN_SIZE (1) and DB_ASYNC_POOL_MAX_SIZE (10, 0
+    disables pooling); connection lifetime and wait timeout are shared with
+    the sync pool (DB_POOL_MAX_LIFETIME, DB_POOL_TIMEOUT). Broken connections
+    are detected by the pool when they are returned and replaced.
+    """
+    global _pool
+    max_size = int(os.getenv('DB_ASYNC_POOL_MAX_SIZE', 10))
+    if max_size <= 0:
+        return None
+    
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                pool = AsyncConnectionPool(
+                    make_conninfo(**get_connection_params()),
+                    min_size=min(int(os.getenv('DB_ASYNC_POOL_MIN_SIZE', 1)), max_size),
+                    max_size=max_size,
+                    max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', 1800)),
+                    timeout=float(os.getenv('DB_POOL_TIMEOUT', 30)),
+                    kwargs={'row_factory': dict_row},
+                    open=False
+                )
+                await pool.open()
+                _pool = pool
+    return _pool
+
+async def close_async_db_pool():
+    """Close the shared async connection pool (called at shutdown)"""
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            await _pool.close()
+            _pool = None
+
+def async_db_pool_stats():
+    """Pool stats for /health, or None if pooling is disabled or unused"""
+    if _pool is None:
+        return None
+    stats = _pool.get_stats()
+    return {
+        "size": stats.get("pool_size", 0),
+        "idle": stats.get("pool_available", 0),
+        "in_use": stats.get("pool_size", 0) - stats.get("pool_available", 0),
+        "min_size": stats.get("pool_min", _pool.min_size),
+        "max_size": stats.get("pool_max", _pool.max_size),
+        "waiting": stats.get("requests_waiting", 0),
+        "timeouts": stats.get("requests_errors", 0)
+    }
+
+@asynccontextmanager
+async def async_db_connection():
+    """
+    Borrow a pooled async database connection
+    
+    Rows come back as dicts. The connection goes back to the pool when the
+    block exits; as with psycopg connection blocks, an open transaction is
+    committed on a clean exit and rolled back if an exception propagates.
+    
+    Example:
+        async with async_db_connection() as conn:
+            cursor = await conn.execute("SELECT ...", (value,))
+            rows = await cursor.fetchall()
+    """
+    try:
+        pool = await get_async_pool()
+    except Exception as e:
+        logger.error(f"Failed to open async database pool: {e}")
+        raise
+    
+    if pool is None:
+        conninfo = make_conninfo(**get_connection_params())
+        async with await AsyncConnection.connect(conninfo, row_factory=dict_row) as conn:
+            yield conn
+        return
+    
+    async with pool.connection() as conn:
+        yield conn
+
+async def execute_query_async(query: str, params: tuple = None, fetch_one: bool = False, fetch_all: bool = True):
+    """
+    Async counterpart of execute_query()
+    Automatically commits for INSERT/UPDATE/DELETE with RETURNING clause
+    
+    Args:
+        query: SQL query string
+        params: Query parameters (optional)
+        fetch_one: Return single row (default: False)
+        fetch_all: Return all rows (default: True)
+    
+    Returns:
+        Query results as list of dicts or single dict
+    """
+    query_upper = query.strip().upper()
+    is_mutation = any(query_upper.startswith(cmd) for cmd in ['INSERT', 'UPDATE', 'DELETE'])
+    
+    try:
+        async with async_db_connection() as conn:
+            cursor = await conn.execute(query, params)
+            
+            result = None
+            if fetch_one:
+                row = await cursor.fetchone()
+                result = dict(row) if row else None
+            elif fetch_all:
+                result = [dict(row) for row in await cursor.fetchall()]
+            
+            if is_mutation:
+                await conn.commit()
+                logger.debug(f"Committed transaction for mutation query")
+            
+            return result
+    
+    except Exception as e:
+        if is_mutation:
+            logger.error(f"Rolled back transaction due to error")
+        logger.error(f"Async query execution error: {e}")
+        raise
+
+async def execute_update_async(query: str, params: tuple = None, return_id: bool = False):
+    """
+    Async counterpart of execute_update()
+    
+    Args:
+        query: SQL query string
+        params: Query parameters (optional)
+        return_id: Return inserted ID (for INSERT with RETURNING)
+    
+    Returns:
+        Number of affected rows or inserted ID
+    """
+    try:
+        async with async_db_connection() as conn:
+            cursor = await conn.execute(query, params)
+            
+            result = cursor.rowcount
+            if return_id and cursor.description:
+                row = await cursor.fetchone()
+                result = next(iter(row.values())) if row else None
+            
+            await conn.commit()
+            return result
+    
+    except Exception as e:
+        logger.error(f"Async update execution error: {e}")
+        raise
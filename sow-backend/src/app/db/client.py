@@ -3,9 +3,12 @@ Database client for PostgreSQL connections
 """
 import os
 import re
+import threading
+from contextlib import contextmanager
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import logging
+from src.app.db.pool import ConnectionPool, PooledConnection
 
 logger = logging.getLogger(__name__)
 
@@ -43,41 +46,129 @@ def get_connection_params() -> dict:
         return parse_database_url(db_url)
     
     # Fallback to individual environment variables
-    return {
+    params = {
         'host': os.getenv('DB_HOST', 'localhost'),
         'port': int(os.getenv('DB_PORT', 5432)),
         'user': os.getenv('DB_USER', 'postgres'),
         'password': os.getenv('DB_PASSWORD', ''),
         'dbname': os.getenv('DB_NAME', 'sow_analysis')
     }
+    # No sslmode unless DB_SSLMODE is set, so libpq's default ("prefer") applies
+    if os.getenv('DB_SSLMODE'):
+        params['sslmode'] = os.getenv('DB_SSLMODE')
+    return params
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """
+    Shared connection pool for this process, or None if pooling is disabled
+    
+    Settings: DB_POOL_MIN_SIZE (1), DB_POOL_MAX_SIZE (10, 0 disables pooling),
+    DB_POOL_MAX_LIFETIME (1800s), DB_POOL_HEALTH_CHECK_AFTER (30s idle before
+    a connection is pinged) and DB_POOL_TIMEOUT (30s wait for a free connection).
+    """
+    global _pool
+    max_size = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+    if max_size <= 0:
+        return None
+    
+    # A forked worker must not share the parent's sockets
+    if _pool is None or _pool.pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid():
+                params = get_connection_params()
+                _pool = ConnectionPool(
+                    lambda: psycopg2.connect(**params),
+                    min_size=int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+                    max_size=max_size,
+                    max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', 1800)),
+                    health_check_after=float(os.getenv('DB_POOL_HEALTH_CHECK_AFTER', 30)),
+                    timeout=float(os.getenv('DB_POOL_TIMEOUT', 30))
+                )
+    return _pool
+
+def close_db_pool():
+    """Close the shared connection pool (called at shutdown)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+def db_pool_stats():
+    """Pool stats for /health, or None if pooling is disabled or unused"""
+    return _pool.stats() if _pool is not None else None
+
+def _checkout(dict_cursor: bool):
+    pool = get_pool()
+    cursor_factory = RealDictCursor if dict_cursor else None
+    if pool is None:
+        return psycopg2.connect(**get_connection_params(), cursor_factory=cursor_factory)
+    conn = PooledConnection(pool, pool.getconn())
+    conn.cursor_factory = cursor_factory
+    return conn
+
+@contextmanager
+def db_connection(dict_cursor: bool = True):
+    """
+    Borrow a pooled database connection
+    
+    The connection goes back to the pool when the block exits; a transaction
+    left open (no commit) is rolled back, and one interrupted by an exception
+    is rolled back before the exception propagates.
+    
+    Args:
+        dict_cursor: Rows as dicts (RealDictCursor) instead of tuples
+    
+    Example:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT ...")
+    """
+    try:
+        conn = _checkout(dict_cursor)
+    except Exception as e:
+        logger.error(f"Failed to connect to database: {e}")
+        raise
+    
+    try:
+        yield conn
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
 
 def get_db_connection():
     """
-    Get a PostgreSQL database connection
+    Get a PostgreSQL database connection from the pool
+    
+    Prefer db_connection(); a connection from here goes back to the pool on close().
     
     Returns:
         psycopg2.connection: Database connection object
     """
     try:
-        params = get_connection_params()
-        conn = psycopg2.connect(**params)
-        return conn
+        return _checkout(dict_cursor=False)
     except Exception as e:
         logger.error(f"Failed to connect to database: {e}")
         raise
 
 def get_db_connection_dict():
     """
-    Get a PostgreSQL database connection with dict cursor
+    Get a PostgreSQL database connection with dict cursor from the pool
     Returns rows as dictionaries instead of tuples
     
+    Prefer db_connection(); a connection from here goes back to the pool on close().
+    
     Returns:
         psycopg2.connection: Database connection with RealDictCursor
     """
     try:
-        params = get_connection_params()
-        conn = psycopg2.connect(**params, cursor_factory=RealDictCursor)
-        return conn
+        return _checkout(dict_cursor=True)
     except Exception as e:
         logger.error(f"Failed to connect to database: {e}")
         raise
@@ -96,45 +187,36 @@ def execute_query(query: str, params: tuple = None, fetch_one: bool = False, fet
     Returns:
         Query results as list of dicts or single dict
     """
-    conn = None
-    cursor = None
-    
     # Check if this is a mutation query (INSERT, UPDATE, DELETE)
     query_upper = query.strip().upper()
     is_mutation = any(query_upper.startswith(cmd) for cmd in ['INSERT', 'UPDATE', 'DELETE'])
     
     try:
-        conn = get_db_connection_dict()
-        cursor = conn.cursor()
-        
-        cursor.execute(query, params)
-        
-        # Commit if it's a mutation query
-        if is_mutation:
-            conn.commit()
-            logger.debug(f"Committed transaction for mutation query")
-        
-        if fetch_one:
-            result = cursor.fetchone()
-            return dict(result) if result else None
-        
-        if fetch_all:
-            results = cursor.fetchall()
-            return [dict(row) for row in results]
-        
-        return None
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(query, params)
+            
+            # Commit if it's a mutation query
+            if is_mutation:
+                conn.commit()
+                logger.debug(f"Committed transaction for mutation query")
+            
+            if fetch_one:
+                result = cursor.fetchone()
+                return dict(result) if result else None
+            
+            if fetch_all:
+                results = cursor.fetchall()
+                return [dict(row) for row in results]
+            
+            return None
         
     except Exception as e:
-        if conn and is_mutation:
-            conn.rollback()
+        if is_mutation:
             logger.error(f"Rolled back transaction due to error")
         logger.error(f"Query execution error: {e}")
         raise
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 def execute_update(query: str, params: tuple = None, return_id: bool = False):
     """
@@ -148,29 +230,19 @@ def execute_update(query: str, params: tuple = None, return_id: bool = False):
     Returns:
         Number of affected rows or inserted ID
     """
-    conn = None
-    cursor = None
-    
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(query, params)
-        conn.commit()
-        
-        if return_id and cursor.description:
-            result = cursor.fetchone()
-            return result[0] if result else None
-        
-        return cursor.rowcount
+        with db_connection(dict_cursor=False) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(query, params)
+            conn.commit()
+            
+            if return_id and cursor.description:
+                result = cursor.fetchone()
+                return result[0] if result else None
+            
+            return cursor.rowcount
         
     except Exception as e:
-        if conn:
-            conn.rollback()
         logger.error(f"Update execution error: {e}")
         raise
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
\ No newline at end of file
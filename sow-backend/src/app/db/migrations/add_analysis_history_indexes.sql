@@ -0,0 +1,44 @@
+-- ============================================================================
+-- Keyset pagination and filters for /analysis-history
+-- History is read as two branches, analysis results by analysis_date and
+-- never-analysed documents by upload_date, each served by its own index so
+-- every page is a range scan from the previous page's last row
+-- ============================================================================
+
+-- Overall risk of an analysis (none, low, medium, high), set when it completes.
+-- NULL for results stored before this migration.
+ALTER TABLE analysis_results
+    ADD COLUMN IF NOT EXISTS overall_risk VARCHAR(20);
+
+-- Keyset comparisons skip NULL dates, so backfill them and keep them set
+UPDATE analysis_results SET analysis_date = created_at WHERE analysis_date IS NULL;
+UPDATE uploaded_documents SET upload_date = created_at WHERE upload_date IS NULL;
+ALTER TABLE analysis_results ALTER COLUMN analysis_date SET NOT NULL;
+ALTER TABLE uploaded_documents ALTER COLUMN upload_date SET NOT NULL;
+
+-- Analysed branch: newest first, optionally filtered by status or risk,
+-- and per document for uploader-filtered (own files) history
+CREATE INDEX IF NOT EXISTS idx_analysis_results_history
+    ON analysis_results(analysis_date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_analysis_results_status_history
+    ON analysis_results(status, analysis_date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_analysis_results_risk_history
+    ON analysis_results(overall_risk, analysis_date DESC, id DESC) WHERE overall_risk IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_analysis_results_document_history
+    ON analysis_results(document_id, analysis_date DESC, id DESC);
+
+-- Never-analysed branch: live documents without a result, newest upload first
+CREATE INDEX IF NOT EXISTS idx_uploaded_documents_unanalysed
+    ON uploaded_documents(upload_date DESC, id DESC)
+    WHERE is_deleted = FALSE AND last_analyzed_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_uploaded_documents_unanalysed_uploader
+    ON uploaded_documents(uploaded_by, upload_date DESC, id DESC)
+    WHERE is_deleted = FALSE AND last_analyzed_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_uploaded_documents_unanalysed_status
+    ON uploaded_documents((COALESCE(analysis_status, 'pending')), upload_date DESC, id DESC)
+    WHERE is_deleted = FALSE AND last_analyzed_at IS NULL;
+
+-- Superseded by idx_analysis_results_history
+DROP INDEX IF EXISTS idx_analysis_results_date;
+
+COMMENT ON COLUMN analysis_results.overall_risk IS 'Highest overall_risk across the prompts of this analysis';
@@ -0,0 +1,16 @@
+-- ============================================================================
+-- PDF report state on analysis results
+-- Lets PDF availability be read from the database instead of a blob HEAD
+-- request per result
+-- ============================================================================
+
+ALTER TABLE analysis_results
+    ADD COLUMN IF NOT EXISTS pdf_blob_name VARCHAR(500),   -- Blob name in sow-analysis-pdfs
+    ADD COLUMN IF NOT EXISTS pdf_size_bytes BIGINT,        -- PDF size in bytes
+    ADD COLUMN IF NOT EXISTS pdf_etag VARCHAR(100),        -- ETag of the stored PDF
+    ADD COLUMN IF NOT EXISTS pdf_generated_at TIMESTAMP;   -- When the PDF was stored (NULL = not generated)
+
+-- PDF and detail lookups go by result blob name
+CREATE INDEX IF NOT EXISTS idx_analysis_results_result_blob_name ON analysis_results(result_blob_name);
+
+COMMENT ON COLUMN analysis_results.pdf_generated_at IS 'Set by store_analysis_pdf; NULL means no PDF has been generated';
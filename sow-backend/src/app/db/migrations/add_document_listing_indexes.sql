@@ -0,0 +1,22 @@
+-- ============================================================================
+-- Keyset pagination indexes for the /sows document listing
+-- Each sortable column is indexed together with id on live (not deleted)
+-- rows, so every page is an index range scan from the previous page's last row
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_uploaded_documents_live_upload_date
+    ON uploaded_documents(upload_date DESC, id DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_uploaded_documents_live_filename
+    ON uploaded_documents(original_filename, id) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_uploaded_documents_live_size
+    ON uploaded_documents(file_size_bytes, id) WHERE is_deleted = FALSE;
+
+-- Blob name prefix filter (LIKE 'prefix%') independent of the database collation
+CREATE INDEX IF NOT EXISTS idx_uploaded_documents_blob_name_pattern
+    ON uploaded_documents(blob_name varchar_pattern_ops) WHERE is_deleted = FALSE;
+
+-- Filtered listings (status, content type, uploader) in upload order
+CREATE INDEX IF NOT EXISTS idx_uploaded_documents_live_status_date
+    ON uploaded_documents(analysis_status, upload_date DESC, id DESC) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_uploaded_documents_live_uploader_date
+    ON uploaded_documents(uploaded_by, upload_date DESC, id DESC) WHERE is_deleted = FALSE;
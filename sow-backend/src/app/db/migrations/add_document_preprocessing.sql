@@ -0,0 +1,68 @@
+-- ============================================================================
+-- Eager document pre-processing on upload
+-- Tracks extraction/section-tree/trigger-scan state per uploaded document so
+-- analysis only has to run the LLM stage
+-- ============================================================================
+
+ALTER TABLE uploaded_documents
+    ADD COLUMN IF NOT EXISTS preprocessing_status VARCHAR(50) DEFAULT 'pending', -- pending, processing, ready, failed
+    ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64),                           -- SHA-256 of the uploaded file
+    ADD COLUMN IF NOT EXISTS preprocessed_at TIMESTAMP,                          -- When pre-processing finished
+    ADD COLUMN IF NOT EXISTS preprocessing_summary JSONB;                        -- chars, pages, sections, trigger hits
+
+CREATE INDEX IF NOT EXISTS idx_uploaded_documents_content_hash ON uploaded_documents(content_hash);
+
+COMMENT ON COLUMN uploaded_documents.preprocessing_status IS 'Upload-time extraction state: pending, processing, ready, failed';
+COMMENT ON COLUMN uploaded_documents.content_hash IS 'SHA-256 of the file; key of the extraction cache';
+
+-- Return type changes, so the function has to be dropped first
+DROP FUNCTION IF EXISTS get_user_documents(INTEGER);
+
+CREATE OR REPLACE FUNCTION get_user_documents(p_user_id INTEGER)
+RETURNS TABLE (
+    id INTEGER,
+    blob_name VARCHAR(500),
+    original_filename VARCHAR(500),
+    file_size_bytes BIGINT,
+    content_type VARCHAR(100),
+    upload_date TIMESTAMP,
+    uploaded_by INTEGER,
+    analysis_status VARCHAR(50),
+    last_analyzed_at TIMESTAMP,
+    preprocessing_status VARCHAR(50),
+    preprocessed_at TIMESTAMP
+) AS $$
+DECLARE
+    has_view_all_permission BOOLEAN;
+BEGIN
+    -- Check if user has file.view_all permission
+    SELECT user_has_permission(p_user_id, 'file.view_all') INTO has_view_all_permission;
+
+    IF has_view_all_permission THEN
+        -- Return all documents (not deleted)
+        RETURN QUERY
+        SELECT
+            ud.id, ud.blob_name, ud.original_filename, ud.file_size_bytes,
+            ud.content_type, ud.upload_date, ud.uploaded_by,
+            ud.analysis_status, ud.last_analyzed_at,
+            ud.preprocessing_status, ud.preprocessed_at
+        FROM uploaded_documents ud
+        WHERE ud.is_deleted = FALSE
+        ORDER BY ud.upload_date DESC;
+    ELSE
+        -- Return only user's own documents
+        RETURN QUERY
+        SELECT
+            ud.id, ud.blob_name, ud.original_filename, ud.file_size_bytes,
+            ud.content_type, ud.upload_date, ud.uploaded_by,
+            ud.analysis_status, ud.last_analyzed_at,
+            ud.preprocessing_status, ud.preprocessed_at
+        FROM uploaded_documents ud
+        WHERE ud.uploaded_by = p_user_id
+        AND ud.is_deleted = FALSE
+        ORDER BY ud.upload_date DESC;
+    END IF;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+COMMENT ON FUNCTION get_user_documents IS 'Returns documents based on user permissions - own files or all files if has file.view_all';
@@ -0,0 +1,66 @@
+-- ============================================================================
+-- Document stats rollup for /documents/stats
+-- Live document count and size per uploader and analysis status, kept up to
+-- date by a trigger on uploaded_documents so the stats endpoint reads a few
+-- rows instead of aggregating every document. Enabled in the API with
+-- DOCUMENT_STATS_ROLLUP=true. Safe to re-run: the rollup is rebuilt.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS document_stats_rollup (
+    uploaded_by INTEGER NOT NULL,
+    analysis_status VARCHAR(50) NOT NULL,           -- COALESCE(analysis_status, 'pending')
+    document_count BIGINT NOT NULL DEFAULT 0,
+    total_size_bytes BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (uploaded_by, analysis_status)
+);
+
+-- Add a live row's count and size to its bucket (sign = 1) or remove it (sign = -1)
+CREATE OR REPLACE FUNCTION document_stats_rollup_apply(
+    p_uploaded_by INTEGER, p_status VARCHAR, p_size BIGINT, p_sign INTEGER
+) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO document_stats_rollup (uploaded_by, analysis_status, document_count, total_size_bytes)
+    VALUES (p_uploaded_by, COALESCE(p_status, 'pending'), p_sign, p_sign * COALESCE(p_size, 0))
+    ON CONFLICT (uploaded_by, analysis_status) DO UPDATE
+    SET document_count = document_stats_rollup.document_count + EXCLUDED.document_count,
+        total_size_bytes = document_stats_rollup.total_size_bytes + EXCLUDED.total_size_bytes;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Covers upload (INSERT), status changes, soft delete/restore, size fixes and hard deletes
+CREATE OR REPLACE FUNCTION document_stats_rollup_trigger() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND NEW.uploaded_by = OLD.uploaded_by
+       AND COALESCE(NEW.analysis_status, 'pending') = COALESCE(OLD.analysis_status, 'pending')
+       AND NEW.file_size_bytes = OLD.file_size_bytes
+       AND COALESCE(NEW.is_deleted, FALSE) = COALESCE(OLD.is_deleted, FALSE) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND NOT COALESCE(OLD.is_deleted, FALSE) THEN
+        PERFORM document_stats_rollup_apply(OLD.uploaded_by, OLD.analysis_status, OLD.file_size_bytes, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NOT COALESCE(NEW.is_deleted, FALSE) THEN
+        PERFORM document_stats_rollup_apply(NEW.uploaded_by, NEW.analysis_status, NEW.file_size_bytes, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Rebuild the rollup while writes are blocked so no change is missed or counted twice
+LOCK TABLE uploaded_documents IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS trg_document_stats_rollup ON uploaded_documents;
+CREATE TRIGGER trg_document_stats_rollup
+    AFTER INSERT OR UPDATE OR DELETE ON uploaded_documents
+    FOR EACH ROW EXECUTE FUNCTION document_stats_rollup_trigger();
+
+TRUNCATE document_stats_rollup;
+INSERT INTO document_stats_rollup (uploaded_by, analysis_status, document_count, total_size_bytes)
+SELECT uploaded_by, COALESCE(analysis_status, 'pending'), COUNT(*), COALESCE(SUM(file_size_bytes), 0)
+FROM uploaded_documents
+WHERE is_deleted = FALSE
+GROUP BY uploaded_by, COALESCE(analysis_status, 'pending');
+
+COMMENT ON TABLE document_stats_rollup IS 'Live document count and size per uploader and analysis status, maintained by trg_document_stats_rollup';
@@ -0,0 +1,247 @@
+"""
+Thread-safe PostgreSQL connection pool
+
+Connections are opened once and reused across requests instead of paying a
+TCP + TLS + auth handshake per query. The pool keeps between min_size and
+max_size connections, pings connections that have been idle for a while
+before handing them out, and replaces connections older than max_lifetime so
+server-side restarts and failovers are picked up.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(PoolError):
+    """No connection became available within the pool timeout"""
+
+
+class ConnectionPool:
+    """
+    Pool of psycopg2 connections shared by all threads
+
+    Args:
+        connect: Opens a new connection
+        min_size: Connections opened up front and kept idle
+        max_size: Upper bound on open connections; callers wait beyond it
+        max_lifetime: Seconds after which a connection is closed instead of reused
+        health_check_after: Idle seconds after which a connection is pinged before reuse
+        timeout: Seconds to wait for a free connection before PoolTimeout
+    """
+
+    def __init__(self, connect: Callable[[], "extensions.connection"], min_size: int = 1,
+                 max_size: int = 10, max_lifetime: float = 1800, health_check_after: float = 30,
+                 timeout: float = 30):
+        self._connect = connect
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+        self.timeout = timeout
+        self.pid = os.getpid()
+
+        self._idle = deque()     # (connection, last_used), most recently used last
+        self._created = {}       # id(connection) -> creation time
+        self._size = 0           # open connections, idle or checked out
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self.connects = 0
+        self.reused = 0
+        self.discarded = 0
+        self.waits = 0
+        self.timeouts = 0
+
+    def open(self):
+        """Open min_size connections (called at startup)"""
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._new_connection()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                raise
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    def _new_connection(self):
+        conn = self._connect()
+        self._created[id(conn)] = time.monotonic()
+        self.connects += 1
+        return conn
+
+    def _expired(self, conn) -> bool:
+        created = self._created.get(id(conn), 0)
+        return time.monotonic() - created > self.max_lifetime
+
+    def _discard(self, conn):
+        """Close a connection and free its slot"""
+        self._created.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self.discarded += 1
+            self._cond.notify()
+
+    def _healthy(self, conn, last_used: float) -> bool:
+        if conn.closed or self._expired(conn):
+            return False
+        if time.monotonic() - last_used < self.health_check_after:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception as e:
+            logger.info(f"Discarding pooled connection that failed its health check: {e}")
+            return False
+
+    def getconn(self):
+        """
+        Check out a connection, waiting up to timeout seconds if all are in use
+
+        Raises:
+            PoolTimeout: No connection became available in time
+            PoolError: The pool has been closed
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolError("connection pool is closed")
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        conn = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise PoolTimeout(f"no database connection available within {self.timeout}s")
+                    self.waits += 1
+                    self._cond.wait(remaining)
+
+            if conn is None:
+                try:
+                    return self._new_connection()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+
+            if self._healthy(conn, last_used):
+                self.reused += 1
+                return conn
+            self._discard(conn)
+
+    def putconn(self, conn, discard: bool = False):
+        """Return a connection; an open transaction is rolled back first"""
+        if not discard and not conn.closed and not self._expired(conn) and not self._closed:
+            try:
+                if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if conn.autocommit:
+                    conn.autocommit = False
+                conn.cursor_factory = None
+            except Exception:
+                discard = True
+            else:
+                with self._cond:
+                    self._idle.append((conn, time.monotonic()))
+                    self._cond.notify()
+                return
+        self._discard(conn)
+
+    def closeall(self):
+        """Close idle connections and refuse new checkouts (called at shutdown)"""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "connects": self.connects,
+                "reused": self.reused,
+                "discarded": self.discarded,
+                "waits": self.waits,
+                "timeouts": self.timeouts
+            }
+
+
+class PooledConnection:
+    """
+    psycopg2 connection checked out from a ConnectionPool
+
+    Behaves like the underlying connection, except that close() returns it to
+    the pool. Connections that are never closed are returned when the wrapper
+    is garbage collected.
+    """
+
+    def __init__(self, pool: ConnectionPool, conn):
+        self.__dict__["_pool"] = pool
+        self.__dict__["_conn"] = conn
+
+    def __getattr__(self, name):
+        conn = self.__dict__["_conn"]
+        if conn is None:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        return getattr(conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.__dict__["_conn"], name, value)
+
+    @property
+    def closed(self) -> int:
+        conn = self.__dict__["_conn"]
+        return 1 if conn is None else conn.closed
+
+    def close(self, discard: bool = False):
+        conn = self.__dict__["_conn"]
+        if conn is not None:
+            self.__dict__["_conn"] = None
+            self.__dict__["_pool"].putconn(conn, discard=discard)
+
+    def __enter__(self):
+        self.__dict__["_conn"].__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self.__dict__["_conn"].__exit__(exc_type, exc, tb)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -88,21 +88,55 @@ async def startup_event():
     # Pre-load frequently accessed reference data
     InProcessCache.warmup()
     
+    # Open the database pool's minimum connections before the first request
+    try:
+        from .db.client import get_pool
+        pool = get_pool()
+        if pool is not None:
+            pool.open()
+    except Exception as e:
+        logging.warning(f"Database pool not warmed at startup: {e}")
+    
+    # Same for the async pool used by async endpoints
+    try:
+        from .db.async_client import get_async_pool
+        await get_async_pool()
+    except Exception as e:
+        logging.warning(f"Async database pool not opened at startup: {e}")
+    
+    # Verify storage containers once so requests skip the existence round trips
+    try:
+        from .services.storage_backend import get_storage
+        get_storage().verify_containers()
+    except Exception as e:
+        logging.warning(f"Blob storage containers not verified at startup: {e}")
+    
     logging.info("Application startup complete")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Close cache on application shutdown."""
+    """Close cache, storage and database connections and extraction workers on application shutdown."""
     from .core.hybrid_cache import InProcessCache
+    from .db.async_client import close_async_db_pool
+    from .db.client import close_db_pool
+    from .services.storage_backend import close_storage
+    from .services.text_extraction_helpers import shutdown_extraction_pool
     InProcessCache.close()
+    await close_storage()
+    close_db_pool()
+    await close_async_db_pool()
+    shutdown_extraction_pool()
     logging.info("Application shutdown complete")
 
 
 @app.get("/health")
 async def health():
     """Health check endpoint with cache status."""
+    from .core.blob_disk_cache import blob_disk_cache_stats
     from .core.hybrid_cache import cache_stats
+    from .db.async_client import async_db_pool_stats
+    from .db.client import db_pool_stats
     
     stats = cache_stats()
     
@@ -112,5 +146,8 @@ async def health():
         "cache": {
             "type": "in-process",
             "stats": stats
-        }
+        },
+        "blob_disk_cache": blob_disk_cache_stats(),
+        "db_pool": db_pool_stats(),
+        "async_db_pool": async_db_pool_stats()
     }
\ No newline at end of file
@@ -0,0 +1,398 @@
+"""
+Async Azure Blob Storage service for async endpoints
+
+Built on azure.storage.blob.aio so uploads, downloads and deletes await the
+network instead of blocking the event loop. Blob naming and container
+bookkeeping are shared with the sync AzureBlobService, which sync code paths
+(SOWProcessor, background analysis, pre-processing) keep using.
+"""
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError, ResourceNotModifiedError
+from azure.storage.blob import BlobBlock, ContentSettings
+from azure.storage.blob.aio import BlobServiceClient
+from src.app.core.blob_disk_cache import get_blob_disk_cache
+from src.app.services.azure_blob_service import AzureBlobService
+from src.app.services.file_management_service import FileManagementService
+from src.app.services.storage_backend import (
+    PDFS_CONTAINER, RESULTS_CONTAINER, UPLOADS_CONTAINER, EmptyUploadError, UploadTooLargeError,
+    blob_timestamp, max_upload_bytes, pdf_blob_name_for, sow_blob_name, upload_chunk_bytes
+)
+
+
+def _block_id(index: int) -> str:
+    # Block IDs must all have the same length within a blob
+    return base64.b64encode(f"{index:08d}".encode()).decode()
+
+
+class AsyncAzureBlobService:
+    """Async counterpart of AzureBlobService for the operations async endpoints need"""
+    
+    def __init__(self):
+        self.connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
+        self.container_name = os.getenv("AZURE_STORAGE_CONTAINER_NAME", UPLOADS_CONTAINER)
+        
+        if not self.connection_string:
+            raise ValueError("AZURE_STORAGE_CONNECTION_STRING not found in environment variables")
+        
+        self.blob_service_client = BlobServiceClient.from_connection_string(
+            self.connection_string,
+            connection_timeout=int(os.getenv("AZURE_BLOB_CONNECTION_TIMEOUT", "20")),
+            read_timeout=int(os.getenv("AZURE_BLOB_READ_TIMEOUT", "60"))
+        )
+    
+    async def _ensure_container(self, container_name: str):
+        """Create a container if it doesn't exist; skipped once verified by either service"""
+        if container_name in AzureBlobService._verified_containers:
+            return
+        container_client = self.blob_service_client.get_container_client(container_name)
+        if not await container_client.exists():
+            try:
+                await container_client.create_container()
+                logging.info(f"Created container: {container_name}")
+            except ResourceExistsError:
+                pass
+        AzureBlobService._verified_containers.add(container_name)
+    
+    async def close(self):
+        await self.blob_service_client.close()
+    
+    async def upload_sow(self, file_content: bytes, filename: str,
+                         content_type: str = "application/octet-stream") -> dict:
+        """
+        Upload SOW document to Azure Blob Storage
+        
+        Args:
+            file_content: File bytes
+            filename: Original filename
+            content_type: MIME type
+        
+        Returns:
+            dict with blob_name, url, size (same shape as AzureBlobService.upload_sow)
+        """
+        try:
+            await self._ensure_container(self.container_name)
+            
+            timestamp = blob_timestamp()
+            blob_name = sow_blob_name(filename, timestamp)
+            
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            
+            await blob_client.upload_blob(
+                file_content,
+                overwrite=True,
+                content_settings=ContentSettings(content_type=content_type),
+                metadata={
+                    "original_filename": filename,
+                    "upload_timestamp": timestamp
+                }
+            )
+            
+            logging.info(f"Uploaded SOW: {blob_name} ({len(file_content)} bytes)")
+            
+            return {
+                "blob_name": blob_name,
+                "url": blob_client.url,
+                "size": len(file_content),
+                "content_type": content_type,
+                "original_filename": filename
+            }
+        
+        except Exception as e:
+            logging.error(f"Error uploading SOW: {e}")
+            raise
+    
+    async def upload_sow_stream(self, upload, filename: str,
+                                content_type: str = "application/octet-stream") -> dict:
+        """
+        Stream an upload into Azure Blob Storage as staged blocks
+        
+        Reads the file in UPLOAD_CHUNK_BYTES chunks, stages each chunk as a
+        block and commits the block list at the end, so memory per upload is
+        one chunk regardless of file size. SHA-256 and size are computed as the
+        chunks pass; nothing is committed for a file over MAX_UPLOAD_BYTES
+        (staged blocks that are never committed are discarded by Azure).
+        
+        Args:
+            upload: Object with an async read(size) method, e.g. FastAPI UploadFile
+            filename: Original filename
+            content_type: MIME type
+            
+        Returns:
+            dict with blob_name, url, size, content_hash (plus the upload_sow fields)
+            
+        Raises:
+            UploadTooLargeError: File exceeds MAX_UPLOAD_BYTES
+            EmptyUploadError: File is empty
+        """
+        max_bytes = max_upload_bytes()
+        chunk_bytes = upload_chunk_bytes()
+        
+        # Reject early when the client declared the size
+        declared_size = getattr(upload, "size", None)
+        if declared_size is not None and declared_size > max_bytes:
+            raise UploadTooLargeError(f"File is {declared_size} bytes; the limit is {max_bytes} bytes")
+        
+        await self._ensure_container(self.container_name)
+        
+        timestamp = blob_timestamp()
+        blob_name = sow_blob_name(filename, timestamp)
+        blob_client = self.blob_service_client.get_blob_client(
+            container=self.container_name,
+            blob=blob_name
+        )
+        
+        sha256 = hashlib.sha256()
+        size = 0
+        block_ids = []
+        try:
+            while True:
+                chunk = await upload.read(chunk_bytes)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"File exceeds the upload limit of {max_bytes} bytes")
+                sha256.update(chunk)
+                block_id = _block_id(len(block_ids))
+                await blob_client.stage_block(block_id, chunk, length=len(chunk))
+                block_ids.append(block_id)
+            
+            if size == 0:
+                raise EmptyUploadError("Empty file")
+            
+            content_hash = sha256.hexdigest()
+            await blob_client.commit_block_list(
+                [BlobBlock(block_id=b) for b in block_ids],
+                content_settings=ContentSettings(content_type=content_type),
+                metadata={
+                    "original_filename": filename,
+                    "upload_timestamp": timestamp,
+                    "content_sha256": content_hash
+                }
+            )
+            
+        except (UploadTooLargeError, EmptyUploadError):
+            raise
+        except Exception as e:
+            logging.error(f"Error uploading SOW: {e}")
+            raise
+        
+        logging.info(f"Uploaded SOW: {blob_name} ({size} bytes in {len(block_ids)} blocks)")
+        
+        return {
+            "blob_name": blob_name,
+            "url": blob_client.url,
+            "size": size,
+            "content_type": content_type,
+            "original_filename": filename,
+            "content_hash": content_hash
+        }
+    
+    async def delete_sow(self, blob_name: str) -> bool:
+        """
+        Delete SOW document from storage
+        
+        Returns:
+            True if deleted successfully
+        """
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            await blob_client.delete_blob()
+            logging.info(f"Deleted SOW: {blob_name}")
+            return True
+        
+        except Exception as e:
+            logging.error(f"Error deleting SOW {blob_name}: {e}")
+            raise
+    
+    async def download_analysis_result(self, result_blob_name: str) -> Optional[bytes]:
+        """
+        Download a stored analysis result through the local disk cache
+        
+        Returns:
+            Stored (possibly compressed) result bytes, or None if the blob does not exist
+        """
+        cache = get_blob_disk_cache()
+        cached_etag = cache.etag(RESULTS_CONTAINER, result_blob_name) if cache else None
+        blob_client = self.blob_service_client.get_blob_client(
+            container=RESULTS_CONTAINER,
+            blob=result_blob_name
+        )
+        try:
+            downloader = None
+            if cached_etag:
+                try:
+                    downloader = await blob_client.download_blob(
+                        etag=cached_etag, match_condition=MatchConditions.IfModified
+                    )
+                except ResourceNotModifiedError:
+                    content = await asyncio.to_thread(cache.read, RESULTS_CONTAINER, result_blob_name, cached_etag)
+                    if content is not None:
+                        return content
+            if downloader is None:
+                downloader = await blob_client.download_blob()
+            content = await downloader.readall()
+        except ResourceNotFoundError:
+            if cache:
+                cache.invalidate(RESULTS_CONTAINER, result_blob_name)
+            return None
+        
+        if cache:
+            properties = downloader.properties
+            info = {
+                "etag": properties.etag,
+                "size": properties.size,
+                "created": properties.creation_time.isoformat() if properties.creation_time else None,
+                "last_modified": properties.last_modified.isoformat() if properties.last_modified else None
+            }
+            stored = await asyncio.to_thread(
+                cache.store, RESULTS_CONTAINER, result_blob_name, properties.etag, len(content), info,
+                lambda f: f.write(content)
+            )
+            if stored is not None:
+                stored[0].close()
+        return content
+    
+    async def pdf_exists(self, result_blob_name: str) -> bool:
+        """Check if PDF exists for analysis result (database state first, like AzureBlobService.pdf_exists)"""
+        state = await asyncio.to_thread(FileManagementService.get_analysis_pdf_state, result_blob_name)
+        if state is not None:
+            return state["pdf_generated_at"] is not None
+        
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=PDFS_CONTAINER,
+                blob=pdf_blob_name_for(result_blob_name)
+            )
+            return await blob_client.exists()
+        
+        except Exception as e:
+            logging.error(f"Error checking PDF existence: {e}")
+            return False
+    
+    async def get_pdf_properties(self, result_blob_name: str):
+        """
+        Properties (size, etag, last_modified) of the PDF for an analysis result
+        
+        Returns:
+            BlobProperties, or None if the PDF has not been generated
+        """
+        blob_client = self.blob_service_client.get_blob_client(
+            container=PDFS_CONTAINER,
+            blob=pdf_blob_name_for(result_blob_name)
+        )
+        try:
+            return await blob_client.get_blob_properties()
+        except ResourceNotFoundError:
+            return None
+    
+    async def stream_pdf(self, result_blob_name: str, offset: Optional[int] = None,
+                         length: Optional[int] = None, etag: Optional[str] = None) -> AsyncIterator[bytes]:
+        """
+        Stream a PDF (or a byte range of it) chunk by chunk
+        
+        Passing the etag from get_pdf_properties makes the download fail instead
+        of mixing versions if the PDF is regenerated mid-stream.
+        
+        Args:
+            result_blob_name: Result JSON blob name
+            offset: First byte to read
+            length: Number of bytes to read
+            etag: Expected ETag of the PDF
+        """
+        blob_client = self.blob_service_client.get_blob_client(
+            container=PDFS_CONTAINER,
+            blob=pdf_blob_name_for(result_blob_name)
+        )
+        conditions = {"etag": etag, "match_condition": MatchConditions.IfNotModified} if etag else {}
+        downloader = await blob_client.download_blob(offset=offset, length=length, **conditions)
+        async for chunk in downloader.chunks():
+            yield chunk
+    
+    async def store_analysis_pdf(self, result_blob_name: str, pdf_buffer) -> dict:
+        """
+        Store analysis PDF in Azure Blob Storage
+        
+        Returns:
+            dict with pdf_blob_name, url, size (same shape as AzureBlobService.store_analysis_pdf)
+        """
+        try:
+            await self._ensure_container(PDFS_CONTAINER)
+            
+            pdf_blob_name = pdf_blob_name_for(result_blob_name)
+            pdf_bytes = pdf_buffer.getvalue()
+            
+            blob_client = self.blob_service_client.get_blob_client(
+                container=PDFS_CONTAINER,
+                blob=pdf_blob_name
+            )
+            
+            upload = await blob_client.upload_blob(
+                pdf_bytes,
+                overwrite=True,
+                content_settings=ContentSettings(
+                    content_type="application/pdf",
+                    content_disposition=f"attachment; filename={pdf_blob_name}"
+                ),
+                metadata={
+                    "source_result_blob": result_blob_name,
+                    "generated_timestamp": datetime.now().isoformat()
+                }
+            )
+            
+            logging.info(f"Stored analysis PDF: {pdf_blob_name} ({len(pdf_bytes)} bytes)")
+            
+            await asyncio.to_thread(
+                FileManagementService.record_analysis_pdf,
+                result_blob_name, pdf_blob_name, len(pdf_bytes), upload.get("etag")
+            )
+            
+            return {
+                "pdf_blob_name": pdf_blob_name,
+                "url": blob_client.url,
+                "size": len(pdf_bytes),
+                "etag": upload.get("etag"),
+                "container": PDFS_CONTAINER,
+                "source_result_blob": result_blob_name
+            }
+        
+        except Exception as e:
+            logging.error(f"Error storing analysis PDF: {e}")
+            raise
+
+
+_async_blob_service: Optional[AsyncAzureBlobService] = None
+
+
+def get_async_blob_service() -> AsyncAzureBlobService:
+    """
+    Shared AsyncAzureBlobService for this worker's event loop
+
+    Only call from async code; the aio client's connection pool belongs to the
+    running loop.
+    """
+    global _async_blob_service
+    if _async_blob_service is None:
+        _async_blob_service = AsyncAzureBlobService()
+    return _async_blob_service
+
+
+async def close_async_blob_service():
+    """Close the shared async client, if one was created (called at shutdown)"""
+    global _async_blob_service
+    if _async_blob_service is not None:
+        await _async_blob_service.close()
+        _async_blob_service = None
@@ -3,27 +3,69 @@ Azure Blob Storage service for SOW document management
 """
 import logging
 import os
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List
+from typing import BinaryIO, Optional, List
+import requests
+from requests.adapters import HTTPAdapter
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError, ResourceNotModifiedError
+from azure.core.pipeline.transport import RequestsTransport
 from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient, ContentSettings
 from dotenv import load_dotenv
 import tempfile
+from src.app.core.blob_disk_cache import get_blob_disk_cache
+from src.app.core.hybrid_cache import InProcessCache
+from src.app.services.file_management_service import FileManagementService
+from src.app.services.storage_backend import (
+    PDFS_CONTAINER, RESULTS_CONTAINER, UPLOADS_CONTAINER, StorageBackend,
+    blob_timestamp, pdf_blob_name_for, result_blob_name_for, sow_blob_name
+)
+from src.app.utils.result_codec import decode_result, encode_result
 
 load_dotenv()
 
-class AzureBlobService:
+def _build_transport() -> RequestsTransport:
+    """
+    HTTP transport with a connection pool sized for concurrent requests
+    
+    Settings: AZURE_BLOB_POOL_SIZE (connections kept per host),
+    AZURE_BLOB_CONNECTION_TIMEOUT and AZURE_BLOB_READ_TIMEOUT (seconds).
+    """
+    pool_size = int(os.getenv("AZURE_BLOB_POOL_SIZE", "20"))
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return RequestsTransport(
+        session=session,
+        session_owner=False,
+        connection_timeout=int(os.getenv("AZURE_BLOB_CONNECTION_TIMEOUT", "20")),
+        read_timeout=int(os.getenv("AZURE_BLOB_READ_TIMEOUT", "60"))
+    )
+
+
+class AzureBlobService(StorageBackend):
     """Service for managing SOW documents in Azure Blob Storage"""
     
+    name = "azure"
+    
+    # Containers already checked or created by this process
+    _verified_containers = set()
+    _containers_lock = threading.Lock()
+    
     def __init__(self):
         self.connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
-        self.container_name = os.getenv("AZURE_STORAGE_CONTAINER_NAME", "sow-uploads")
+        self.container_name = os.getenv("AZURE_STORAGE_CONTAINER_NAME", UPLOADS_CONTAINER)
         
         if not self.connection_string:
             raise ValueError("AZURE_STORAGE_CONNECTION_STRING not found in environment variables")
         
+        self._transport = _build_transport()
         self.blob_service_client = BlobServiceClient.from_connection_string(
-            self.connection_string
+            self.connection_string,
+            transport=self._transport
         )
         
         # Ensure container exists
@@ -32,15 +74,42 @@ class AzureBlobService:
     def _ensure_container_exists(self):
         """Create container if it doesn't exist"""
         try:
-            container_client = self.blob_service_client.get_container_client(
-                self.container_name
-            )
-            if not container_client.exists():
-                container_client.create_container()
-                logging.info(f"Created container: {self.container_name}")
+            self._ensure_container(self.container_name)
         except Exception as e:
             logging.error(f"Error ensuring container exists: {e}")
     
+    def _ensure_container(self, container_name: str):
+        """
+        Create a container if it doesn't exist; checked once per process
+        
+        Raises:
+            Exception: If the container could not be checked or created
+        """
+        if container_name in self._verified_containers:
+            return
+        with self._containers_lock:
+            if container_name in self._verified_containers:
+                return
+            container_client = self.blob_service_client.get_container_client(container_name)
+            if not container_client.exists():
+                try:
+                    container_client.create_container()
+                    logging.info(f"Created container: {container_name}")
+                except ResourceExistsError:
+                    # Created by another worker in the meantime
+                    pass
+            self._verified_containers.add(container_name)
+    
+    def close(self):
+        """Close the client and its pooled connections"""
+        self.blob_service_client.close()
+        self._transport.session.close()
+    
+    def verify_containers(self):
+        """Check or create the upload, results and PDF containers (called at startup)"""
+        for container_name in (self.container_name, RESULTS_CONTAINER, PDFS_CONTAINER):
+            self._ensure_container(container_name)
+    
     def upload_sow(self, file_content: bytes, filename: str, 
                    content_type: str = "application/octet-stream") -> dict:
         """
@@ -56,9 +125,8 @@ class AzureBlobService:
         """
         try:
             # Generate unique blob name with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            file_ext = Path(filename).suffix
-            blob_name = f"{timestamp}_{filename}"
+            timestamp = blob_timestamp()
+            blob_name = sow_blob_name(filename, timestamp)
             
             blob_client = self.blob_service_client.get_blob_client(
                 container=self.container_name,
@@ -90,9 +158,70 @@ class AzureBlobService:
             logging.error(f"Error uploading SOW: {e}")
             raise
     
+    def _read_through(self, container: str, blob_name: str, known_etag: Optional[str] = None):
+        """
+        Download a blob through the local disk cache
+        
+        A cached copy is revalidated with a conditional download, so a warm
+        read costs one 304 round trip and is served from local disk. Without
+        the cache (BLOB_CACHE_MAX_BYTES=0) or for blobs over its budget, the
+        blob is streamed into a SpooledTemporaryFile that stays in memory up to
+        BLOB_SPOOL_MAX_BYTES.
+        
+        Args:
+            container: Blob container
+            blob_name: Blob name
+            known_etag: ETag of a copy the caller already holds
+            
+        Returns:
+            (stream positioned at the start, info with etag, size, created,
+            last_modified), or None if known_etag is still current
+        """
+        cache = get_blob_disk_cache()
+        blob_client = self.blob_service_client.get_blob_client(container=container, blob=blob_name)
+        cached_etag = known_etag or (cache.etag(container, blob_name) if cache else None)
+        
+        downloader = None
+        if cached_etag:
+            try:
+                downloader = blob_client.download_blob(
+                    etag=cached_etag, match_condition=MatchConditions.IfModified
+                )
+            except ResourceNotModifiedError:
+                if known_etag:
+                    return None
+                hit = cache.open(container, blob_name, cached_etag)
+                if hit is not None:
+                    logging.debug(f"Blob not modified, serving from disk cache: {container}/{blob_name}")
+                    return hit
+        if downloader is None:
+            downloader = blob_client.download_blob()
+        
+        properties = downloader.properties
+        info = {
+            "etag": properties.etag,
+            "size": properties.size,
+            "created": properties.creation_time.isoformat() if properties.creation_time else None,
+            "last_modified": properties.last_modified.isoformat() if properties.last_modified else None
+        }
+        if cache:
+            stored = cache.store(container, blob_name, properties.etag, properties.size, info, downloader.readinto)
+            if stored is not None:
+                return stored
+        
+        spool_max = int(os.getenv("BLOB_SPOOL_MAX_BYTES", str(16 * 1024 * 1024)))
+        stream = tempfile.SpooledTemporaryFile(max_size=spool_max)
+        try:
+            downloader.readinto(stream)
+            stream.seek(0)
+        except Exception:
+            stream.close()
+            raise
+        return stream, info
+    
     def download_sow(self, blob_name: str) -> bytes:
         """
-        Download SOW document from Azure Blob Storage
+        Download SOW document from Azure Blob Storage (through the disk cache)
         
         Args:
             blob_name: Name of the blob to download
@@ -101,13 +230,9 @@ class AzureBlobService:
             File content as bytes
         """
         try:
-            blob_client = self.blob_service_client.get_blob_client(
-                container=self.container_name,
-                blob=blob_name
-            )
-            
-            download_stream = blob_client.download_blob()
-            content = download_stream.readall()
+            stream, _ = self._read_through(self.container_name, blob_name)
+            with stream:
+                content = stream.read()
             
             logging.info(f"Downloaded SOW: {blob_name} ({len(content)} bytes)")
             return content
@@ -116,6 +241,30 @@ class AzureBlobService:
             logging.error(f"Error downloading SOW {blob_name}: {e}")
             raise
     
+    def download_sow_stream(self, blob_name: str) -> BinaryIO:
+        """
+        Download SOW into a seekable stream for in-memory processing
+        
+        Served from the disk cache when the blob is unchanged; otherwise the
+        blob is streamed straight into the cache (or a SpooledTemporaryFile),
+        so there is no intermediate bytes copy and no named temp file to clean up.
+        
+        Args:
+            blob_name: Name of the blob to download
+            
+        Returns:
+            Stream positioned at the start; the caller closes it
+        """
+        try:
+            stream, info = self._read_through(self.container_name, blob_name)
+            
+            logging.info(f"Downloaded SOW: {blob_name} ({info['size']} bytes)")
+            return stream
+            
+        except Exception as e:
+            logging.error(f"Error downloading SOW {blob_name}: {e}")
+            raise
+    
     def download_sow_to_temp(self, blob_name: str) -> str:
         """
         Download SOW to temporary file for processing
@@ -147,13 +296,17 @@ class AzureBlobService:
             logging.error(f"Error downloading to temp: {e}")
             raise
     
-    def list_sows(self, prefix: Optional[str] = None, limit: int = 100) -> List[dict]:
+    def list_sows(self, prefix: Optional[str] = None, limit: Optional[int] = 100) -> List[dict]:
         """
         List SOW documents in storage
         
+        Enumerates the container, so cost grows with its size; the /sows
+        listing reads uploaded_documents instead and this is used for
+        reconciliation (reconcile_sow_storage.py).
+        
         Args:
             prefix: Optional prefix to filter blobs
-            limit: Maximum number of results
+            limit: Maximum number of results (None for all)
             
         Returns:
             List of blob metadata
@@ -169,7 +322,7 @@ class AzureBlobService:
             
             results = []
             for i, blob in enumerate(blobs):
-                if i >= limit:
+                if limit is not None and i >= limit:
                     break
                     
                 results.append({
@@ -254,23 +407,17 @@ class AzureBlobService:
             dict with result_blob_name, url, size
         """
         try:
-            results_container = "sow-analysis-results"
+            results_container = RESULTS_CONTAINER
             
-            # Ensure results container exists
-            container_client = self.blob_service_client.get_container_client(results_container)
-            if not container_client.exists():
-                container_client.create_container()
-                logging.info(f"Created container: {results_container}")
+            # Ensure results container exists (no round trip once verified)
+            self._ensure_container(results_container)
             
             # Generate result blob name based on original blob
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            base_name = Path(blob_name).stem
-            result_blob_name = f"{base_name}__analysis__{timestamp}.json"
+            timestamp = blob_timestamp()
+            result_blob_name = result_blob_name_for(blob_name, timestamp)
             
-            # Convert result to JSON
-            import json
-            result_json = json.dumps(analysis_result, indent=2, ensure_ascii=False)
-            result_bytes = result_json.encode('utf-8')
+            # Convert result to compact JSON, compressed per RESULT_COMPRESSION
+            result_bytes, content_encoding = encode_result(analysis_result)
             
             # Upload to results container
             blob_client = self.blob_service_client.get_blob_client(
@@ -281,20 +428,25 @@ class AzureBlobService:
             blob_client.upload_blob(
                 result_bytes,
                 overwrite=True,
-                content_settings=ContentSettings(content_type="application/json"),
+                content_settings=ContentSettings(
+                    content_type="application/json",
+                    content_encoding=content_encoding
+                ),
                 metadata={
                     "source_blob": blob_name,
                     "analysis_timestamp": timestamp,
-                    "prompts_processed": str(analysis_result.get("prompts_processed", 0))
+                    "prompts_processed": str(analysis_result.get("prompts_processed", 0)),
+                    "content_encoding": content_encoding or "identity"
                 }
             )
             
-            logging.info(f"Stored analysis result: {result_blob_name} ({len(result_bytes)} bytes)")
+            logging.info(f"Stored analysis result: {result_blob_name} ({len(result_bytes)} bytes, encoding={content_encoding or 'identity'})")
             
             return {
                 "result_blob_name": result_blob_name,
                 "url": blob_client.url,
                 "size": len(result_bytes),
+                "content_encoding": content_encoding,
                 "container": results_container,
                 "source_blob": blob_name
             }
@@ -303,6 +455,57 @@ class AzureBlobService:
             logging.error(f"Error storing analysis result: {e}")
             raise
     
+    def get_analysis_result(self, result_blob_name: str) -> Optional[dict]:
+        """
+        Parsed analysis result plus blob metadata, from a local ETag-validated cache
+        
+        A cached result is revalidated with a conditional download (If-None-Match),
+        so an unchanged result costs one 304 round trip and no parsing. After a
+        restart or in-memory eviction the raw result comes from the disk cache.
+        Otherwise one download returns both the content and the blob properties.
+        
+        Args:
+            result_blob_name: Result JSON blob name
+            
+        Returns:
+            dict with etag, data (parsed result) and metadata, or None if not found
+        """
+        cached = InProcessCache.get(result_blob_name, category="analysis_results")
+        
+        try:
+            blob = self._read_through(
+                RESULTS_CONTAINER, result_blob_name, known_etag=cached["etag"] if cached else None
+            )
+        except ResourceNotFoundError:
+            InProcessCache.delete(result_blob_name, category="analysis_results")
+            cache = get_blob_disk_cache()
+            if cache:
+                cache.invalidate(RESULTS_CONTAINER, result_blob_name)
+            return None
+        
+        if blob is None:
+            logging.debug(f"Analysis result not modified, serving cached copy: {result_blob_name}")
+            return cached
+        
+        stream, info = blob
+        with stream:
+            content = stream.read()
+        entry = {
+            "etag": info["etag"],
+            "data": decode_result(content),
+            "metadata": {
+                "result_blob_name": result_blob_name,
+                "created": info["created"],
+                "last_modified": info["last_modified"],
+                "size": info["size"],
+                "url": self.blob_service_client.get_blob_client(
+                    container=RESULTS_CONTAINER, blob=result_blob_name
+                ).url
+            }
+        }
+        InProcessCache.set(result_blob_name, entry, category="analysis_results")
+        return entry
+    
     def store_analysis_pdf(self, result_blob_name: str, pdf_buffer) -> dict:
         """
         Store analysis PDF in Azure Blob Storage
@@ -315,17 +518,13 @@ class AzureBlobService:
             dict with pdf_blob_name, url, size
         """
         try:
-            pdfs_container = "sow-analysis-pdfs"
+            pdfs_container = PDFS_CONTAINER
             
-            # Ensure PDFs container exists
-            container_client = self.blob_service_client.get_container_client(pdfs_container)
-            if not container_client.exists():
-                container_client.create_container()
-                logging.info(f"Created container: {pdfs_container}")
+            # Ensure PDFs container exists (no round trip once verified)
+            self._ensure_container(pdfs_container)
             
             # Generate PDF blob name based on result blob name
-            base_name = result_blob_name.replace('.json', '')
-            pdf_blob_name = f"{base_name}.pdf"
+            pdf_blob_name = pdf_blob_name_for(result_blob_name)
             
             # Get PDF bytes
             pdf_bytes = pdf_buffer.getvalue()
@@ -336,7 +535,7 @@ class AzureBlobService:
                 blob=pdf_blob_name
             )
             
-            blob_client.upload_blob(
+            upload = blob_client.upload_blob(
                 pdf_bytes,
                 overwrite=True,
                 content_settings=ContentSettings(
@@ -351,10 +550,16 @@ class AzureBlobService:
             
             logging.info(f"Stored analysis PDF: {pdf_blob_name} ({len(pdf_bytes)} bytes)")
             
+            # PDF availability is read from the database from now on
+            FileManagementService.record_analysis_pdf(
+                result_blob_name, pdf_blob_name, len(pdf_bytes), upload.get("etag")
+            )
+            
             return {
                 "pdf_blob_name": pdf_blob_name,
                 "url": blob_client.url,
                 "size": len(pdf_bytes),
+                "etag": upload.get("etag"),
                 "container": pdfs_container,
                 "source_result_blob": result_blob_name
             }
@@ -367,16 +572,22 @@ class AzureBlobService:
         """
         Check if PDF exists for analysis result
         
+        Uses the PDF state recorded in analysis_results; storage is only probed
+        for results the database does not know about.
+        
         Args:
             result_blob_name: Result JSON blob name
             
         Returns:
             True if PDF exists, False otherwise
         """
+        state = FileManagementService.get_analysis_pdf_state(result_blob_name)
+        if state is not None:
+            return state["pdf_generated_at"] is not None
+        
         try:
-            pdfs_container = "sow-analysis-pdfs"
-            base_name = result_blob_name.replace('.json', '')
-            pdf_blob_name = f"{base_name}.pdf"
+            pdfs_container = PDFS_CONTAINER
+            pdf_blob_name = pdf_blob_name_for(result_blob_name)
             
             blob_client = self.blob_service_client.get_blob_client(
                 container=pdfs_container,
@@ -400,9 +611,8 @@ class AzureBlobService:
             PDF download URL or None if not found
         """
         try:
-            pdfs_container = "sow-analysis-pdfs"
-            base_name = result_blob_name.replace('.json', '')
-            pdf_blob_name = f"{base_name}.pdf"
+            pdfs_container = PDFS_CONTAINER
+            pdf_blob_name = pdf_blob_name_for(result_blob_name)
             
             blob_client = self.blob_service_client.get_blob_client(
                 container=pdfs_container,
@@ -410,7 +620,7 @@ class AzureBlobService:
             )
             
             # Check if PDF exists
-            if blob_client.exists():
+            if self.pdf_exists(result_blob_name):
                 return blob_client.url
             
             return None
@@ -418,3 +628,31 @@ class AzureBlobService:
         except Exception as e:
             logging.error(f"Error getting PDF URL: {e}")
             return None
+
+
+_blob_service: Optional[AzureBlobService] = None
+_blob_service_lock = threading.Lock()
+
+
+def get_blob_service() -> AzureBlobService:
+    """
+    Shared AzureBlobService for this process
+    
+    The underlying BlobServiceClient is thread-safe, so one client and its
+    connection pool serve every request instead of a new client per call.
+    """
+    global _blob_service
+    if _blob_service is None:
+        with _blob_service_lock:
+            if _blob_service is None:
+                _blob_service = AzureBlobService()
+    return _blob_service
+
+
+def close_blob_service():
+    """Close the shared AzureBlobService, if one was created (called at shutdown)"""
+    global _blob_service
+    with _blob_service_lock:
+        if _blob_service is not None:
+            _blob_service.close()
+            _blob_service = None
@@ -0,0 +1,233 @@
+"""
+Lightweight section tree for extracted documents
+
+An extracted document is a dict:
+
+    {
+        "text": "...",                # same text extract_text returns
+        "sections": [                 # ordered by start offset
+            {"level": 1, "title": "Pricing", "page": 3, "start": 1200, "end": 4810, "parent": None},
+            ...
+        ],
+        "page_offsets": [0, 2051, ...]  # text offset where each page starts (empty if unknown)
+    }
+
+Headings come from DOCX heading styles when present, otherwise from
+heuristics over the text lines (numbered headings, ARTICLE/SECTION/EXHIBIT
+labels and short all-caps lines), which is what PDFs rely on.
+"""
+import bisect
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (text, heading level or None, page or None)
+Block = Tuple[str, Optional[int], Optional[int]]
+
+MAX_HEADING_CHARS = 100
+
+NUMBERED_HEADING_RE = re.compile(r"^(\d{1,2}(?:\.\d{1,2}){0,3})\.?\s+([A-Z][^\n]*)$")
+LABELED_HEADING_RE = re.compile(
+    r"^(ARTICLE|SECTION|EXHIBIT|SCHEDULE|APPENDIX|ATTACHMENT|ANNEX)\s+([A-Z0-9IVX]+(?:\.\d+)*)\b",
+    re.IGNORECASE
+)
+CLAUSE_WORDS_RE = re.compile(r"\b(shall|will|may|must|is|are|agrees?)\b")
+ALL_CAPS_RE = re.compile(r"^[A-Z0-9&/,()'\- ]+$")
+
+PRICING_SECTION_RE = re.compile(
+    r"\b(pricing|price|rates?|rate\s+schedule|fees?|compensation|payment|charges|cost)\b",
+    re.IGNORECASE
+)
+
+
+def detect_heading(line: str) -> Optional[int]:
+    """
+    Heuristic heading level for a plain-text line, or None if it reads as body text
+    """
+    line = line.strip()
+    if not line or len(line) > MAX_HEADING_CHARS:
+        return None
+
+    labeled = LABELED_HEADING_RE.match(line)
+    if labeled:
+        return 1 + labeled.group(2).count(".")
+
+    numbered = NUMBERED_HEADING_RE.match(line)
+    if numbered:
+        title = numbered.group(2)
+        # "3. The Supplier shall ..." is a numbered clause, not a heading
+        if len(title.split()) > 10 or CLAUSE_WORDS_RE.search(title):
+            return None
+        if title.endswith((".", ";", ",")) and not title.isupper():
+            return None
+        return 1 + numbered.group(1).count(".")
+
+    letters = [c for c in line if c.isalpha()]
+    if len(letters) >= 4 and ALL_CAPS_RE.match(line) and len(line.split()) <= 8:
+        return 1
+
+    return None
+
+
+def build_structure(blocks: Iterable[Block], use_heuristics: Optional[bool] = None) -> Dict:
+    """
+    Join text blocks and derive the section tree and page offsets
+
+    Args:
+        blocks: (text, heading level, page) per paragraph/line, in document order
+        use_heuristics: Detect headings from the text; by default only when no
+            block carries an explicit heading level
+
+    Returns:
+        Extracted document dict (see module docstring)
+    """
+    blocks = list(blocks)
+    if use_heuristics is None:
+        use_heuristics = not any(level is not None for _, level, _ in blocks)
+
+    lines = []
+    sections = []
+    page_offsets: List[int] = []
+    offset = 0
+    for text, level, page in blocks:
+        if use_heuristics and level is None:
+            level = detect_heading(text)
+        if page is not None:
+            while len(page_offsets) < page:
+                page_offsets.append(offset)
+        if level is not None and text.strip():
+            sections.append({
+                "level": level,
+                "title": " ".join(text.split())[:MAX_HEADING_CHARS],
+                "page": page,
+                "start": offset,
+                "end": None,
+                "parent": None
+            })
+        lines.append(text)
+        offset += len(text) + 1
+
+    text = "\n".join(lines)
+    _link_sections(sections, len(text))
+    return {"text": text, "sections": sections, "page_offsets": page_offsets}
+
+
+def _link_sections(sections: List[Dict], text_length: int):
+    """Set each section's end offset and parent index from the heading levels"""
+    stack: List[int] = []
+    for i, section in enumerate(sections):
+        while stack and sections[stack[-1]]["level"] >= section["level"]:
+            sections[stack.pop()]["end"] = section["start"]
+        section["parent"] = stack[-1] if stack else None
+        stack.append(i)
+    for i in stack:
+        sections[i]["end"] = text_length
+
+
+def page_for_offset(page_offsets: List[int], offset: int) -> Optional[int]:
+    """1-based page containing a text offset, or None if pages are unknown"""
+    if not page_offsets or offset < 0:
+        return None
+    return bisect.bisect_right(page_offsets, offset)
+
+
+def section_for_offset(sections: List[Dict], offset: int) -> Optional[Dict]:
+    """Innermost section containing a text offset"""
+    match = None
+    for section in sections:
+        if section["start"] > offset:
+            break
+        if offset < section["end"]:
+            match = section
+    return match
+
+
+def section_path(sections: List[Dict], section: Dict) -> str:
+    """Breadcrumb title of a section, e.g. 'Exhibit A > Rate Schedule'"""
+    titles = [section["title"]]
+    parent = section.get("parent")
+    while parent is not None:
+        titles.append(sections[parent]["title"])
+        parent = sections[parent].get("parent")
+    return " > ".join(reversed(titles))
+
+
+def find_sections(sections: List[Dict], pattern=PRICING_SECTION_RE) -> List[Dict]:
+    """Sections whose title matches a pattern (defaults to pricing / rate schedule titles)"""
+    if isinstance(pattern, str):
+        pattern = re.compile(pattern, re.IGNORECASE)
+    return [s for s in sections if pattern.search(s["title"])]
+
+
+def chunk_by_sections(text: str, sections: List[Dict], max_chars: int) -> List[str]:
+    """
+    Split text into chunks of at most max_chars, breaking on section boundaries
+
+    Consecutive top-level sections are packed together; a section longer than
+    max_chars is split on line boundaries (and hard-split only if a single line
+    is too long). Falls back to line packing when there are no sections.
+    """
+    boundaries = sorted({0} | {s["start"] for s in sections if s["parent"] is None} | {len(text)})
+    units = [text[a:b] for a, b in zip(boundaries, boundaries[1:]) if b > a]
+
+    chunks: List[str] = []
+    current = ""
+    for unit in units:
+        if len(current) + len(unit) <= max_chars:
+            current += unit
+            continue
+        if current:
+            chunks.append(current)
+            current = ""
+        if len(unit) <= max_chars:
+            current = unit
+            continue
+        for line in unit.splitlines(keepends=True):
+            while len(line) > max_chars:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(line[:max_chars])
+                line = line[max_chars:]
+            if current and len(current) + len(line) > max_chars:
+                chunks.append(current)
+                current = ""
+            current += line
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def locate_findings(findings: List[Dict], document: Dict, excerpt_chars: int = 80):
+    """
+    Fill in section_hint and page for findings by locating their original_text
+
+    Existing non-empty values are kept. Findings whose excerpt cannot be found
+    verbatim (e.g. paraphrased by the model) are left unchanged.
+    """
+    text = document.get("text", "")
+    sections = document.get("sections", [])
+    page_offsets = document.get("page_offsets", [])
+    if not text:
+        return
+
+    normalized = None
+    for finding in findings:
+        excerpt = " ".join((finding.get("original_text") or "").split())[:excerpt_chars]
+        if not excerpt:
+            continue
+        offset = text.find(excerpt)
+        if offset < 0:
+            # Retry against whitespace-normalized text, mapping back approximately
+            if normalized is None:
+                normalized = " ".join(text.split())
+            norm_offset = normalized.find(excerpt)
+            if norm_offset < 0:
+                continue
+            offset = min(int(norm_offset * len(text) / max(len(normalized), 1)), len(text) - 1)
+
+        section = section_for_offset(sections, offset)
+        if section and not finding.get("section_hint"):
+            finding["section_hint"] = section_path(sections, section)
+        page = page_for_offset(page_offsets, offset)
+        if page is not None and not finding.get("page"):
+            finding["page"] = page
@@ -0,0 +1,338 @@
+"""
+Deterministic rule engine for annual rate increase / CPI escalation clauses.
+
+Applies the same decision rules that `make_user_prompt_full` gives the LLM
+(cap > 5% non_compliant, 4-5% tighten, <= 4% compliant, no cap missing_cap)
+to clear-cut paragraphs and emits findings in the prompt's JSON schema.
+Everything the rules cannot settle (ambiguous escalation paragraphs and any
+text without recognised trigger terms) is returned for the LLM, so only the
+paragraphs the rules did settle are kept out of the LLM call.
+"""
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+# ---------- Precompiled patterns ----------
+
+TRIGGER_RE = re.compile(
+    r"\b(CPI(?:-[UW])?|consumer\s+price\s+index|escalat\w*|annual\s+(?:adjustment|increase)s?|"
+    r"(?:rate|price|fee)\s+(?:increase|adjustment)s?|(?:rates|prices|fees)\s+(?:may|will|shall)\s+(?:be\s+)?(?:increase|adjust)\w*|"
+    r"indexation|COLA|cost[\s-]of[\s-]living|inflation)\b",
+    re.IGNORECASE
+)
+
+ADJUST_VERB_RE = re.compile(r"\b(increas\w*|adjust\w*|escalat\w*|index(?:ed|ation)|updat\w*|rais\w*)\b", re.IGNORECASE)
+
+CAP_RE = re.compile(
+    r"\b(not\s+to\s+exceed|shall\s+not\s+exceed|(?:will|may)\s+not\s+exceed|capped\s+at|cap\s+of|"
+    r"maximum\s+of|no\s+more\s+than|lesser\s+of|up\s+to|ceiling|limited\s+to|at\s+most)\b",
+    re.IGNORECASE
+)
+
+# Constructs the rules deliberately do not try to interpret
+UNSUPPORTED_RE = re.compile(
+    r"\b(greater\s+of|whichever\s+is\s+(?:greater|higher)|in\s+addition\s+to|plus|compound\w*|floor|"
+    r"minimum\s+increase|except|unless|notwithstanding)\b|\bCPI(?:-[UW])?\s*\+",
+    re.IGNORECASE
+)
+
+# How far after a ceiling phrase ("not to exceed", "capped at") its percentage may appear
+CAP_WINDOW_CHARS = 40
+
+NEGATION_RE = re.compile(
+    r"\b(no\s+(?:price\s+|rate\s+)?(?:escalation|increase|adjustment)s?|"
+    r"(?:shall|will|may)\s+not\s+(?:be\s+)?(?:increased|escalated|adjusted|subject\s+to)|"
+    r"fixed\s+for\s+the\s+(?:term|duration)|firm[\s-]fixed)\b",
+    re.IGNORECASE
+)
+
+PERCENT_RE = re.compile(r"(\d{1,3}(?:\.\d+)?)\s*(?:%|percent\b|per\s+cent\b)", re.IGNORECASE)
+
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+WORD_PERCENT_RE = re.compile(
+    r"\b(" + "|".join(_NUMBER_WORDS) + r")(\s+and\s+(?:a|one)[\s-]half)?\s+(?:percent|per\s+cent)\b",
+    re.IGNORECASE
+)
+
+INDEX_RE = re.compile(
+    r"\b(C-CPI-U|CPI-U|CPI-W|CPI|consumer\s+price\s+index(?:\s+for\s+all\s+urban\s+consumers)?|"
+    r"ECI|employment\s+cost\s+index|PPI|producer\s+price\s+index|HICP|RPI)\b",
+    re.IGNORECASE
+)
+
+FREQUENCY_PATTERNS = [
+    ("semi_annual", re.compile(r"\b(semi-?annual(?:ly)?|bi-?annual(?:ly)?|every\s+(?:six|6)\s+months|twice\s+(?:a|per)\s+year)\b", re.IGNORECASE)),
+    ("quarterly", re.compile(r"\b(quarterly|per\s+quarter|every\s+(?:three|3)\s+months)\b", re.IGNORECASE)),
+    ("monthly", re.compile(r"\b(monthly|per\s+month|every\s+month)\b", re.IGNORECASE)),
+    ("annual", re.compile(
+        r"\b(annual(?:ly)?|yearly|per\s+(?:annum|year)|each\s+(?:contract\s+)?year|anniversary|"
+        r"(?:every|once\s+per|each)\s+(?:12|twelve)[\s-]months?(?:\s+period)?)\b",
+        re.IGNORECASE
+    )),
+]
+
+PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n|\n")
+
+# ---------- Decision rules ----------
+
+STANDARD_ACTIONS = [
+    "Insert cap at 3.5% (preferred) or 4.0% (fallback).",
+    "Clarify CPI index variant and geography.",
+    "State increases are non-compounded and limited to once per 12 months."
+]
+
+RISK_BY_STATUS = {
+    "non_compliant": "high",
+    "missing_cap": "high",
+    "tighten": "medium",
+    "compliant": "low",
+}
+
+RISK_ORDER = ["none", "low", "medium", "high"]
+
+_INDEX_CANONICAL = {
+    "consumer price index for all urban consumers": "CPI-U",
+    "consumer price index": "CPI",
+    "employment cost index": "ECI",
+    "producer price index": "PPI",
+}
+
+
+def classify_cap(cap_percent: Optional[float]) -> Tuple[str, str]:
+    """Apply the prompt's decision rules to a stated cap"""
+    if cap_percent is None:
+        return "missing_cap", "Escalation with no explicit ceiling"
+    if cap_percent > 5:
+        return "non_compliant", f"Cap of {cap_percent:g}% exceeds 5%"
+    if cap_percent > 4:
+        return "tighten", f"Cap of {cap_percent:g}% should tighten to 3.5-4%"
+    return "compliant", f"Cap at {cap_percent:g}% meets target"
+
+
+def max_risk(*risks: Optional[str]) -> str:
+    """Return the highest of the given overall_risk values"""
+    best = "none"
+    for risk in risks:
+        if risk in RISK_ORDER and RISK_ORDER.index(risk) > RISK_ORDER.index(best):
+            best = risk
+    return best
+
+
+def _normalize_index(raw: str) -> str:
+    key = re.sub(r"\s+", " ", raw.strip().lower())
+    return _INDEX_CANONICAL.get(key, raw.strip().upper())
+
+
+def extract_percentages(text: str) -> List[float]:
+    """Return the distinct percentages stated in text, numeric or spelled out"""
+    values = {float(m.group(1)) for m in PERCENT_RE.finditer(text)}
+    for m in WORD_PERCENT_RE.finditer(text):
+        value = float(_NUMBER_WORDS[m.group(1).lower()])
+        if m.group(2):
+            value += 0.5
+        values.add(value)
+    return sorted(values)
+
+
+def extract_stated_cap(text: str) -> Optional[float]:
+    """Return the percentage stated right after a ceiling phrase, if exactly one is"""
+    caps = set()
+    for m in CAP_RE.finditer(text):
+        caps.update(extract_percentages(text[m.end():m.end() + CAP_WINDOW_CHARS]))
+    return caps.pop() if len(caps) == 1 else None
+
+
+def extract_frequencies(text: str) -> List[str]:
+    """Return the distinct escalation frequencies mentioned in text"""
+    return [name for name, pattern in FREQUENCY_PATTERNS if pattern.search(text)]
+
+
+def extract_indexes(text: str) -> List[str]:
+    """Return the distinct price indexes mentioned in text, in order of appearance"""
+    seen = []
+    for m in INDEX_RE.finditer(text):
+        name = _normalize_index(m.group(1))
+        if name not in seen:
+            seen.append(name)
+    return seen
+
+
+def _build_finding(clause_id: str, paragraph: str, triggers: List[str], cap: Optional[float],
+                   frequency: Optional[str], index: Optional[str]) -> Dict:
+    status, reason = classify_cap(cap)
+    basis = index or "CPI-U"
+    if basis == "CPI-U":
+        redline_basis = "CPI-U (U.S. city average, all items, non-seasonally adjusted)"
+    else:
+        redline_basis = basis
+
+    if status == "compliant":
+        preferred = "No change required; cap meets the 4% target."
+        fallback = None
+        redline = None
+    else:
+        preferred = f"Cap annual increases at the lesser of 3.5% or {basis}."
+        fallback = f"Cap annual increases at the lesser of 4.0% or {basis}."
+        redline = (
+            f"Annual fees may increase once per 12-month period by the lesser of {redline_basis} or 3.5%, "
+            f"non-compounded, with 30 days prior written notice."
+        )
+
+    return {
+        "clause_id": clause_id,
+        "section_hint": None,
+        "trigger_terms": triggers,
+        "original_text": paragraph,
+        "stated_cap_percent": cap,
+        "frequency": frequency,
+        "basis_index": index,
+        "compliance_status": status,
+        "reason": reason,
+        "recommendation_preferred": preferred,
+        "recommendation_fallback": fallback,
+        "suggested_redline_text": redline
+    }
+
+
+def evaluate_paragraph(paragraph: str, next_paragraph: str = "", clause_id: str = "ADM-E01") -> Tuple[str, Optional[Dict]]:
+    """
+    Evaluate one paragraph against the escalation rules
+
+    Returns:
+        ("skip", None) when the paragraph is not an escalation clause,
+        ("finding", finding) when the rules settle it, or
+        ("ambiguous", None) when it has to go to the LLM
+    """
+    trigger_matches = TRIGGER_RE.findall(paragraph)
+    if not trigger_matches:
+        return "skip", None
+
+    triggers = []
+    for t in trigger_matches:
+        term = re.sub(r"\s+", " ", t.strip())
+        if term.lower() not in (x.lower() for x in triggers):
+            triggers.append(term)
+
+    percents = extract_percentages(paragraph)
+    has_cap_words = bool(CAP_RE.search(paragraph))
+    has_verb = bool(ADJUST_VERB_RE.search(paragraph))
+
+    if NEGATION_RE.search(paragraph):
+        return ("ambiguous", None) if percents else ("skip", None)
+
+    if UNSUPPORTED_RE.search(paragraph):
+        return "ambiguous", None
+
+    frequencies = extract_frequencies(paragraph)
+    if len(frequencies) > 1 or (frequencies and frequencies[0] != "annual"):
+        # Non-annual escalators need an annualized cap recommendation
+        return "ambiguous", None
+    frequency = frequencies[0] if frequencies else None
+
+    indexes = extract_indexes(paragraph)
+    if len(indexes) > 1:
+        return "ambiguous", None
+    index = indexes[0] if indexes else None
+
+    if len(percents) > 1:
+        return "ambiguous", None
+
+    if len(percents) == 1:
+        cap = extract_stated_cap(paragraph)
+        if cap != percents[0]:
+            # A percentage that is not a stated ceiling (e.g. a fixed yearly increase)
+            return "ambiguous", None
+        return "finding", _build_finding(clause_id, paragraph, triggers, cap, frequency, index)
+
+    # No percentage stated in this paragraph
+    if has_cap_words or not has_verb:
+        # A ceiling without a number, or a bare mention of CPI/inflation
+        return "ambiguous", None
+    if extract_percentages(next_paragraph) or CAP_RE.search(next_paragraph):
+        # The cap may be stated in the following sub-clause
+        return "ambiguous", None
+    return "finding", _build_finding(clause_id, paragraph, triggers, None, frequency, index)
+
+
+def analyze_escalation_clauses(sow_text: str, clause_id: str = "ADM-E01") -> Tuple[Dict, List[str]]:
+    """
+    Classify escalation language in a SOW without calling the LLM
+
+    Args:
+        sow_text: Full extracted SOW text
+        clause_id: Clause identifier stamped on each finding
+
+    Returns:
+        Tuple of (analysis in the prompt's JSON schema, text segments the LLM still
+        has to review). The segments are the whole text when the rules settle
+        nothing, otherwise every paragraph they did not settle, in document order.
+    """
+    paragraphs = [p.strip() for p in PARAGRAPH_SPLIT_RE.split(sow_text)]
+    paragraphs = [p for p in paragraphs if p]
+
+    findings = []
+    ambiguous = 0
+    remaining = []
+    included = set()
+    for i, paragraph in enumerate(paragraphs):
+        if i in included:
+            # Already sent to the LLM with the paragraph before it
+            continue
+        next_paragraph = paragraphs[i + 1] if i + 1 < len(paragraphs) else ""
+        outcome, finding = evaluate_paragraph(paragraph, next_paragraph, clause_id)
+        if outcome == "finding":
+            findings.append(finding)
+        elif outcome == "ambiguous":
+            ambiguous += 1
+            # Keep a following sub-clause with the excerpt so the LLM sees any cap stated there
+            if next_paragraph and (extract_percentages(next_paragraph) or CAP_RE.search(next_paragraph)):
+                remaining.append(f"{paragraph}\n{next_paragraph}")
+                included.add(i + 1)
+            else:
+                remaining.append(paragraph)
+        else:
+            # No trigger terms the rules know, but the LLM may still recognise an escalation
+            remaining.append(paragraph)
+
+    if not findings:
+        remaining = [sow_text.strip()] if sow_text.strip() else []
+
+    overall_risk = max_risk(*(RISK_BY_STATUS[f["compliance_status"]] for f in findings))
+    needs_action = any(f["compliance_status"] != "compliant" for f in findings)
+
+    analysis = {
+        "detected": bool(findings),
+        "findings": findings,
+        "overall_risk": overall_risk,
+        "actions": list(STANDARD_ACTIONS) if needs_action else [],
+        "meta": {
+            "engine": "rules",
+            "rule_findings": len(findings),
+            "ambiguous_segments": ambiguous
+        }
+    }
+
+    logging.info(f"Rule engine: {len(findings)} findings, {ambiguous} ambiguous paragraphs, "
+                 f"{len(remaining)} segments left for the LLM")
+    return analysis, remaining
+
+
+def merge_rule_and_llm_analysis(rule_analysis: Dict, llm_analysis: Dict) -> Dict:
+    """Combine rule engine findings with the LLM's verdict on the ambiguous paragraphs"""
+    merged = dict(llm_analysis)
+    merged["findings"] = list(rule_analysis.get("findings", [])) + list(llm_analysis.get("findings", []) or [])
+    merged["detected"] = bool(rule_analysis.get("detected") or llm_analysis.get("detected"))
+    merged["overall_risk"] = max_risk(rule_analysis.get("overall_risk"), llm_analysis.get("overall_risk"))
+
+    actions = list(llm_analysis.get("actions", []) or [])
+    for action in rule_analysis.get("actions", []):
+        if action not in actions:
+            actions.append(action)
+    merged["actions"] = actions
+
+    merged.setdefault("meta", {})
+    merged["meta"] = {**merged["meta"], **rule_analysis.get("meta", {}), "engine": "rules+llm"}
+    return merged
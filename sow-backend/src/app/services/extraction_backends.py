@@ -0,0 +1,457 @@
+"""
+Pluggable text-extraction backends
+
+Backends are registered per file type and selected through configuration:
+
+    TEXT_EXTRACTOR_PDF   pypdf2 (default), pdfminer, pypdfium2
+    TEXT_EXTRACTOR_DOCX  docx-xml (default), python-docx
+
+PDF backends expose page-level access so the extraction pool in
+text_extraction_helpers can split documents into page ranges.
+"""
+import logging
+import os
+import re
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Type, Union
+from xml.etree.ElementTree import iterparse
+from .document_structure import Block
+
+try:
+    from PyPDF2 import PdfReader
+except Exception:
+    PdfReader = None
+
+try:
+    from pdfminer.high_level import extract_pages as pdfminer_extract_pages
+    from pdfminer.layout import LTTextContainer
+except Exception:
+    pdfminer_extract_pages = None
+    LTTextContainer = None
+
+try:
+    import pypdfium2
+except Exception:
+    pypdfium2 = None
+
+try:
+    from docx import Document
+except Exception:
+    Document = None
+
+DEFAULT_BACKENDS = {
+    "pdf": "pypdf2",
+    "docx": "docx-xml",
+}
+
+# Backends accept a file path or a seekable binary stream
+Source = Union[str, Path, BinaryIO]
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+TABLE_CELL_SEPARATOR = " | "
+
+
+def _part_order(name: str):
+    """Sort key putting word/header2.xml before word/header10.xml"""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+def open_source(source: Source):
+    """Path string for file paths; the stream rewound to the start for file-like objects"""
+    if hasattr(source, "read"):
+        source.seek(0)
+        return source
+    return str(source)
+
+
+class ExtractionBackend:
+    """Common interface for text extraction backends"""
+
+    name = ""
+    file_type = ""
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return True
+
+    def extract(self, path: Source) -> str:
+        """Extract the full text of a document"""
+        raise NotImplementedError
+
+
+class PdfBackend(ExtractionBackend):
+    """Base class for PDF backends with page-level access"""
+
+    file_type = "pdf"
+
+    def open(self, path: Source):
+        """Open a document handle used by page_count/page_text"""
+        raise NotImplementedError
+
+    def close(self, handle):
+        """Release a handle returned by open()"""
+
+    def page_count(self, path: Source) -> int:
+        handle = self.open(path)
+        try:
+            return self._count(handle)
+        finally:
+            self.close(handle)
+
+    def _count(self, handle) -> int:
+        raise NotImplementedError
+
+    def page_text(self, handle, index: int) -> str:
+        raise NotImplementedError
+
+    def _iter_handle_pages(self, handle, path: Source, start: int, end: int) -> Iterator[Optional[str]]:
+        for i in range(start, end):
+            try:
+                yield self.page_text(handle, i) or ""
+            except Exception as page_err:
+                logging.warning(f"[{self.name}] Failed to extract text from page {i + 1} in {path}: {page_err}")
+                yield None
+
+    def iter_page_texts(self, path: Source, start: int, end: int) -> Iterator[Optional[str]]:
+        """
+        Yield the text of pages [start, end); None for a page that failed to extract
+        """
+        handle = self.open(path)
+        try:
+            yield from self._iter_handle_pages(handle, path, start, end)
+        finally:
+            self.close(handle)
+
+    def extract(self, path: Source) -> str:
+        handle = self.open(path)
+        try:
+            pages = self._iter_handle_pages(handle, path, 0, self._count(handle))
+            return "\n".join(t for t in pages if t)
+        finally:
+            self.close(handle)
+
+
+class PyPDF2Backend(PdfBackend):
+    name = "pypdf2"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return PdfReader is not None
+
+    def open(self, path: Source):
+        return PdfReader(open_source(path))
+
+    def _count(self, handle) -> int:
+        return len(handle.pages)
+
+    def page_text(self, handle, index: int) -> str:
+        return handle.pages[index].extract_text()
+
+
+class PdfMinerBackend(PdfBackend):
+    """pdfminer.six layout analysis; slower than PyPDF2 but better reading order"""
+
+    name = "pdfminer"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return pdfminer_extract_pages is not None
+
+    def open(self, path: Source):
+        return open_source(path)
+
+    def page_count(self, path: Source) -> int:
+        from pdfminer.pdfpage import PDFPage
+        source = open_source(path)
+        if not isinstance(source, str):
+            return sum(1 for _ in PDFPage.get_pages(source))
+        with open(source, "rb") as fh:
+            return sum(1 for _ in PDFPage.get_pages(fh))
+
+    def iter_page_texts(self, path: Source, start: int, end: int) -> Iterator[Optional[str]]:
+        # pdfminer lays pages out in a single pass; a layout error aborts the range
+        for layout in pdfminer_extract_pages(open_source(path), page_numbers=range(start, end)):
+            yield "".join(el.get_text() for el in layout if isinstance(el, LTTextContainer))
+
+    def extract(self, path: Source) -> str:
+        pages = (
+            "".join(el.get_text() for el in layout if isinstance(el, LTTextContainer))
+            for layout in pdfminer_extract_pages(open_source(path))
+        )
+        return "\n".join(t for t in pages if t)
+
+
+class PdfiumBackend(PdfBackend):
+    """PDFium bindings; the fastest option when pypdfium2 is installed"""
+
+    name = "pypdfium2"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return pypdfium2 is not None
+
+    def open(self, path: Source):
+        return pypdfium2.PdfDocument(open_source(path))
+
+    def close(self, handle):
+        handle.close()
+
+    def _count(self, handle) -> int:
+        return len(handle)
+
+    def page_text(self, handle, index: int) -> str:
+        page = handle[index]
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range()
+        finally:
+            textpage.close()
+            page.close()
+
+
+class PythonDocxBackend(ExtractionBackend):
+    """python-docx DOM; body paragraphs only (tables, headers and footers are skipped)"""
+
+    name = "python-docx"
+    file_type = "docx"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return Document is not None
+
+    def extract(self, path: Source) -> str:
+        doc = Document(open_source(path))
+        return "\n".join(p.text for p in doc.paragraphs)
+
+
+class DocxXmlBackend(ExtractionBackend):
+    """
+    Streams the WordprocessingML parts with iterparse instead of building the DOM
+
+    Emits header text, then the body in document order, then footer text.
+    Table rows become one line each with cells joined by TABLE_CELL_SEPARATOR;
+    nested tables are flattened into their enclosing cell. Processed elements
+    are cleared as parsing proceeds, so memory stays bounded by the largest
+    paragraph or table row rather than the document size.
+
+    iter_blocks also reports each paragraph's heading level (from its style or
+    outline level) and its page, counted from explicit and last-rendered page
+    breaks, so the pages are only as accurate as the last layout Word saved.
+    """
+
+    name = "docx-xml"
+    file_type = "docx"
+
+    CONTAINERS = (W_NS + "body", W_NS + "hdr", W_NS + "ftr")
+    HEADING_STYLE_RE = re.compile(r"^heading\s*(\d)$", re.IGNORECASE)
+
+    def _heading_styles(self, zf: zipfile.ZipFile) -> Dict[str, int]:
+        """Map paragraph style ids to heading levels using word/styles.xml"""
+        levels = {}
+        try:
+            with zf.open("word/styles.xml") as xml:
+                for _, elem in iterparse(xml):
+                    if elem.tag != W_NS + "style":
+                        continue
+                    style_id = elem.get(W_NS + "styleId")
+                    name_el = elem.find(W_NS + "name")
+                    name = name_el.get(W_NS + "val", "") if name_el is not None else ""
+                    outline = elem.find(f"{W_NS}pPr/{W_NS}outlineLvl")
+                    level = None
+                    if outline is not None and outline.get(W_NS + "val", "").isdigit():
+                        level = int(outline.get(W_NS + "val")) + 1
+                    elif self.HEADING_STYLE_RE.match(name):
+                        level = int(self.HEADING_STYLE_RE.match(name).group(1))
+                    elif name.lower() == "title":
+                        level = 1
+                    if style_id and level is not None and level <= 9:
+                        levels[style_id] = level
+                    elem.clear()
+        except KeyError:
+            pass
+        return levels
+
+    def _style_level(self, style_id: Optional[str], styles: Dict[str, int]) -> Optional[int]:
+        if not style_id:
+            return None
+        if style_id in styles:
+            return styles[style_id]
+        match = self.HEADING_STYLE_RE.match(style_id)
+        return int(match.group(1)) if match else None
+
+    def _iter_part(self, xml, styles: Dict[str, int], page_state: Dict) -> Iterator[Block]:
+        """Yield (text, heading level, page) for the lines of one part (document, header or footer)"""
+        container = None
+        # One entry per open table: {"row": [cells], "cell": [paragraphs]}
+        tables: List[dict] = []
+        parts: List[str] = []
+        style_id = None
+        outline_level = None
+        block_page = page_state["page"]
+
+        for event, elem in iterparse(xml, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if tag in self.CONTAINERS:
+                    container = elem
+                elif tag == W_NS + "tbl":
+                    if not tables:
+                        block_page = page_state["page"]
+                    tables.append({"row": [], "cell": []})
+                elif tag == W_NS + "tr" and tables:
+                    tables[-1]["row"] = []
+                    if len(tables) == 1:
+                        block_page = page_state["page"]
+                elif tag == W_NS + "tc" and tables:
+                    tables[-1]["cell"] = []
+                elif tag == W_NS + "p" and not tables:
+                    block_page = page_state["page"]
+                continue
+
+            block = None
+            if tag == W_NS + "t":
+                if elem.text:
+                    parts.append(elem.text)
+                    page_state["pending_break"] = False
+            elif tag == W_NS + "tab":
+                parts.append("\t")
+            elif tag in (W_NS + "br", W_NS + "cr"):
+                parts.append("\n")
+                if elem.get(W_NS + "type") == "page":
+                    page_state["page"] += 1
+                    page_state["pending_break"] = True
+            elif tag == W_NS + "lastRenderedPageBreak":
+                # Word records the rendered break right after an explicit one; count it once
+                if page_state["pending_break"]:
+                    page_state["pending_break"] = False
+                else:
+                    page_state["page"] += 1
+            elif tag == W_NS + "pStyle":
+                style_id = elem.get(W_NS + "val")
+            elif tag == W_NS + "outlineLvl":
+                val = elem.get(W_NS + "val", "")
+                outline_level = int(val) + 1 if val.isdigit() and int(val) < 9 else None
+            elif tag == W_NS + "p":
+                text = "".join(parts)
+                parts = []
+                if tables:
+                    tables[-1]["cell"].append(text)
+                else:
+                    level = outline_level or self._style_level(style_id, styles)
+                    block = (text, level, block_page)
+                style_id = None
+                outline_level = None
+            elif tag == W_NS + "tc" and tables:
+                cell = " ".join(p.strip() for p in tables[-1]["cell"] if p.strip())
+                tables[-1]["row"].append(cell)
+            elif tag == W_NS + "tr" and tables:
+                cells = tables[-1]["row"]
+                # Spacer rows with no text are dropped
+                if any(cells):
+                    row = TABLE_CELL_SEPARATOR.join(cells)
+                    if len(tables) > 1:
+                        tables[-2]["cell"].append(row)
+                    else:
+                        block = (row, None, block_page)
+            elif tag == W_NS + "tbl" and tables:
+                tables.pop()
+
+            if block is not None:
+                yield block
+            if container is not None and tag in (W_NS + "p", W_NS + "tbl", W_NS + "sdt") and not tables:
+                # Drop everything parsed so far under the container
+                container.clear()
+
+    def _header_footer_parts(self, zf: zipfile.ZipFile):
+        """Header and footer part names from the document relationships, in part order"""
+        headers, footers = [], []
+        try:
+            with zf.open("word/_rels/document.xml.rels") as rels:
+                for _, elem in iterparse(rels):
+                    rel_type = elem.get("Type", "")
+                    target = elem.get("Target", "")
+                    if rel_type.endswith("/header"):
+                        headers.append("word/" + target.lstrip("/").replace("word/", "", 1))
+                    elif rel_type.endswith("/footer"):
+                        footers.append("word/" + target.lstrip("/").replace("word/", "", 1))
+        except KeyError:
+            pass
+        return sorted(headers, key=_part_order), sorted(footers, key=_part_order)
+
+    def _iter_headers_footers(self, zf: zipfile.ZipFile, names: List[str], page_state: Dict) -> Iterator[Block]:
+        seen = set()
+        for name in names:
+            try:
+                with zf.open(name) as xml:
+                    # Header/footer text is repeated page furniture, never a section heading
+                    lines = [text for text, _, _ in self._iter_part(xml, {}, page_state) if text.strip()]
+            except KeyError:
+                continue
+            # First-page/even-page variants often repeat the default header
+            key = tuple(lines)
+            if lines and key not in seen:
+                seen.add(key)
+                for line in lines:
+                    yield line, None, page_state["page"]
+
+    def iter_blocks(self, path: Source) -> Iterator[Block]:
+        """Yield (text, heading level, page) per output line in document order"""
+        with zipfile.ZipFile(open_source(path)) as zf:
+            styles = self._heading_styles(zf)
+            page_state = {"page": 1, "pending_break": False}
+            headers, footers = self._header_footer_parts(zf)
+            yield from self._iter_headers_footers(zf, headers, page_state)
+            with zf.open("word/document.xml") as xml:
+                yield from self._iter_part(xml, styles, page_state)
+            yield from self._iter_headers_footers(zf, footers, page_state)
+
+    def iter_lines(self, path: Source) -> Iterator[str]:
+        for text, _, _ in self.iter_blocks(path):
+            yield text
+
+    def extract(self, path: Source) -> str:
+        return "\n".join(self.iter_lines(path))
+
+
+_REGISTRY: Dict[str, Dict[str, Type[ExtractionBackend]]] = {"pdf": {}, "docx": {}}
+
+
+def register_backend(backend_cls: Type[ExtractionBackend]):
+    """Register a backend class under its file type and name"""
+    _REGISTRY.setdefault(backend_cls.file_type, {})[backend_cls.name] = backend_cls
+    return backend_cls
+
+
+for _backend in (PyPDF2Backend, PdfMinerBackend, PdfiumBackend, PythonDocxBackend, DocxXmlBackend):
+    register_backend(_backend)
+
+
+def available_backends(file_type: str) -> List[str]:
+    """Names of the registered backends for a file type whose dependencies are installed"""
+    return [name for name, cls in _REGISTRY.get(file_type, {}).items() if cls.is_available()]
+
+
+def get_backend(file_type: str, name: Optional[str] = None) -> ExtractionBackend:
+    """
+    Resolve the extraction backend for a file type
+
+    Args:
+        file_type: 'pdf' or 'docx'
+        name: Backend name; defaults to TEXT_EXTRACTOR_<TYPE> or the built-in default
+
+    Returns:
+        Backend instance (falls back to the default backend if the requested one is unavailable)
+    """
+    default = DEFAULT_BACKENDS[file_type]
+    name = (name or os.getenv(f"TEXT_EXTRACTOR_{file_type.upper()}", default)).lower()
+    backend_cls = _REGISTRY[file_type].get(name)
+
+    if backend_cls is None:
+        logging.warning(f"Unknown {file_type} extractor '{name}'; using {default}")
+        backend_cls = _REGISTRY[file_type][default]
+    elif not backend_cls.is_available():
+        logging.warning(f"{file_type} extractor '{name}' is not installed; using {default}")
+        backend_cls = _REGISTRY[file_type][default]
+
+    return backend_cls()
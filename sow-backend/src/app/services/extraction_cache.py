@@ -0,0 +1,87 @@
+"""
+On-disk cache of extracted documents (text + section tree) keyed by content hash
+
+Entries are gzip-compressed JSON under resources/cache/extraction, so repeat
+analyses of the same upload skip extraction entirely.
+"""
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional, Union, BinaryIO
+from src.app.utils.result_codec import decode_result, encode_result
+
+# Bump when the extracted document format or extraction output changes
+EXTRACTION_CACHE_VERSION = 2
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[3] / "resources" / "cache" / "extraction"
+
+
+def content_hash(source: Union[Path, BinaryIO], chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 hex digest of a file or seekable stream (the stream position is restored)"""
+    digest = hashlib.sha256()
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as fh:
+            for chunk in iter(lambda: fh.read(chunk_size), b""):
+                digest.update(chunk)
+    else:
+        position = source.tell()
+        source.seek(0)
+        for chunk in iter(lambda: source.read(chunk_size), b""):
+            digest.update(chunk)
+        source.seek(position)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """Content-addressed cache of extracted documents"""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir or os.getenv("EXTRACTION_CACHE_DIR", str(DEFAULT_CACHE_DIR)))
+        self.enabled = os.getenv("EXTRACTION_CACHE", "true").lower() == "true"
+        self.max_entries = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "1000"))
+
+    def _path(self, digest: str, backend: str) -> Path:
+        return self.cache_dir / f"{digest}.{backend}.v{EXTRACTION_CACHE_VERSION}.json.gz"
+
+    def get(self, digest: str, backend: str) -> Optional[Dict]:
+        """Cached extracted document, or None"""
+        if not self.enabled:
+            return None
+        path = self._path(digest, backend)
+        try:
+            document = decode_result(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable extraction cache entry {path.name}: {e}")
+            return None
+        logging.info(f"Extraction cache hit for {digest[:12]} ({backend})")
+        return document
+
+    def put(self, digest: str, backend: str, document: Dict):
+        """Store an extracted document; failures are logged and ignored"""
+        if not self.enabled:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(digest, backend)
+            payload, _ = encode_result(document, "gzip")
+            tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(payload)
+            os.replace(tmp_path, path)
+            self._evict()
+        except Exception as e:
+            logging.warning(f"Failed to write extraction cache entry for {digest[:12]}: {e}")
+
+    def _evict(self):
+        """Keep at most EXTRACTION_CACHE_MAX_ENTRIES entries, dropping the least recently written"""
+        entries = list(self.cache_dir.glob("*.json.gz"))
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda p: p.stat().st_mtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
@@ -1,23 +1,64 @@
 import json
 import logging
 from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
 from src.app.services.text_extraction_helpers import extract_text
+from src.app.services.document_structure import chunk_by_sections, locate_findings
 
-def fallback_chunk_and_call(system_prompt: str, sow_text: str, call_llm_single=None, OUT_DIR: Path = None):
-    """
-    If a document exceeds size limits, a safe fallback is to chunk the SOW,
-    call the model on each chunk and then aggregate results. This function
-    provides a simple chunking strategy (not as robust as streaming).
-    """
-    max_chunk = 20000  # characters per chunk (tune)
-    chunks = [sow_text[i:i+max_chunk] for i in range(0, len(sow_text), max_chunk)]
-    aggregated = {
+DEFAULT_ACTIONS = [
+    "Insert cap at 3.5% (preferred) or 4.0% (fallback).",
+    "Clarify CPI index variant and geography.",
+    "State increases are non-compounded and limited to once per 12 months."
+]
+
+
+def new_aggregate() -> Dict:
+    """Empty aggregated analysis that chunk results are merged into"""
+    return {
         "detected": False,
         "findings": [],
         "overall_risk": "none",
         "actions": [],
-        "meta": {"aggregation": True, "chunks": len(chunks)}
+        "meta": {"aggregation": True, "chunks": 0}
     }
+
+
+def merge_chunk_result(aggregated: Dict, parsed: Dict):
+    """Merge one chunk's parsed analysis into the aggregate (findings and actions appended, risk escalated)"""
+    aggregated["meta"]["chunks"] += 1
+    if parsed.get("detected"):
+        aggregated["detected"] = True
+    aggregated["findings"].extend(parsed.get("findings", []))
+    for action in parsed.get("actions", []) or []:
+        if action not in aggregated["actions"]:
+            aggregated["actions"].append(action)
+    # escalate risk
+    if parsed.get("overall_risk") == "high":
+        aggregated["overall_risk"] = "high"
+    elif parsed.get("overall_risk") == "medium" and aggregated["overall_risk"] != "high":
+        aggregated["overall_risk"] = "medium"
+    elif parsed.get("overall_risk") == "low" and aggregated["overall_risk"] not in ("high","medium"):
+        aggregated["overall_risk"] = "low"
+
+
+def finalize_aggregate(aggregated: Dict) -> Dict:
+    """Standard CPI escalation actions once all chunks are merged (escalation fallback only)"""
+    if aggregated["findings"]:
+        aggregated["actions"] = list(DEFAULT_ACTIONS)
+    return aggregated
+
+
+def fallback_chunk_and_call(system_prompt: str, sow_text: str, call_llm_single=None, OUT_DIR: Path = None,
+                            sections: Optional[List[Dict]] = None):
+    """
+    If a document exceeds size limits, a safe fallback is to chunk the SOW,
+    call the model on each chunk and then aggregate results. Chunks break on
+    section boundaries when the section tree is given, and on line boundaries
+    otherwise, so clauses are not cut in half.
+    """
+    max_chunk = 20000  # characters per chunk (tune)
+    chunks = chunk_by_sections(sow_text, sections or [], max_chunk)
+    aggregated = new_aggregate()
     for idx, chunk in enumerate(chunks, start=1):
         user = None
         if call_llm_single:
@@ -29,26 +70,53 @@ def fallback_chunk_and_call(system_prompt: str, sow_text: str, call_llm_single=N
         raw = user.get("raw")
         # If parsed join findings; crude merging: append findings and set detected True if any
         if parsed and isinstance(parsed, dict):
-            if parsed.get("detected"):
-                aggregated["detected"] = True
-            aggregated["findings"].extend(parsed.get("findings", []))
-            # escalate risk
-            if parsed.get("overall_risk") == "high":
-                aggregated["overall_risk"] = "high"
-            elif parsed.get("overall_risk") == "medium" and aggregated["overall_risk"] != "high":
-                aggregated["overall_risk"] = "medium"
-            elif parsed.get("overall_risk") == "low" and aggregated["overall_risk"] not in ("high","medium"):
-                aggregated["overall_risk"] = "low"
+            merge_chunk_result(aggregated, parsed)
         else:
             # Save raw for debugging
             if OUT_DIR:
                 raw_path = OUT_DIR / f"fallback_raw_chunk_{idx}.txt"
                 raw_path.write_text(raw or "NO_RAW", encoding="utf-8")
-    # Basic actions
-    if aggregated["findings"]:
-        aggregated["actions"] = [
-            "Insert cap at 3.5% (preferred) or 4.0% (fallback).",
-            "Clarify CPI index variant and geography.",
-            "State increases are non-compounded and limited to once per 12 months."
-        ]
-    return aggregated
+    return finalize_aggregate(aggregated)
+
+
+def windowed_chunk_and_call(prompts: Dict[str, str], windows: Iterable[Dict],
+                            analyze_chunk: Callable[[str, str, str], Optional[Dict]],
+                            max_chunk: int = 20000) -> Dict[str, Dict]:
+    """
+    Run every prompt over a document delivered as page-range windows
+
+    Windows (see iter_pdf_text_windows) are consumed one at a time; each is
+    split on section boundaries and every chunk is analysed with every prompt,
+    so only the current window's text and the per-prompt aggregates are held.
+
+    Args:
+        prompts: Mapping of prompt name to system prompt
+        windows: Iterable of extracted window documents
+        analyze_chunk: Callable(prompt_name, system_prompt, chunk_text) returning a
+            parsed analysis dict, or None if the chunk failed
+        max_chunk: Characters per LLM call
+
+    Returns:
+        Mapping of prompt name to aggregated analysis
+    """
+    aggregates = {name: new_aggregate() for name in prompts}
+    window_count = 0
+    truncated = False
+    for window in windows:
+        window_count += 1
+        truncated = truncated or window.get("truncated", False)
+        chunks = chunk_by_sections(window["text"], window.get("sections", []), max_chunk)
+        for chunk in chunks:
+            if not chunk.strip():
+                continue
+            for prompt_name, system_prompt in prompts.items():
+                parsed = analyze_chunk(prompt_name, system_prompt, chunk)
+                if parsed and isinstance(parsed, dict):
+                    # Page numbers are absolute, so findings map straight to the source page
+                    locate_findings(parsed.get("findings", []), window)
+                    merge_chunk_result(aggregates[prompt_name], parsed)
+
+    # Actions come from the chunk results; DEFAULT_ACTIONS are escalation-specific
+    for aggregated in aggregates.values():
+        aggregated["meta"].update({"windows": window_count, "truncated": truncated})
+    return aggregates
@@ -3,14 +3,63 @@ File Management Service
 Handles document metadata tracking and user ownership
 """
 import logging
+import os
 from typing import Optional, List, Dict, Any
 from datetime import datetime
-from src.app.db.client import get_db_connection_dict
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from src.app.db.client import db_connection
+from src.app.db.async_client import async_db_connection, execute_query_async
+import psycopg2.extras
+from src.app.services.escalation_rules import RISK_ORDER
+from src.app.utils.pagination import InvalidCursorError, decode_cursor, encode_cursor
 
 logger = logging.getLogger(__name__)
 
+# Sortable columns for list_documents; each has an (column, id) index on live rows
+DOCUMENT_SORT_COLUMNS = ("upload_date", "original_filename", "file_size_bytes")
+
+# Largest SERIAL id; (date, id) < (cursor date, MAX_ROW_ID) means "on or before cursor date"
+MAX_ROW_ID = 2147483647
+
+# Analysis history columns shared by both branches of the history query
+HISTORY_DOCUMENT_COLUMNS = """
+    ud.id as document_id,
+    ud.blob_name as source_blob,
+    ud.original_filename,
+    ud.file_size_bytes,
+    ud.upload_date,
+    ud.uploaded_by,
+    ud.analysis_status,
+    ud.last_analyzed_at,
+    u.full_name as uploaded_by_name,
+    u.email as uploaded_by_email
+"""
+
+# Document row plus the access decision from user_can_view_document()
+ACCESSIBLE_DOCUMENT_QUERY = """
+    SELECT ud.*, user_can_view_document(%s, ud.id) as can_access
+    FROM uploaded_documents ud
+    WHERE ud.blob_name = %s AND ud.is_deleted = FALSE
+"""
+
+# Access check and status change in one statement; the UPDATE only runs when access is granted
+CLAIM_DOCUMENT_QUERY = """
+    WITH doc AS (
+        SELECT ud.id, user_can_view_document(%s, ud.id) as can_access
+        FROM uploaded_documents ud
+        WHERE ud.blob_name = %s AND ud.is_deleted = FALSE
+    ),
+    claimed AS (
+        UPDATE uploaded_documents ud
+        SET analysis_status = 'processing', updated_at = NOW()
+        FROM doc
+        WHERE ud.id = doc.id AND doc.can_access
+        RETURNING ud.*
+    )
+    SELECT claimed.*, doc.can_access
+    FROM doc
+    LEFT JOIN claimed ON claimed.id = doc.id
+"""
+
 
 class FileManagementService:
     """Service for managing uploaded document metadata and permissions"""
@@ -23,7 +72,8 @@ class FileManagementService:
         content_type: str,
         uploaded_by: int,
         blob_url: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        content_hash: Optional[str] = None
     ) -> Optional[int]:
         """
         Create a new document record in uploaded_documents table
@@ -36,39 +86,40 @@ class FileManagementService:
             uploaded_by: User ID who uploaded the file
             blob_url: Optional full Azure blob URL
             metadata: Optional custom metadata as dict
+            content_hash: Optional SHA-256 of the file, computed during upload
             
         Returns:
             Document ID if successful, None otherwise
         """
         try:
-            conn = get_db_connection_dict()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            # Extract file extension
-            file_extension = original_filename.rsplit('.', 1)[-1] if '.' in original_filename else ''
-            
-            query = """
-                INSERT INTO uploaded_documents (
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                # Extract file extension
+                file_extension = original_filename.rsplit('.', 1)[-1] if '.' in original_filename else ''
+                
+                query = """
+                    INSERT INTO uploaded_documents (
+                        blob_name, original_filename, file_size_bytes, content_type,
+                        uploaded_by, blob_url, file_extension, metadata, content_hash
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                """
+                
+                cursor.execute(query, (
                     blob_name, original_filename, file_size_bytes, content_type,
-                    uploaded_by, blob_url, file_extension, metadata
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """
-            
-            cursor.execute(query, (
-                blob_name, original_filename, file_size_bytes, content_type,
-                uploaded_by, blob_url, file_extension, 
-                psycopg2.extras.Json(metadata) if metadata else None
-            ))
-            
-            result = cursor.fetchone()
-            conn.commit()
-            
-            document_id = result['id'] if result else None
-            
-            cursor.close()
-            conn.close()
+                    uploaded_by, blob_url, file_extension, 
+                    psycopg2.extras.Json(metadata) if metadata else None,
+                    content_hash
+                ))
+                
+                result = cursor.fetchone()
+                conn.commit()
+                
+                document_id = result['id'] if result else None
+                
+                cursor.close()
             
             if document_id:
                 logger.info(f"Created document record ID {document_id} for {blob_name} by user {uploaded_by}")
@@ -97,20 +148,19 @@ class FileManagementService:
             List of document dictionaries
         """
         try:
-            conn = get_db_connection_dict()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            # Use database function that handles permission checking
-            query = """
-                SELECT * FROM get_user_documents(%s)
-                LIMIT %s
-            """
-            
-            cursor.execute(query, (user_id, limit))
-            documents = cursor.fetchall()
-            
-            cursor.close()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                # Use database function that handles permission checking
+                query = """
+                    SELECT * FROM get_user_documents(%s)
+                    LIMIT %s
+                """
+                
+                cursor.execute(query, (user_id, limit))
+                documents = cursor.fetchall()
+                
+                cursor.close()
             
             return [dict(doc) for doc in documents]
             
@@ -118,6 +168,333 @@ class FileManagementService:
             logger.error(f"Error getting user documents: {e}", exc_info=True)
             return []
     
+    @staticmethod
+    async def get_user_documents_async(
+        user_id: int,
+        include_deleted: bool = False,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Async variant of get_user_documents() for async endpoints"""
+        try:
+            return await execute_query_async(
+                "SELECT * FROM get_user_documents(%s) LIMIT %s",
+                (user_id, limit)
+            )
+        
+        except Exception as e:
+            logger.error(f"Error getting user documents: {e}", exc_info=True)
+            return []
+    
+    @staticmethod
+    async def get_document_stats_async(uploaded_by: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Live document count and size, in total and per analysis status
+        
+        Computed with a grouped aggregate over uploaded_documents, or read from
+        the trigger-maintained document_stats_rollup table when
+        DOCUMENT_STATS_ROLLUP=true (see add_document_stats_rollup.sql), which
+        costs a few rows regardless of how many documents there are.
+        
+        Args:
+            uploaded_by: Only documents uploaded by this user (None = all users)
+            
+        Returns:
+            dict with total_documents, total_size_bytes and status_counts
+        """
+        conditions, params = [], []
+        if uploaded_by is not None:
+            conditions.append("uploaded_by = %s")
+            params.append(uploaded_by)
+        
+        rows = None
+        if os.getenv("DOCUMENT_STATS_ROLLUP", "false").lower() == "true":
+            where = " AND ".join(conditions + ["document_count > 0"])
+            try:
+                rows = await execute_query_async(f"""
+                    SELECT analysis_status,
+                           SUM(document_count) as document_count,
+                           SUM(total_size_bytes) as total_size_bytes
+                    FROM document_stats_rollup
+                    WHERE {where}
+                    GROUP BY analysis_status
+                """, tuple(params))
+            except Exception as e:
+                logger.warning(f"Document stats rollup unavailable, aggregating instead: {e}")
+        
+        if rows is None:
+            where = " AND ".join(["is_deleted = FALSE"] + conditions)
+            try:
+                rows = await execute_query_async(f"""
+                    SELECT COALESCE(analysis_status, 'pending') as analysis_status,
+                           COUNT(*) as document_count,
+                           COALESCE(SUM(file_size_bytes), 0) as total_size_bytes
+                    FROM uploaded_documents
+                    WHERE {where}
+                    GROUP BY COALESCE(analysis_status, 'pending')
+                """, tuple(params))
+            except Exception as e:
+                logger.error(f"Error getting document stats: {e}", exc_info=True)
+                rows = []
+        
+        status_counts = {row['analysis_status']: int(row['document_count']) for row in rows}
+        return {
+            "total_documents": sum(status_counts.values()),
+            "total_size_bytes": sum(int(row['total_size_bytes']) for row in rows),
+            "status_counts": status_counts
+        }
+    
+    @staticmethod
+    def list_documents(
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        sort: str = "upload_date",
+        order: str = "desc",
+        status: Optional[str] = None,
+        content_type: Optional[str] = None,
+        uploaded_by: Optional[int] = None,
+        prefix: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        List uploaded documents with keyset pagination
+        
+        Pages are ordered by (sort column, id), so each page is an index range
+        scan from the previous page's last row instead of an OFFSET.
+        
+        Args:
+            limit: Page size
+            cursor: next_cursor from the previous page
+            sort: upload_date, original_filename or file_size_bytes
+            order: asc or desc
+            status: Optional analysis_status filter
+            content_type: Optional MIME type filter
+            uploaded_by: Optional uploader user ID filter
+            prefix: Optional blob name prefix
+        
+        Returns:
+            dict with documents and next_cursor (None on the last page)
+        
+        Raises:
+            ValueError: Unknown sort/order, or InvalidCursorError for a bad cursor
+        """
+        if sort not in DOCUMENT_SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort: {sort}")
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Unsupported order: {order}")
+        position = decode_cursor(cursor, expect={"sort": sort, "order": order})
+        
+        conditions = ["is_deleted = FALSE"]
+        params: List[Any] = []
+        if status:
+            conditions.append("analysis_status = %s")
+            params.append(status)
+        if content_type:
+            conditions.append("content_type = %s")
+            params.append(content_type)
+        if uploaded_by is not None:
+            conditions.append("uploaded_by = %s")
+            params.append(uploaded_by)
+        if prefix:
+            conditions.append("blob_name LIKE %s")
+            params.append(prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if position:
+            comparison = "<" if order == "desc" else ">"
+            conditions.append(f"({sort}, id) {comparison} (%s, %s)")
+            params.extend([position["value"], position["id"]])
+        
+        query = f"""
+            SELECT id, blob_name, original_filename, file_size_bytes, content_type,
+                   upload_date, updated_at, uploaded_by, analysis_status, last_analyzed_at,
+                   preprocessing_status, metadata
+            FROM uploaded_documents
+            WHERE {" AND ".join(conditions)}
+            ORDER BY {sort} {order}, id {order}
+            LIMIT %s
+        """
+        params.append(limit + 1)
+        
+        try:
+            with db_connection() as conn:
+                db_cursor = conn.cursor()
+                
+                db_cursor.execute(query, params)
+                rows = [dict(row) for row in db_cursor.fetchall()]
+                
+                db_cursor.close()
+        
+        except Exception as e:
+            logger.error(f"Error listing documents: {e}", exc_info=True)
+            return {"documents": [], "next_cursor": None}
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor({"sort": sort, "order": order, "value": last[sort], "id": last["id"]})
+        
+        return {"documents": rows, "next_cursor": next_cursor}
+    
+    @staticmethod
+    async def get_analysis_history_async(
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        uploaded_by: Optional[int] = None,
+        status: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        risk: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Analysis history, newest first, with keyset pagination
+        
+        History has one row per analysis result plus one row per live document
+        that has never been analysed. The two kinds are read by separate
+        branches, each an index range scan in its own date order
+        (analysis_results.analysis_date / uploaded_documents.upload_date),
+        and merged on (history_date, history_kind, history_id). Pages continue
+        from the previous page's last row instead of an OFFSET.
+        
+        Args:
+            limit: Page size
+            cursor: next_cursor from the previous page
+            uploaded_by: Only documents uploaded by this user
+            status: Analysis result status, or analysis_status for unanalysed documents
+            date_from: History date lower bound (inclusive)
+            date_to: History date upper bound (exclusive)
+            risk: Overall risk of the analysis (none, low, medium, high)
+        
+        Returns:
+            dict with rows and next_cursor (None on the last page)
+        
+        Raises:
+            ValueError: Unknown risk level, or InvalidCursorError for a bad cursor
+        """
+        if risk is not None and risk not in RISK_ORDER:
+            raise ValueError(f"Unsupported risk: {risk}")
+        position = decode_cursor(cursor, expect={"list": "analysis_history"})
+        if position and not (
+            isinstance(position.get("date"), datetime)
+            and position.get("kind") in (0, 1)
+            and isinstance(position.get("id"), int)
+        ):
+            raise InvalidCursorError("Invalid cursor")
+        
+        def branch_conditions(kind: int, date_column: str, id_column: str, status_column: str):
+            conditions, params = [], []
+            if uploaded_by is not None:
+                conditions.append("ud.uploaded_by = %s")
+                params.append(uploaded_by)
+            if status:
+                conditions.append(f"{status_column} = %s")
+                params.append(status)
+            if date_from:
+                conditions.append(f"{date_column} >= %s")
+                params.append(date_from)
+            if date_to:
+                conditions.append(f"{date_column} < %s")
+                params.append(date_to)
+            if position:
+                # (date, kind, id) < cursor, with kind fixed within a branch
+                if kind == position["kind"]:
+                    bound_id = position["id"]
+                else:
+                    bound_id = 0 if kind > position["kind"] else MAX_ROW_ID
+                conditions.append(f"({date_column}, {id_column}) < (%s, %s)")
+                params.extend([position["date"], bound_id])
+            return "".join(f" AND {c}" for c in conditions), params
+        
+        analysed_filter, analysed_params = branch_conditions(1, "ar.analysis_date", "ar.id", "ar.status")
+        if risk:
+            analysed_filter += " AND ar.overall_risk = %s"
+            analysed_params.append(risk)
+        
+        branches = [f"""
+            (SELECT 
+                {HISTORY_DOCUMENT_COLUMNS},
+                ar.id as analysis_id,
+                ar.result_blob_name,
+                ar.analyzed_by,
+                ar.analysis_date,
+                ar.analysis_duration_ms,
+                ar.status as analysis_result_status,
+                ar.overall_risk,
+                ar.error_message,
+                ar.prompts_executed,
+                ar.pdf_blob_name,
+                ar.pdf_generated_at,
+                analyzer.full_name as analyzed_by_name,
+                ar.analysis_date as history_date,
+                1 as history_kind,
+                ar.id as history_id
+            FROM analysis_results ar
+            JOIN uploaded_documents ud ON ud.id = ar.document_id
+            LEFT JOIN users u ON ud.uploaded_by = u.id
+            LEFT JOIN users analyzer ON ar.analyzed_by = analyzer.id
+            WHERE ud.is_deleted = FALSE{analysed_filter}
+            ORDER BY ar.analysis_date DESC, ar.id DESC
+            LIMIT %s)
+        """]
+        params = analysed_params + [limit + 1]
+        
+        # Documents that were never analysed carry no risk, so a risk filter skips them
+        if not risk:
+            pending_filter, pending_params = branch_conditions(
+                0, "ud.upload_date", "ud.id", "COALESCE(ud.analysis_status, 'pending')"
+            )
+            branches.append(f"""
+            (SELECT 
+                {HISTORY_DOCUMENT_COLUMNS},
+                NULL as analysis_id,
+                NULL as result_blob_name,
+                NULL as analyzed_by,
+                NULL as analysis_date,
+                NULL as analysis_duration_ms,
+                NULL as analysis_result_status,
+                NULL as overall_risk,
+                NULL as error_message,
+                NULL as prompts_executed,
+                NULL as pdf_blob_name,
+                NULL as pdf_generated_at,
+                NULL as analyzed_by_name,
+                ud.upload_date as history_date,
+                0 as history_kind,
+                ud.id as history_id
+            FROM uploaded_documents ud
+            LEFT JOIN users u ON ud.uploaded_by = u.id
+            WHERE ud.is_deleted = FALSE
+              AND ud.last_analyzed_at IS NULL
+              AND NOT EXISTS (SELECT 1 FROM analysis_results ar WHERE ar.document_id = ud.id){pending_filter}
+            ORDER BY ud.upload_date DESC, ud.id DESC
+            LIMIT %s)
+            """)
+            params += pending_params + [limit + 1]
+        
+        query = f"""
+            SELECT * FROM ({" UNION ALL ".join(branches)}) history
+            ORDER BY history_date DESC, history_kind DESC, history_id DESC
+            LIMIT %s
+        """
+        params.append(limit + 1)
+        
+        try:
+            rows = await execute_query_async(query, tuple(params))
+        
+        except Exception as e:
+            logger.error(f"Error fetching analysis history: {e}", exc_info=True)
+            return {"rows": [], "next_cursor": None}
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor({
+                "list": "analysis_history",
+                "date": last["history_date"],
+                "kind": last["history_kind"],
+                "id": last["history_id"]
+            })
+        
+        return {"rows": rows, "next_cursor": next_cursor}
+    
     @staticmethod
     def get_document_by_blob_name(blob_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -130,19 +507,18 @@ class FileManagementService:
             Document dict or None
         """
         try:
-            conn = get_db_connection_dict()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            query = """
-                SELECT * FROM uploaded_documents
-                WHERE blob_name = %s AND is_deleted = FALSE
-            """
-            
-            cursor.execute(query, (blob_name,))
-            document = cursor.fetchone()
-            
-            cursor.close()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                query = """
+                    SELECT * FROM uploaded_documents
+                    WHERE blob_name = %s AND is_deleted = FALSE
+                """
+                
+                cursor.execute(query, (blob_name,))
+                document = cursor.fetchone()
+                
+                cursor.close()
             
             return dict(document) if document else None
             
@@ -151,46 +527,138 @@ class FileManagementService:
             return None
     
     @staticmethod
-    def user_can_access_document(user_id: int, blob_name: str) -> bool:
+    def get_accessible_document(user_id: int, blob_name: str) -> Optional[Dict[str, Any]]:
         """
-        Check if user has permission to access a document
+        Get document metadata together with the user's access decision
+        
+        One query replaces user_can_access_document() followed by
+        get_document_by_blob_name(); callers keep the row for the rest of the
+        request instead of looking it up again.
         
         Args:
             user_id: User ID checking access
             blob_name: Document blob name
             
         Returns:
-            True if user can access, False otherwise
+            Document dict with a can_access flag, or None if the document does not exist
         """
         try:
-            conn = get_db_connection_dict()
-            cursor = conn.cursor()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(ACCESSIBLE_DOCUMENT_QUERY, (user_id, blob_name))
+                document = cursor.fetchone()
+                cursor.close()
             
-            # Get document ID from blob name
-            cursor.execute(
-                "SELECT id FROM uploaded_documents WHERE blob_name = %s AND is_deleted = FALSE",
-                (blob_name,)
-            )
-            result = cursor.fetchone()
+            return dict(document) if document else None
+            
+        except Exception as e:
+            logger.error(f"Error getting accessible document: {e}", exc_info=True)
+            return None
+    
+    @staticmethod
+    async def get_accessible_document_async(user_id: int, blob_name: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get_accessible_document() for async endpoints"""
+        try:
+            return await execute_query_async(ACCESSIBLE_DOCUMENT_QUERY, (user_id, blob_name), fetch_one=True)
             
-            if not result:
+        except Exception as e:
+            logger.error(f"Error getting accessible document: {e}", exc_info=True)
+            return None
+    
+    @staticmethod
+    def claim_document_for_analysis(user_id: int, blob_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Check access and mark the document as processing in one statement
+        
+        Replaces the access check, document lookup and status update that
+        processing endpoints used to run separately. The status is only changed
+        when the user can access the document.
+        
+        Args:
+            user_id: User ID starting the analysis
+            blob_name: Document blob name
+            
+        Returns:
+            Updated document dict with can_access=True, {"can_access": False}
+            if the user may not access it, or None if it does not exist
+        """
+        try:
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(CLAIM_DOCUMENT_QUERY, (user_id, blob_name))
+                document = cursor.fetchone()
+                conn.commit()
                 cursor.close()
-                conn.close()
-                return False
             
-            # RealDictCursor returns dict, access by column name
-            document_id = result['id']
+            return FileManagementService._claimed(document)
             
-            # Use database function to check permission
-            cursor.execute(
-                "SELECT user_can_view_document(%s, %s) as can_access",
-                (user_id, document_id)
-            )
+        except Exception as e:
+            logger.error(f"Error claiming document for analysis: {e}", exc_info=True)
+            return None
+    
+    @staticmethod
+    async def claim_document_for_analysis_async(user_id: int, blob_name: str) -> Optional[Dict[str, Any]]:
+        """Async variant of claim_document_for_analysis() for async endpoints"""
+        try:
+            async with async_db_connection() as conn:
+                cursor = await conn.execute(CLAIM_DOCUMENT_QUERY, (user_id, blob_name))
+                document = await cursor.fetchone()
+                await conn.commit()
             
-            can_access = cursor.fetchone()['can_access']
+            return FileManagementService._claimed(document)
             
-            cursor.close()
-            conn.close()
+        except Exception as e:
+            logger.error(f"Error claiming document for analysis: {e}", exc_info=True)
+            return None
+    
+    @staticmethod
+    def _claimed(row) -> Optional[Dict[str, Any]]:
+        if not row:
+            return None
+        if not row['can_access']:
+            return {"can_access": False}
+        logger.info(f"Updated analysis status for {row['blob_name']} to processing")
+        return dict(row)
+    
+    @staticmethod
+    def user_can_access_document(user_id: int, blob_name: str) -> bool:
+        """
+        Check if user has permission to access a document
+        
+        Args:
+            user_id: User ID checking access
+            blob_name: Document blob name
+            
+        Returns:
+            True if user can access, False otherwise
+        """
+        try:
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                # Get document ID from blob name
+                cursor.execute(
+                    "SELECT id FROM uploaded_documents WHERE blob_name = %s AND is_deleted = FALSE",
+                    (blob_name,)
+                )
+                result = cursor.fetchone()
+                
+                if not result:
+                    cursor.close()
+                    return False
+                
+                # RealDictCursor returns dict, access by column name
+                document_id = result['id']
+                
+                # Use database function to check permission
+                cursor.execute(
+                    "SELECT user_can_view_document(%s, %s) as can_access",
+                    (user_id, document_id)
+                )
+                
+                can_access = cursor.fetchone()['can_access']
+                
+                cursor.close()
             
             return can_access
             
@@ -216,33 +684,80 @@ class FileManagementService:
             True if successful
         """
         try:
-            conn = get_db_connection_dict()
-            cursor = conn.cursor()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                if last_analyzed_at:
+                    query = """
+                        UPDATE uploaded_documents
+                        SET analysis_status = %s, last_analyzed_at = %s, updated_at = NOW()
+                        WHERE blob_name = %s
+                    """
+                    cursor.execute(query, (status, last_analyzed_at, blob_name))
+                else:
+                    query = """
+                        UPDATE uploaded_documents
+                        SET analysis_status = %s, updated_at = NOW()
+                        WHERE blob_name = %s
+                    """
+                    cursor.execute(query, (status, blob_name))
+                
+                conn.commit()
+                cursor.close()
             
-            if last_analyzed_at:
-                query = """
-                    UPDATE uploaded_documents
-                    SET analysis_status = %s, last_analyzed_at = %s, updated_at = NOW()
-                    WHERE blob_name = %s
-                """
-                cursor.execute(query, (status, last_analyzed_at, blob_name))
-            else:
+            logger.info(f"Updated analysis status for {blob_name} to {status}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error updating analysis status: {e}", exc_info=True)
+            return False
+    
+    @staticmethod
+    def update_preprocessing_status(
+        blob_name: str,
+        status: str,
+        content_hash: Optional[str] = None,
+        summary: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Update document pre-processing status
+        
+        Args:
+            blob_name: Document blob name
+            status: New status (pending, processing, ready, failed)
+            content_hash: SHA-256 of the file, once known
+            summary: Optional pre-processing summary (chars, pages, sections, trigger hits)
+        
+        Returns:
+            True if successful
+        """
+        try:
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
                 query = """
                     UPDATE uploaded_documents
-                    SET analysis_status = %s, updated_at = NOW()
+                    SET preprocessing_status = %s,
+                        content_hash = COALESCE(%s, content_hash),
+                        preprocessing_summary = COALESCE(%s, preprocessing_summary),
+                        preprocessed_at = CASE WHEN %s = 'ready' THEN NOW() ELSE preprocessed_at END,
+                        updated_at = NOW()
                     WHERE blob_name = %s
                 """
-                cursor.execute(query, (status, blob_name))
-            
-            conn.commit()
-            cursor.close()
-            conn.close()
+                cursor.execute(query, (
+                    status, content_hash,
+                    psycopg2.extras.Json(summary) if summary else None,
+                    status, blob_name
+                ))
+                
+                conn.commit()
+                cursor.close()
             
-            logger.info(f"Updated analysis status for {blob_name} to {status}")
+            logger.info(f"Updated preprocessing status for {blob_name} to {status}")
             return True
-            
+        
         except Exception as e:
-            logger.error(f"Error updating analysis status: {e}", exc_info=True)
+            logger.error(f"Error updating preprocessing status: {e}", exc_info=True)
             return False
     
     @staticmethod
@@ -267,21 +782,20 @@ class FileManagementService:
             True if successful
         """
         try:
-            conn = get_db_connection_dict()
-            cursor = conn.cursor()
-            
-            query = """
-                INSERT INTO document_access_log (
-                    document_id, user_id, access_type, ip_address, user_agent
-                )
-                VALUES (%s, %s, %s, %s, %s)
-            """
-            
-            cursor.execute(query, (document_id, user_id, access_type, ip_address, user_agent))
-            conn.commit()
-            
-            cursor.close()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                query = """
+                    INSERT INTO document_access_log (
+                        document_id, user_id, access_type, ip_address, user_agent
+                    )
+                    VALUES (%s, %s, %s, %s, %s)
+                """
+                
+                cursor.execute(query, (document_id, user_id, access_type, ip_address, user_agent))
+                conn.commit()
+                
+                cursor.close()
             
             return True
             
@@ -302,20 +816,19 @@ class FileManagementService:
             True if successful
         """
         try:
-            conn = get_db_connection_dict()
-            cursor = conn.cursor()
-            
-            query = """
-                UPDATE uploaded_documents
-                SET is_deleted = TRUE, deleted_at = NOW(), deleted_by = %s, updated_at = NOW()
-                WHERE blob_name = %s
-            """
-            
-            cursor.execute(query, (deleted_by, blob_name))
-            conn.commit()
-            
-            cursor.close()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                query = """
+                    UPDATE uploaded_documents
+                    SET is_deleted = TRUE, deleted_at = NOW(), deleted_by = %s, updated_at = NOW()
+                    WHERE blob_name = %s
+                """
+                
+                cursor.execute(query, (deleted_by, blob_name))
+                conn.commit()
+                
+                cursor.close()
             
             logger.info(f"Soft deleted document {blob_name} by user {deleted_by}")
             return True
@@ -350,31 +863,98 @@ class FileManagementService:
             Analysis result ID if successful
         """
         try:
-            conn = get_db_connection_dict()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            query = """
-                INSERT INTO analysis_results (
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                query = """
+                    INSERT INTO analysis_results (
+                        document_id, result_blob_name, analyzed_by, analysis_duration_ms,
+                        status, error_message, prompts_executed
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                """
+                
+                cursor.execute(query, (
                     document_id, result_blob_name, analyzed_by, analysis_duration_ms,
-                    status, error_message, prompts_executed
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """
+                    status, error_message,
+                    psycopg2.extras.Json(prompts_executed) if prompts_executed else None
+                ))
+                
+                result = cursor.fetchone()
+                conn.commit()
+                
+                analysis_id = result['id'] if result else None
+                
+                cursor.close()
             
-            cursor.execute(query, (
-                document_id, result_blob_name, analyzed_by, analysis_duration_ms,
-                status, error_message,
-                psycopg2.extras.Json(prompts_executed) if prompts_executed else None
-            ))
+            if analysis_id:
+                logger.info(f"Created analysis result ID {analysis_id} for document {document_id}")
             
-            result = cursor.fetchone()
-            conn.commit()
+            return analysis_id
             
-            analysis_id = result['id'] if result else None
+        except Exception as e:
+            logger.error(f"Error creating analysis result: {e}", exc_info=True)
+            return None
+    
+    @staticmethod
+    def complete_analysis(
+        document_id: int,
+        result_blob_name: str,
+        analyzed_by: int,
+        analyzed_at: datetime,
+        analysis_duration_ms: Optional[int] = None,
+        status: str = 'completed',
+        overall_risk: Optional[str] = None
+    ) -> Optional[int]:
+        """
+        Mark a document analysed and record its result in one statement
+        
+        Equivalent to update_analysis_status(..., 'completed', analyzed_at)
+        followed by create_analysis_result(), in a single round trip and
+        transaction, keyed by the document ID the caller already holds.
+        
+        Args:
+            document_id: Document ID that was analyzed
+            result_blob_name: Blob name for analysis result JSON
+            analyzed_by: User ID who ran analysis
+            analyzed_at: Analysis completion timestamp
+            analysis_duration_ms: Analysis duration in milliseconds
+            status: Analysis result status (completed, partial)
+            overall_risk: Highest overall_risk across the prompts (none, low, medium, high)
             
-            cursor.close()
-            conn.close()
+        Returns:
+            Analysis result ID if successful
+        """
+        try:
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                query = """
+                    WITH doc AS (
+                        UPDATE uploaded_documents
+                        SET analysis_status = 'completed', last_analyzed_at = %s, updated_at = NOW()
+                        WHERE id = %s
+                        RETURNING id
+                    )
+                    INSERT INTO analysis_results (
+                        document_id, result_blob_name, analyzed_by, analysis_duration_ms, status, overall_risk
+                    )
+                    SELECT id, %s, %s, %s, %s, %s FROM doc
+                    RETURNING id
+                """
+                
+                cursor.execute(query, (
+                    analyzed_at, document_id,
+                    result_blob_name, analyzed_by, analysis_duration_ms, status, overall_risk
+                ))
+                
+                result = cursor.fetchone()
+                conn.commit()
+                
+                analysis_id = result['id'] if result else None
+                
+                cursor.close()
             
             if analysis_id:
                 logger.info(f"Created analysis result ID {analysis_id} for document {document_id}")
@@ -382,6 +962,85 @@ class FileManagementService:
             return analysis_id
             
         except Exception as e:
-            logger.error(f"Error creating analysis result: {e}", exc_info=True)
+            logger.error(f"Error completing analysis: {e}", exc_info=True)
+            return None
+    
+    @staticmethod
+    def record_analysis_pdf(
+        result_blob_name: str,
+        pdf_blob_name: str,
+        pdf_size_bytes: int,
+        pdf_etag: Optional[str] = None
+    ) -> bool:
+        """
+        Record that the PDF report for an analysis result was generated
+        
+        Args:
+            result_blob_name: Result JSON blob name
+            pdf_blob_name: Blob name of the stored PDF
+            pdf_size_bytes: PDF size in bytes
+            pdf_etag: ETag returned by the upload
+            
+        Returns:
+            True if an analysis result row was updated
+        """
+        try:
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                query = """
+                    UPDATE analysis_results
+                    SET pdf_blob_name = %s, pdf_size_bytes = %s, pdf_etag = %s, pdf_generated_at = NOW()
+                    WHERE result_blob_name = %s
+                """
+                
+                cursor.execute(query, (pdf_blob_name, pdf_size_bytes, pdf_etag, result_blob_name))
+                updated = cursor.rowcount
+                conn.commit()
+                
+                cursor.close()
+            
+            if not updated:
+                logger.warning(f"No analysis result row for {result_blob_name}; PDF state not recorded")
+            return updated > 0
+            
+        except Exception as e:
+            logger.error(f"Error recording analysis PDF: {e}", exc_info=True)
+            return False
+    
+    @staticmethod
+    def get_analysis_pdf_state(result_blob_name: str) -> Optional[Dict[str, Any]]:
+        """
+        PDF state of an analysis result
+        
+        Args:
+            result_blob_name: Result JSON blob name
+            
+        Returns:
+            Dict with pdf_blob_name, pdf_size_bytes, pdf_etag, pdf_generated_at
+            (pdf_generated_at is None if no PDF was generated), or None if the
+            result is not tracked in the database
+        """
+        try:
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                query = """
+                    SELECT pdf_blob_name, pdf_size_bytes, pdf_etag, pdf_generated_at
+                    FROM analysis_results
+                    WHERE result_blob_name = %s
+                    ORDER BY pdf_generated_at DESC NULLS LAST
+                    LIMIT 1
+                """
+                
+                cursor.execute(query, (result_blob_name,))
+                row = cursor.fetchone()
+                
+                cursor.close()
+            
+            return dict(row) if row else None
+            
+        except Exception as e:
+            logger.error(f"Error getting analysis PDF state: {e}", exc_info=True)
             return None
 
@@ -13,8 +13,9 @@ except Exception:
     sys.path.insert(0, str(ROOT))
     from src.app.utils.trace import log_time
 from pathlib import Path
-from src.app.services.text_extraction_helpers import extract_text
+from src.app.services.text_extraction_helpers import DocumentTooLargeError, extract_document
 from src.app.services.fallback_chunking import fallback_chunk_and_call
+from src.app.services.result_index import ResultIndex
 
 @log_time
 def process_all_single_call(PROMPT_DIR, SOW_DIR, OUT_DIR, MAX_CHARS_FOR_SINGLE_CALL, FALLBACK_TO_CHUNK, TRIGGER_RE, make_user_prompt_full, call_llm_single):
@@ -35,9 +36,15 @@ def process_all_single_call(PROMPT_DIR, SOW_DIR, OUT_DIR, MAX_CHARS_FOR_SINGLE_C
         logging.error(f"No SOW files found in {SOW_DIR}. Place files there.")
         return
 
+    result_index = ResultIndex(OUT_DIR)
     for sow in sow_files:
         logging.info(f"Processing SOW: {sow.name}")
-        sow_text = extract_text(sow)
+        try:
+            document = extract_document(sow)
+        except (DocumentTooLargeError, TimeoutError) as e:
+            logging.warning(f"{e}; skipping.")
+            continue
+        sow_text = document["text"]
         if not sow_text.strip():
             logging.warning(f"No text extracted from {sow}; skipping.")
             continue
@@ -53,7 +60,8 @@ def process_all_single_call(PROMPT_DIR, SOW_DIR, OUT_DIR, MAX_CHARS_FOR_SINGLE_C
                 logging.warning(f"SOW length {len(sow_text)} exceeds threshold {MAX_CHARS_FOR_SINGLE_CALL}.")
                 if FALLBACK_TO_CHUNK:
                     logging.info("Falling back to chunked processing.")
-                    analysis = fallback_chunk_and_call(system_prompt, sow_text, call_llm_single=call_llm_single, OUT_DIR=OUT_DIR)
+                    analysis = fallback_chunk_and_call(system_prompt, sow_text, call_llm_single=call_llm_single, OUT_DIR=OUT_DIR,
+                                                       sections=document["sections"])
                 else:
                     logging.info("Proceeding with a single (large) LLM call despite size.")
                     user = make_user_prompt_full(sow_text)
@@ -74,6 +82,7 @@ def process_all_single_call(PROMPT_DIR, SOW_DIR, OUT_DIR, MAX_CHARS_FOR_SINGLE_C
                     # fallback: save raw and create a minimal structured output
                     raw_out = OUT_DIR / f"{sow.stem}__{prompt_name}__raw.txt"
                     raw_out.write_text(raw or "NO_RAW", encoding="utf-8")
+                    result_index.record(raw_out, sow.stem, prompt_name)
                     analysis = {
                         "detected": False,
                         "findings": [],
@@ -105,6 +114,7 @@ def process_all_single_call(PROMPT_DIR, SOW_DIR, OUT_DIR, MAX_CHARS_FOR_SINGLE_C
             # write output JSON
             out_file = OUT_DIR / f"{sow.stem}__{prompt_name}.json"
             out_file.write_text(json.dumps(analysis, indent=2, ensure_ascii=False), encoding="utf-8")
+            result_index.record(out_file, sow.stem, prompt_name)
             logging.info(f"Wrote {out_file}")
 
             # Add delay to handle rate-limiting between different prompts
@@ -125,7 +135,7 @@ def load_prompts(prompt_dir: Path):
 def load_prompts_from_database():
     """Load prompts from PostgreSQL database with variable substitution"""
     try:
-        from prompt_db_service import PromptDatabaseService
+        from src.app.services.prompt_db_service import PromptDatabaseService
         db_service = PromptDatabaseService()
         prompts = db_service.fetch_all_active_prompts()
         if prompts:
@@ -0,0 +1,155 @@
+"""
+Upload-time document pre-processing
+
+Runs as a background task as soon as a SOW is uploaded: extracts the text and
+section tree (cached by content hash), runs the trigger pre-scan and the
+escalation rule scan, and optionally embeds section chunks. The document
+record's preprocessing_status goes pending -> processing -> ready/failed, and
+analysis later reuses the cached extraction so only the LLM stage remains.
+"""
+import io
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, Optional
+from src.app.services.storage_backend import get_storage
+from src.app.services.document_structure import chunk_by_sections, find_sections
+from src.app.services.escalation_rules import TRIGGER_RE as ESCALATION_TRIGGER_RE
+from src.app.services.extraction_cache import ExtractionCache, content_hash
+from src.app.services.file_management_service import FileManagementService
+from src.app.services.text_extraction_helpers import (
+    PDF_WINDOWED_MIN_PAGES, cached_document, extract_document, pdf_page_count
+)
+
+# Trigger pattern for the analysis pre-scan
+PRESCAN_TRIGGER_RE = re.compile(
+    r"\b(CPI|escalation|annual\s+adjustment|rate\s+increase|defect|warranty|bug|"
+    r"IP|ownership|foreground|deliverables|license)\b",
+    re.IGNORECASE
+)
+
+EMBEDDING_CHUNK_CHARS = 4000
+
+
+def preprocessing_enabled() -> bool:
+    return os.getenv("PREPROCESS_ON_UPLOAD", "true").lower() == "true"
+
+
+def summarize_document(document: Dict) -> Dict:
+    """Pre-processing summary stored on the document record"""
+    text = document["text"]
+    return {
+        "chars": len(text),
+        "pages": len(document.get("page_offsets", [])) or None,
+        "sections": len(document.get("sections", [])),
+        "pricing_sections": [s["title"] for s in find_sections(document.get("sections", []))][:10],
+        "trigger_hits": len(PRESCAN_TRIGGER_RE.findall(text)),
+        "escalation_hits": len(ESCALATION_TRIGGER_RE.findall(text)),
+        "backend": document.get("backend")
+    }
+
+
+def _embed_document(document: Dict) -> Optional[Dict]:
+    """
+    Embed section-aligned chunks with the OpenAI embeddings API (PREPROCESS_EMBEDDINGS=true)
+
+    Embeddings are cached next to the extraction, keyed by content hash and model.
+    """
+    model = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    cache = ExtractionCache()
+    cache_key = f"embeddings-{model}"
+    cached = cache.get(document["content_hash"], cache_key)
+    if cached is not None:
+        return cached
+
+    from openai import OpenAI
+
+    chunks = chunk_by_sections(document["text"], document.get("sections", []), EMBEDDING_CHUNK_CHARS)
+    chunks = [c for c in chunks if c.strip()]
+    response = OpenAI().embeddings.create(model=model, input=chunks)
+    embeddings = {
+        "model": model,
+        "chunks": [
+            {"index": i, "text": chunk, "embedding": item.embedding}
+            for i, (chunk, item) in enumerate(zip(chunks, response.data))
+        ]
+    }
+    cache.put(document["content_hash"], cache_key, embeddings)
+    logging.info(f"Embedded {len(chunks)} chunks for {document['content_hash'][:12]} with {model}")
+    return embeddings
+
+
+def preprocess_document(blob_name: str, content: Optional[bytes] = None) -> Optional[Dict]:
+    """
+    Extract, scan and cache a freshly uploaded document
+
+    Args:
+        blob_name: Name of the uploaded blob
+        content: File bytes if the caller still has them (skips the download)
+
+    Returns:
+        Pre-processing summary, or None if it failed
+    """
+    FileManagementService.update_preprocessing_status(blob_name, "processing")
+    try:
+        suffix = Path(blob_name).suffix
+        stream = io.BytesIO(content) if content is not None else get_storage().download_sow_stream(blob_name)
+        with stream:
+            page_count = pdf_page_count(stream) if suffix.lower() == ".pdf" else 0
+            if page_count > PDF_WINDOWED_MIN_PAGES:
+                # Analysis extracts large PDFs window by window without caching, so
+                # extracting here as well would only double the work
+                summary = {"pages": page_count, "windowed": True}
+                FileManagementService.update_preprocessing_status(
+                    blob_name, "ready", content_hash=content_hash(stream), summary=summary
+                )
+                logging.info(f"Pre-processed {blob_name} window by window: {summary}")
+                return summary
+            document = extract_document(stream, suffix=suffix)
+
+        if not document["text"].strip():
+            logging.warning(f"Pre-processing extracted no text from {blob_name}")
+            FileManagementService.update_preprocessing_status(
+                blob_name, "failed", content_hash=document.get("content_hash"),
+                summary={"error": "No text could be extracted from the document"}
+            )
+            return None
+
+        summary = summarize_document(document)
+        if os.getenv("PREPROCESS_EMBEDDINGS", "false").lower() == "true":
+            try:
+                embeddings = _embed_document(document)
+                summary["embedded_chunks"] = len(embeddings["chunks"]) if embeddings else 0
+            except Exception as e:
+                # Embeddings are optional; extraction results are still usable
+                logging.warning(f"Embedding failed for {blob_name}: {e}")
+
+        FileManagementService.update_preprocessing_status(
+            blob_name, "ready", content_hash=document["content_hash"], summary=summary
+        )
+        logging.info(f"Pre-processed {blob_name}: {summary}")
+        return summary
+
+    except Exception as e:
+        logging.error(f"Pre-processing failed for {blob_name}: {e}", exc_info=True)
+        FileManagementService.update_preprocessing_status(blob_name, "failed", summary={"error": str(e)})
+        return None
+
+
+def get_preprocessed_document(blob_name: str, record: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Cached extraction for a document that was pre-processed on upload
+
+    Args:
+        blob_name: Document blob name
+        record: uploaded_documents row if the caller already has it
+
+    Returns:
+        Extracted document dict, or None if it has to be extracted again
+    """
+    if record is None:
+        record = FileManagementService.get_document_by_blob_name(blob_name)
+    if not record or record.get("preprocessing_status") != "ready" or not record.get("content_hash"):
+        return None
+    return cached_document(record["content_hash"], Path(blob_name).suffix)
@@ -26,7 +26,7 @@ logging.basicConfig(
 )
 
 # Text extraction helpers
-from src.app.services.text_extraction_helpers import extract_text, extract_text_from_docx, extract_text_from_pdf
+from src.app.services.text_extraction_helpers import DocumentTooLargeError, extract_text, extract_text_from_docx, extract_text_from_pdf
 
 # LLM client (OpenAI)
 from openai import OpenAI
@@ -202,6 +202,7 @@ def make_user_prompt_full(sow_text: str, decision_rules: str = "") -> str:
     return prompt
 # Import fallback chunking
 from src.app.services.fallback_chunking import fallback_chunk_and_call
+from src.app.services.result_index import ResultIndex
 
 # Configuration for chunking
 MAX_CHARS_FOR_SINGLE_CALL = 100000
@@ -233,9 +234,14 @@ def process_all_single_call():
         logging.error(f"No SOW files found in {SOW_DIR}. Place files there.")
         return
 
+    result_index = ResultIndex(OUT_DIR)
     for sow in sow_files:
         logging.info(f"Processing SOW: {sow.name}")
-        sow_text = extract_text(sow)
+        try:
+            sow_text = extract_text(sow)
+        except (DocumentTooLargeError, TimeoutError) as e:
+            logging.warning(f"{e}; skipping.")
+            continue
         if not sow_text.strip():
             logging.warning(f"No text extracted from {sow}; skipping.")
             continue
@@ -272,6 +278,7 @@ def process_all_single_call():
                     # fallback: save raw and create a minimal structured output
                     raw_out = OUT_DIR / f"{sow.stem}__{prompt_name}__raw.txt"
                     raw_out.write_text(raw or "NO_RAW", encoding="utf-8")
+                    result_index.record(raw_out, sow.stem, prompt_name)
                     analysis = {
                         "detected": False,
                         "findings": [],
@@ -303,6 +310,7 @@ def process_all_single_call():
             # write output JSON
             out_file = OUT_DIR / f"{sow.stem}__{prompt_name}.json"
             out_file.write_text(json.dumps(analysis, indent=2, ensure_ascii=False), encoding="utf-8")
+            result_index.record(out_file, sow.stem, prompt_name)
             logging.info(f"Wrote {out_file}")
 
 if __name__ == "__main__":
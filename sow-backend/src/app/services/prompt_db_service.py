@@ -3,52 +3,61 @@ Database service for fetching and managing prompt templates
 """
 import logging
 import re
-from typing import Dict, List, Optional
-import psycopg2
-from psycopg2.extras import RealDictCursor
-import os
+from typing import Dict, Optional
 from dotenv import load_dotenv
+from src.app.core.hybrid_cache import InProcessCache
+from src.app.db.client import db_connection, get_db_connection
 
 load_dotenv()
 
+ACTIVE_PROMPTS_CACHE_KEY = "active_prompts"
+
+# {{variable_name}} placeholder in prompt_text
+VARIABLE_PATTERN = re.compile(r"\{\{([^{}]+)\}\}")
+
+
+class CompiledPrompt:
+    """
+    Prompt template split once into literal text and {{variable}} slots
+    
+    Substitution is a single pass over the template; placeholders without a
+    matching variable are kept as-is, and substituted values are not scanned
+    for further placeholders.
+    """
+    
+    __slots__ = ("clause_id", "name", "parts", "text")
+    
+    def __init__(self, clause_id: str, name: str, prompt_text: str, variables: Dict[str, str]):
+        self.clause_id = clause_id
+        self.name = name
+        # Even indexes are literal text, odd indexes are variable names
+        self.parts = VARIABLE_PATTERN.split(prompt_text)
+        self.text = self.render(variables)
+    
+    def render(self, variables: Dict[str, str]) -> str:
+        """Prompt text with variables substituted"""
+        out = list(self.parts)
+        for i in range(1, len(out), 2):
+            name = out[i]
+            value = variables.get(name)
+            out[i] = "{{" + name + "}}" if value is None else str(value)
+        return "".join(out)
+
+
+def invalidate_prompt_cache():
+    """Drop the compiled prompt set after a prompt or variable is written"""
+    InProcessCache.delete(ACTIVE_PROMPTS_CACHE_KEY, category="prompts")
+
 class PromptDatabaseService:
     """Service for fetching prompts from PostgreSQL database"""
     
-    def __init__(self):
-        self.db_config = {
-            'host': os.getenv('DB_HOST', 'localhost'),
-            'port': int(os.getenv('DB_PORT', '5432')),  # Convert to integer
-            'database': os.getenv('DB_NAME', 'sow_prompts'),
-            'user': os.getenv('DB_USER', 'postgres'),
-            'password': os.getenv('DB_PASSWORD', ''),
-            'sslmode': os.getenv('DB_SSLMODE', 'require')  # Required for Aiven and other cloud providers
-        }
-    
     def get_connection(self):
-        """Create database connection"""
-        try:
-            # Prefer DATABASE_URL if available (connection string format)
-            database_url = os.getenv('DATABASE_URL')
-            if database_url:
-                logging.info(f"Connecting using DATABASE_URL")
-                conn = psycopg2.connect(database_url)
-            else:
-                # Fallback to individual parameters
-                conn_string = f"host={self.db_config['host']} " \
-                             f"port={self.db_config['port']} " \
-                             f"dbname={self.db_config['database']} " \
-                             f"user={self.db_config['user']} " \
-                             f"password={self.db_config['password']} " \
-                             f"sslmode={self.db_config['sslmode']}"
-                
-                logging.info(f"Connecting to database at {self.db_config['host']}:{self.db_config['port']}")
-                conn = psycopg2.connect(conn_string)
-            
-            logging.info("Database connection successful")
-            return conn
-        except Exception as e:
-            logging.error(f"Database connection failed: {e}")
-            raise
+        """
+        Database connection from the shared pool (src.app.db.client)
+        
+        close() returns it to the pool; prefer db_connection() in new code.
+        """
+        return get_db_connection()
     
     def fetch_prompt_by_clause_id(self, clause_id: str) -> Optional[str]:
         """
@@ -60,46 +69,11 @@ class PromptDatabaseService:
         Returns:
             Fully populated prompt text with variables substituted
         """
-        try:
-            conn = self.get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            # Fetch prompt template
-            cursor.execute("""
-                SELECT id, clause_id, name, prompt_text
-                FROM prompt_templates
-                WHERE clause_id = %s AND is_active = TRUE
-            """, (clause_id,))
-            
-            prompt = cursor.fetchone()
-            if not prompt:
-                logging.warning(f"No active prompt found for clause_id: {clause_id}")
-                return None
-            
-            # Fetch variables for this prompt
-            cursor.execute("""
-                SELECT variable_name, variable_value
-                FROM prompt_variables
-                WHERE prompt_id = %s
-            """, (prompt['id'],))
-            
-            variables = {row['variable_name']: row['variable_value'] for row in cursor.fetchall()}
-            
-            cursor.close()
-            conn.close()
-            
-            # Substitute variables in prompt text
-            prompt_text = prompt['prompt_text']
-            for var_name, var_value in variables.items():
-                # Replace {{variable_name}} with actual value
-                prompt_text = prompt_text.replace(f"{{{{{var_name}}}}}", var_value)
-            
-            logging.info(f"Loaded prompt '{prompt['name']}' with {len(variables)} variables")
-            return prompt_text
-            
-        except Exception as e:
-            logging.error(f"Error fetching prompt for {clause_id}: {e}")
+        prompt = self.load_compiled_prompts().get(clause_id)
+        if not prompt:
+            logging.warning(f"No active prompt found for clause_id: {clause_id}")
             return None
+        return prompt.text
     
     def fetch_all_active_prompts(self) -> Dict[str, str]:
         """
@@ -108,47 +82,61 @@ class PromptDatabaseService:
         Returns:
             Dictionary mapping clause_id to fully populated prompt text
         """
+        return {clause_id: prompt.text for clause_id, prompt in self.load_compiled_prompts().items()}
+    
+    def load_compiled_prompts(self) -> Dict[str, CompiledPrompt]:
+        """
+        Active prompts keyed by clause_id, compiled and cached
+        
+        Templates and their variables are loaded in a single query and kept in
+        the "prompts" in-process cache until a prompt or variable is written
+        (invalidate_prompt_cache) or the cache TTL expires.
+        
+        Returns:
+            Dictionary mapping clause_id to CompiledPrompt (empty on error)
+        """
+        cached = InProcessCache.get(ACTIVE_PROMPTS_CACHE_KEY, category="prompts")
+        if cached is not None:
+            return cached
+        
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            # Fetch all active prompts
-            cursor.execute("""
-                SELECT id, clause_id, name, prompt_text
-                FROM prompt_templates
-                WHERE is_active = TRUE
-                ORDER BY clause_id
-            """)
-            
-            prompts = cursor.fetchall()
-            result = {}
-            
-            for prompt in prompts:
-                # Fetch variables for this prompt
-                cursor.execute("""
-                    SELECT variable_name, variable_value
-                    FROM prompt_variables
-                    WHERE prompt_id = %s
-                """, (prompt['id'],))
-                
-                variables = {row['variable_name']: row['variable_value'] for row in cursor.fetchall()}
+            with db_connection() as conn:
+                cursor = conn.cursor()
                 
-                # Substitute variables
-                prompt_text = prompt['prompt_text']
-                for var_name, var_value in variables.items():
-                    prompt_text = prompt_text.replace(f"{{{{{var_name}}}}}", var_value)
+                # Templates with their variables aggregated per prompt
+                cursor.execute("""
+                    SELECT 
+                        pt.id,
+                        pt.clause_id,
+                        pt.name,
+                        pt.prompt_text,
+                        COALESCE(
+                            json_object_agg(pv.variable_name, pv.variable_value)
+                                FILTER (WHERE pv.id IS NOT NULL),
+                            '{}'::json
+                        ) as variables
+                    FROM prompt_templates pt
+                    LEFT JOIN prompt_variables pv ON pt.id = pv.prompt_id
+                    WHERE pt.is_active = TRUE
+                    GROUP BY pt.id, pt.clause_id, pt.name, pt.prompt_text
+                    ORDER BY pt.clause_id
+                """)
                 
-                result[prompt['clause_id']] = prompt_text
-                logging.info(f"Loaded prompt '{prompt['name']}' ({prompt['clause_id']}) with {len(variables)} variables")
-            
-            cursor.close()
-            conn.close()
-            
-            return result
+                rows = cursor.fetchall()
+                cursor.close()
             
         except Exception as e:
             logging.error(f"Error fetching prompts: {e}")
             return {}
+        
+        prompts = {}
+        for row in rows:
+            prompt = CompiledPrompt(row['clause_id'], row['name'], row['prompt_text'], row['variables'])
+            prompts[row['clause_id']] = prompt
+            logging.info(f"Loaded prompt '{row['name']}' ({row['clause_id']}) with {len(row['variables'])} variables")
+        
+        InProcessCache.set(ACTIVE_PROMPTS_CACHE_KEY, prompts, category="prompts")
+        return prompts
     
     def update_variable(self, clause_id: str, variable_name: str, variable_value: str) -> bool:
         """
@@ -163,23 +151,23 @@ class PromptDatabaseService:
             True if successful, False otherwise
         """
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                UPDATE prompt_variables
-                SET variable_value = %s
-                WHERE prompt_id = (SELECT id FROM prompt_templates WHERE clause_id = %s)
-                  AND variable_name = %s
-            """, (variable_value, clause_id, variable_name))
-            
-            conn.commit()
-            rows_affected = cursor.rowcount
-            
-            cursor.close()
-            conn.close()
+            with db_connection(dict_cursor=False) as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    UPDATE prompt_variables
+                    SET variable_value = %s
+                    WHERE prompt_id = (SELECT id FROM prompt_templates WHERE clause_id = %s)
+                      AND variable_name = %s
+                """, (variable_value, clause_id, variable_name))
+                
+                conn.commit()
+                rows_affected = cursor.rowcount
+                
+                cursor.close()
             
             if rows_affected > 0:
+                invalidate_prompt_cache()
                 logging.info(f"Updated variable '{variable_name}' for {clause_id}")
                 return True
             else:
@@ -201,21 +189,20 @@ class PromptDatabaseService:
             Dictionary of variable names to values
         """
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("""
-                SELECT pv.variable_name, pv.variable_value, pv.description
-                FROM prompt_variables pv
-                JOIN prompt_templates pt ON pv.prompt_id = pt.id
-                WHERE pt.clause_id = %s
-                ORDER BY pv.variable_name
-            """, (clause_id,))
-            
-            variables = {row['variable_name']: row['variable_value'] for row in cursor.fetchall()}
-            
-            cursor.close()
-            conn.close()
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT pv.variable_name, pv.variable_value, pv.description
+                    FROM prompt_variables pv
+                    JOIN prompt_templates pt ON pv.prompt_id = pt.id
+                    WHERE pt.clause_id = %s
+                    ORDER BY pv.variable_name
+                """, (clause_id,))
+                
+                variables = {row['variable_name']: row['variable_value'] for row in cursor.fetchall()}
+                
+                cursor.close()
             
             return variables
             
@@ -4,11 +4,12 @@ Service for managing AI prompt templates (using existing prompt_templates table)
 import logging
 from typing import Optional, List, Dict
 from datetime import datetime
-from src.app.db.client import execute_query
+from src.app.db.async_client import execute_query_async
+from src.app.services.prompt_db_service import invalidate_prompt_cache
 
 logger = logging.getLogger(__name__)
 
-def get_all_prompts(clause_id_filter: str = None) -> List[Dict]:
+async def get_all_prompts(clause_id_filter: str = None) -> List[Dict]:
     """Get all prompts with variable count and related country/category/subcategory names
     
     Args:
@@ -48,7 +49,7 @@ def get_all_prompts(clause_id_filter: str = None) -> List[Dict]:
         params.append(f"%{clause_id_filter}%")
     
     query = query.format(where_clause=where_clause)
-    result = execute_query(query, tuple(params) if params else None)
+    result = await execute_query_async(query, tuple(params) if params else None)
     logger.info(f"🔥 SERVICE: Raw result type: {type(result)}")
     logger.info(f"🔥 SERVICE: Result length: {len(result) if result else 0}")
     if result:
@@ -63,7 +64,7 @@ def get_all_prompts(clause_id_filter: str = None) -> List[Dict]:
             logger.error(f"🔥 SERVICE: Dict conversion error: {e}")
     return result
 
-def get_prompt_by_id(prompt_id: int) -> Optional[Dict]:
+async def get_prompt_by_id(prompt_id: int) -> Optional[Dict]:
     """Get a single prompt by ID with its variables"""
     query = """
         SELECT 
@@ -87,9 +88,9 @@ def get_prompt_by_id(prompt_id: int) -> Optional[Dict]:
         WHERE pt.id = %s
         GROUP BY pt.id, pt.clause_id, pt.name, pt.prompt_text, pt.is_active, pt.created_at, pt.updated_at
     """
-    return execute_query(query, (prompt_id,), fetch_one=True)
+    return await execute_query_async(query, (prompt_id,), fetch_one=True)
 
-def create_prompt(
+async def create_prompt(
     clause_id: str,
     name: str,
     prompt_text: str,
@@ -103,13 +104,15 @@ def create_prompt(
         VALUES (%s, %s, %s, %s, %s, %s)
         RETURNING id, clause_id, name, prompt_text, is_active, country_id, sub_category_id, created_at
     """
-    return execute_query(
+    result = await execute_query_async(
         query,
         (clause_id, name, prompt_text, is_active, country_id, sub_category_id),
         fetch_one=True
     )
+    invalidate_prompt_cache()
+    return result
 
-def update_prompt(
+async def update_prompt(
     prompt_id: int,
     clause_id: str,
     name: str,
@@ -137,13 +140,14 @@ def update_prompt(
             RETURNING id, clause_id, name, prompt_text, is_active, country_id, sub_category_id, updated_at
         """
         
-        result = execute_query(
+        result = await execute_query_async(
             query,
             (clause_id, name, prompt_text, is_active, country_id, sub_category_id, prompt_id),
             fetch_one=True
         )
         
         if result:
+            invalidate_prompt_cache()
             logger.info(f"✅ Successfully updated prompt {prompt_id}")
             logger.info(f"✅ Result: {result}")
         else:
@@ -155,16 +159,17 @@ def update_prompt(
         logger.error(f"❌ Error in update_prompt service: {e}", exc_info=True)
         raise
 
-def delete_prompt(prompt_id: int) -> bool:
+async def delete_prompt(prompt_id: int) -> bool:
     """Delete a prompt (will cascade delete variables)"""
     try:
         logger.info(f"🗑️ Attempting to delete prompt {prompt_id}")
         
         # Use RETURNING to verify deletion happened
         query = "DELETE FROM prompt_templates WHERE id = %s RETURNING id"
-        result = execute_query(query, (prompt_id,), fetch_one=True)
+        result = await execute_query_async(query, (prompt_id,), fetch_one=True)
         
         if result:
+            invalidate_prompt_cache()
             logger.info(f"✅ Successfully deleted prompt {prompt_id}")
             return True
         else:
@@ -175,7 +180,7 @@ def delete_prompt(prompt_id: int) -> bool:
         logger.error(f"❌ Error in delete_prompt service: {e}", exc_info=True)
         raise
 
-def get_active_prompts() -> List[Dict]:
+async def get_active_prompts() -> List[Dict]:
     """Get all active prompts"""
     query = """
         SELECT 
@@ -188,9 +193,9 @@ def get_active_prompts() -> List[Dict]:
         WHERE is_active = TRUE
         ORDER BY clause_id
     """
-    return execute_query(query)
+    return await execute_query_async(query)
 
-def get_prompt_variables(prompt_id: int) -> List[Dict]:
+async def get_prompt_variables(prompt_id: int) -> List[Dict]:
     """Get all variables for a prompt"""
     query = """
         SELECT 
@@ -203,9 +208,9 @@ def get_prompt_variables(prompt_id: int) -> List[Dict]:
         WHERE prompt_id = %s
         ORDER BY variable_name
     """
-    return execute_query(query, (prompt_id,))
+    return await execute_query_async(query, (prompt_id,))
 
-def add_variable(
+async def add_variable(
     prompt_id: int,
     variable_name: str,
     variable_value: str,
@@ -219,13 +224,15 @@ def add_variable(
         DO UPDATE SET variable_value = EXCLUDED.variable_value, description = EXCLUDED.description
         RETURNING id, variable_name, variable_value, description, created_at
     """
-    return execute_query(
+    result = await execute_query_async(
         query,
         (prompt_id, variable_name, variable_value, description),
         fetch_one=True
     )
+    invalidate_prompt_cache()
+    return result
 
-def update_variable(
+async def update_variable(
     variable_id: int,
     variable_value: str,
     description: Optional[str] = None
@@ -239,18 +246,22 @@ def update_variable(
         WHERE id = %s
         RETURNING id, variable_name, variable_value, description
     """
-    return execute_query(query, (variable_value, description, variable_id), fetch_one=True)
+    result = await execute_query_async(query, (variable_value, description, variable_id), fetch_one=True)
+    if result:
+        invalidate_prompt_cache()
+    return result
 
-def delete_variable(variable_id: int) -> bool:
+async def delete_variable(variable_id: int) -> bool:
     """Delete a variable"""
     try:
         logger.info(f"🗑️ Attempting to delete variable {variable_id}")
         
         # Use RETURNING to verify deletion happened
         query = "DELETE FROM prompt_variables WHERE id = %s RETURNING id"
-        result = execute_query(query, (variable_id,), fetch_one=True)
+        result = await execute_query_async(query, (variable_id,), fetch_one=True)
         
         if result:
+            invalidate_prompt_cache()
             logger.info(f"✅ Successfully deleted variable {variable_id}")
             return True
         else:
@@ -0,0 +1,229 @@
+"""
+Embedded SQLite index of local analysis output artifacts (resources/output)
+
+Replaces globbing and stat()-ing the whole output directory to find the newest
+result: artifacts are recorded when written, so the latest-result lookup is an
+index seek. An optional retention policy (off unless RESULT_INDEX_RETENTION_DAYS
+or RESULT_INDEX_MAX_ENTRIES is set) deletes old artifacts from the directory.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+INDEX_FILENAME = ".result_index.sqlite3"
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    file_name TEXT PRIMARY KEY,
+    blob_stem TEXT NOT NULL,
+    prompt_name TEXT,
+    kind TEXT NOT NULL DEFAULT 'result',
+    created_at REAL NOT NULL,
+    size_bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_kind_created ON artifacts(kind, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_artifacts_stem_kind_created ON artifacts(blob_stem, kind, created_at DESC);
+"""
+
+
+class ResultIndex:
+    """Index of output artifacts keyed by blob stem, prompt and timestamp"""
+
+    # Writes since last compaction, per index file
+    _write_counts = {}
+    _lock = threading.Lock()
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.output_dir / INDEX_FILENAME
+
+        # Retention deletes files, so it only applies when configured explicitly
+        retention_days = os.getenv("RESULT_INDEX_RETENTION_DAYS")
+        max_entries = os.getenv("RESULT_INDEX_MAX_ENTRIES")
+        self.retention_days = float(retention_days) if retention_days else None
+        self.max_entries = int(max_entries) if max_entries else None
+        self.compact_every = int(os.getenv("RESULT_INDEX_COMPACT_EVERY", "200"))
+
+        self._initialize()
+
+    @property
+    def retention_enabled(self) -> bool:
+        return self.retention_days is not None or self.max_entries is not None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _initialize(self):
+        """Create the schema and index any artifacts written before the index existed"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.executescript(_SCHEMA)
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if version < SCHEMA_VERSION:
+                    self._rebuild(conn)
+                    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                conn.commit()
+            finally:
+                conn.close()
+
+    @staticmethod
+    def _parse_name(path: Path):
+        """Split '<blob_stem>__<prompt>[__raw].<ext>' into (blob_stem, prompt_name, kind)"""
+        stem = path.stem
+        kind = "result"
+        if path.suffix == ".txt" and stem.endswith("__raw"):
+            kind = "raw"
+            stem = stem[:-len("__raw")]
+        if "__" in stem:
+            blob_stem, prompt_name = stem.rsplit("__", 1)
+        else:
+            blob_stem, prompt_name = stem, None
+        return blob_stem, prompt_name, kind
+
+    def _rebuild(self, conn: sqlite3.Connection):
+        """One-off directory scan to seed the index"""
+        count = 0
+        for path in self.output_dir.iterdir():
+            if path.suffix not in (".json", ".txt") or not path.is_file():
+                continue
+            blob_stem, prompt_name, kind = self._parse_name(path)
+            if path.suffix == ".txt" and kind != "raw":
+                continue
+            stat = path.stat()
+            conn.execute(
+                "INSERT OR REPLACE INTO artifacts (file_name, blob_stem, prompt_name, kind, created_at, size_bytes) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (path.name, blob_stem, prompt_name, kind, stat.st_mtime, stat.st_size)
+            )
+            count += 1
+        logging.info(f"Result index rebuilt from {self.output_dir} ({count} artifacts)")
+
+    def record(self, path: Path, blob_stem: Optional[str] = None, prompt_name: Optional[str] = None):
+        """
+        Record an artifact that was just written to the output directory
+
+        Args:
+            path: Path of the written file
+            blob_stem: Source document stem (parsed from the file name if omitted)
+            prompt_name: Prompt the artifact belongs to (parsed from the file name if omitted)
+        """
+        path = Path(path)
+        parsed_stem, parsed_prompt, kind = self._parse_name(path)
+        try:
+            size = path.stat().st_size
+        except OSError:
+            size = None
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO artifacts (file_name, blob_stem, prompt_name, kind, created_at, size_bytes) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (path.name, blob_stem or parsed_stem, prompt_name or parsed_prompt, kind, time.time(), size)
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+            key = str(self.db_path)
+            self._write_counts[key] = self._write_counts.get(key, 0) + 1
+            due = self._write_counts[key] >= self.compact_every
+            if due:
+                self._write_counts[key] = 0
+
+        if due and self.retention_enabled:
+            self.compact()
+
+    def latest(self, blob_name: Optional[str] = None) -> Optional[Path]:
+        """
+        Path of the most recent result, optionally for one source document
+
+        Args:
+            blob_name: Optional blob name (or stem) to filter results
+
+        Returns:
+            Path to the newest result file or None
+        """
+        conn = self._connect()
+        try:
+            while True:
+                if blob_name:
+                    row = conn.execute(
+                        "SELECT file_name FROM artifacts WHERE blob_stem = ? AND kind = 'result' "
+                        "ORDER BY created_at DESC LIMIT 1",
+                        (Path(blob_name).stem,)
+                    ).fetchone()
+                else:
+                    row = conn.execute(
+                        "SELECT file_name FROM artifacts WHERE kind = 'result' ORDER BY created_at DESC LIMIT 1"
+                    ).fetchone()
+
+                if not row:
+                    return None
+
+                path = self.output_dir / row[0]
+                if path.exists():
+                    return path
+
+                # File was removed outside the index; drop the stale entry and look again
+                conn.execute("DELETE FROM artifacts WHERE file_name = ?", (row[0],))
+                conn.commit()
+        finally:
+            conn.close()
+
+    def compact(self) -> int:
+        """
+        Apply the retention policy: drop artifacts older than RESULT_INDEX_RETENTION_DAYS
+        and all but the newest RESULT_INDEX_MAX_ENTRIES, deleting their files.
+        Does nothing when neither is set.
+
+        Returns:
+            Number of artifacts removed
+        """
+        queries, params = [], []
+        if self.retention_days is not None:
+            queries.append("SELECT file_name FROM artifacts WHERE created_at < ?")
+            params.append(time.time() - self.retention_days * 86400)
+        if self.max_entries is not None:
+            queries.append(
+                "SELECT file_name FROM artifacts WHERE file_name NOT IN ("
+                "  SELECT file_name FROM artifacts ORDER BY created_at DESC LIMIT ?"
+                ")"
+            )
+            params.append(self.max_entries)
+        if not queries:
+            return 0
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                expired = conn.execute(" UNION ".join(queries), params).fetchall()
+
+                for (file_name,) in expired:
+                    try:
+                        (self.output_dir / file_name).unlink()
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        logging.warning(f"Could not remove expired artifact {file_name}: {e}")
+
+                conn.executemany("DELETE FROM artifacts WHERE file_name = ?", expired)
+                conn.commit()
+                if expired:
+                    conn.execute("VACUUM")
+            finally:
+                conn.close()
+
+        if expired:
+            logging.info(f"Result index compacted: removed {len(expired)} artifacts")
+        return len(expired)
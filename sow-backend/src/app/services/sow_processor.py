@@ -6,41 +6,56 @@ import json
 import os
 from pathlib import Path
 from typing import Dict, Optional
-from src.app.services.azure_blob_service import AzureBlobService
-from src.app.services.text_extraction_helpers import extract_text
+from src.app.services.storage_backend import get_storage
+from src.app.services.text_extraction_helpers import (
+    PDF_WINDOWED_MIN_PAGES, DocumentTooLargeError,
+    extract_document, iter_pdf_text_windows, pdf_page_count
+)
+from src.app.services.document_structure import locate_findings
+from src.app.services.fallback_chunking import windowed_chunk_and_call
+from src.app.services.preprocessing_service import PRESCAN_TRIGGER_RE, get_preprocessed_document
 from src.app.services.main_flow import load_prompts_from_database, load_prompts
 from src.app.services.process_sows_single_call import call_llm_single, make_user_prompt_full
+from src.app.services.escalation_rules import analyze_escalation_clauses, merge_rule_and_llm_analysis
+from src.app.services.result_index import ResultIndex
+from src.app.utils.result_codec import dumps_compact
 from src.app.utils.error_codes import (
     ErrorCode, create_error, is_timeout_error, 
     is_config_error, is_rate_limit_error
 )
-import re
 
 class SOWProcessor:
     """Process SOW documents from Azure Blob Storage"""
     
     def __init__(self):
-        self.blob_service = AzureBlobService()
+        self.blob_service = get_storage()
         self.output_dir = Path(__file__).resolve().parents[3] / "resources" / "output"
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.result_index = ResultIndex(self.output_dir)
         
         # Load environment settings
         self.max_chars = int(os.getenv("MAX_CHARS_FOR_SINGLE_CALL", "4000"))
         self.use_database = os.getenv("USE_PROMPT_DATABASE", "false").lower() == "true"
+        # Per-prompt copies in resources/output are optional; results are always stored in blob storage
+        self.write_local_results = os.getenv("WRITE_LOCAL_RESULTS", "true").lower() == "true"
+        
+        # Deterministic rule engine for escalation prompts; the LLM only sees text the rules did not settle.
+        # Off by default until the rules have been validated on real SOWs.
+        self.use_rule_engine = os.getenv("USE_RULE_ENGINE", "false").lower() == "true"
+        self.rule_engine_prompts = {
+            p.strip() for p in os.getenv("RULE_ENGINE_PROMPTS", "ADM-E01").split(",") if p.strip()
+        }
         
         # Trigger pattern for pre-scan
-        self.trigger_re = re.compile(
-            r"\b(CPI|escalation|annual\s+adjustment|rate\s+increase|defect|warranty|bug|"
-            r"IP|ownership|foreground|deliverables|license)\b",
-            re.IGNORECASE
-        )
+        self.trigger_re = PRESCAN_TRIGGER_RE
     
-    def process_sow_from_blob(self, blob_name: str) -> Dict:
+    def process_sow_from_blob(self, blob_name: str, record: Optional[Dict] = None) -> Dict:
         """
         Process a SOW document from Azure Blob Storage
         
         Args:
             blob_name: Name of the blob in Azure Storage
+            record: uploaded_documents row already loaded by the caller, if any
             
         Returns:
             Dictionary with analysis results for all prompts
@@ -48,84 +63,84 @@ class SOWProcessor:
         try:
             logging.info(f"Processing SOW from blob: {blob_name}")
             
-            # Download blob to temporary file
-            temp_path = self.blob_service.download_sow_to_temp(blob_name)
-            temp_file = Path(temp_path)
+            # Reuse the upload-time extraction when available; otherwise download into a
+            # spooled stream and extract text and section tree from it
+            document = get_preprocessed_document(blob_name, record)
+            if document is not None:
+                logging.info(f"Using pre-processed extraction for {blob_name}")
+            else:
+                with self.blob_service.download_sow_stream(blob_name) as stream:
+                    if self._is_large_pdf(blob_name, stream):
+                        # Analysed window by window so memory stays flat regardless of page count
+                        return self._process_pdf_windows(blob_name, stream)
+                    document = extract_document(stream, suffix=Path(blob_name).suffix)
+            sow_text = document["text"]
             
-            try:
-                # Extract text from document
-                sow_text = extract_text(temp_file)
-                
-                if not sow_text.strip():
-                    logging.warning(f"No text extracted from {blob_name}")
-                    return {
-                        "error": "No text could be extracted from the document",
-                        "blob_name": blob_name
-                    }
-                
-                # Load prompts
-                if self.use_database:
-                    logging.info("Loading prompts from database...")
-                    prompts = load_prompts_from_database()
-                else:
-                    logging.info("Loading prompts from files...")
-                    prompt_dir = Path(__file__).resolve().parents[3] / "resources" / "clause-lib"
-                    prompts = load_prompts(prompt_dir)
-                
-                if not prompts:
-                    logging.error("No prompts found")
-                    return {
-                        "error": "No prompts configured for analysis",
-                        "blob_name": blob_name
-                    }
-                
-                # Pre-scan for trigger terms
-                pre_hits = len(self.trigger_re.findall(sow_text))
-                logging.info(f"Pre-scan trigger hits: {pre_hits}")
-                
-                # Process with all prompts
-                results = {}
-                errors = []
+            if not sow_text.strip():
+                logging.warning(f"No text extracted from {blob_name}")
+                return {
+                    "error": "No text could be extracted from the document",
+                    "blob_name": blob_name
+                }
+            
+            # Load prompts
+            prompts = self._load_prompts()
+            
+            if not prompts:
+                logging.error("No prompts found")
+                return {
+                    "error": "No prompts configured for analysis",
+                    "blob_name": blob_name
+                }
+            
+            # Pre-scan for trigger terms
+            pre_hits = len(self.trigger_re.findall(sow_text))
+            logging.info(f"Pre-scan trigger hits: {pre_hits}")
+            
+            # Process with all prompts
+            results = {}
+            errors = []
+            
+            for prompt_name, system_prompt in prompts.items():
+                logging.info(f"Using prompt: {prompt_name}")
                 
-                for prompt_name, system_prompt in prompts.items():
-                    logging.info(f"Using prompt: {prompt_name}")
+                try:
+                    rule_analysis = None
+                    llm_text = sow_text
+                    if self.use_rule_engine and prompt_name in self.rule_engine_prompts:
+                        rule_analysis, remaining = analyze_escalation_clauses(sow_text, clause_id=prompt_name)
+                        llm_text = "\n\n".join(remaining)
                     
-                    try:
+                    if rule_analysis is not None and not llm_text:
+                        # Every paragraph was settled by the rules - no LLM call needed
+                        logging.info(f"Rule engine resolved {prompt_name} without calling the LLM")
+                        analysis = rule_analysis
+                        analysis["meta"].update({
+                            "source_blob": blob_name,
+                            "prompt_name": prompt_name,
+                            "trigger_hits": pre_hits
+                        })
+                    else:
                         # Call LLM
-                        user_prompt = make_user_prompt_full(sow_text)
+                        user_prompt = make_user_prompt_full(llm_text)
                         response = call_llm_single(system_prompt, user_prompt)
-                        
+                    
                         # Check if LLM call failed
                         if response.get("error"):
-                            error_detail = response.get("error")
-                            exception = response.get("exception")
-                            
-                            # Determine error code based on exception type
-                            if exception:
-                                if is_config_error(exception):
-                                    error_code = ErrorCode.LL01
-                                elif is_timeout_error(exception):
-                                    error_code = ErrorCode.LL02
-                                elif is_rate_limit_error(exception):
-                                    error_code = ErrorCode.LL03
-                                else:
-                                    error_code = ErrorCode.LL05
-                            else:
-                                error_code = ErrorCode.LL05
-                            
-                            error = create_error(
-                                error_code,
-                                detail=error_detail,
-                                context={"prompt_name": prompt_name, "blob_name": blob_name}
-                            )
+                            error = self._llm_error(response, prompt_name, blob_name)
                             errors.append(error)
                             logging.error(f"LLM error for {prompt_name}: {error}")
-                            continue
-                        
+                            if rule_analysis is None:
+                                continue
+                            # Keep the findings the rules could settle
+                            response = {"parsed": {"detected": False, "findings": [], "overall_risk": "none", "actions": []}}
+                    
                         # Parse response
                         parsed = response.get("parsed")
                         if parsed and isinstance(parsed, dict):
                             analysis = parsed
+                            if rule_analysis is not None:
+                                analysis = merge_rule_and_llm_analysis(rule_analysis, parsed)
                             analysis.setdefault("meta", {})
                             analysis["meta"].update({
                                 "source_blob": blob_name,
@@ -135,15 +150,11 @@ class SOWProcessor:
                         else:
                             # Fallback if parsing failed
                             raw = response.get("raw", "NO_RAW")
-                            
+                        
                             # Create error for invalid response format
-                            error = create_error(
-                                ErrorCode.LL04,
-                                detail="LLM did not return valid JSON",
-                                context={"prompt_name": prompt_name, "blob_name": blob_name}
-                            )
+                            error = self._llm_error(response, prompt_name, blob_name)
                             errors.append(error)
-                            
+                        
                             analysis = {
                                 "detected": False,
                                 "findings": [],
@@ -156,82 +167,56 @@ class SOWProcessor:
                                     "trigger_hits": pre_hits
                                 }
                             }
-                            
+                        
                             # Save raw output
-                            raw_file = self.output_dir / f"{Path(blob_name).stem}__{prompt_name}__raw.txt"
-                            raw_file.write_text(raw, encoding="utf-8")
-                    
-                    except Exception as e:
-                        # Catch any unexpected errors during prompt processing
-                        logging.error(f"Unexpected error processing prompt {prompt_name}: {e}", exc_info=True)
-                        error = create_error(
-                            ErrorCode.GEN01,
-                            detail=str(e),
-                            context={"prompt_name": prompt_name, "blob_name": blob_name}
-                        )
-                        errors.append(error)
-                        continue
-                    
-                    # Deduplicate findings
-                    findings = analysis.get("findings", [])
-                    unique_findings = []
-                    seen = set()
-                    for finding in findings:
-                        key = (
-                            finding.get("original_text", "").strip(),
-                            finding.get("compliance_status", "")
-                        )
-                        if key not in seen:
-                            unique_findings.append(finding)
-                            seen.add(key)
-                    
-                    if len(unique_findings) < len(findings):
-                        logging.info(f"Filtered {len(findings) - len(unique_findings)} duplicate findings")
-                    
-                    analysis["findings"] = unique_findings
-                    
-                    # Save individual result
-                    output_file = self.output_dir / f"{Path(blob_name).stem}__{prompt_name}.json"
-                    output_file.write_text(
-                        json.dumps(analysis, indent=2, ensure_ascii=False),
-                        encoding="utf-8"
-                    )
-                    
-                    results[prompt_name] = analysis
-                
-                # Check if all prompts failed
-                if not results and errors:
-                    logging.error(f"All prompts failed for {blob_name}")
-                    return {
-                        "blob_name": blob_name,
-                        "prompts_processed": 0,
-                        "results": {},
-                        "errors": errors,
-                        "trigger_hits": pre_hits,
-                        "status": "failed"
-                    }
-                
-                logging.info(f"Completed processing {blob_name} with {len(results)} prompts")
+                            if self.write_local_results:
+                                raw_file = self.output_dir / f"{Path(blob_name).stem}__{prompt_name}__raw.txt"
+                                raw_file.write_text(raw, encoding="utf-8")
+                                self.result_index.record(raw_file, Path(blob_name).stem, prompt_name)
+                            
+                            if rule_analysis is not None:
+                                analysis = merge_rule_and_llm_analysis(rule_analysis, analysis)
                 
-                response = {
-                    "blob_name": blob_name,
-                    "prompts_processed": len(results),
-                    "results": results,
-                    "trigger_hits": pre_hits,
-                    "status": "success" if not errors else "partial_success"
-                }
+                except Exception as e:
+                    # Catch any unexpected errors during prompt processing
+                    logging.error(f"Unexpected error processing prompt {prompt_name}: {e}", exc_info=True)
+                    error = create_error(
+                        ErrorCode.GEN01,
+                        detail=str(e),
+                        context={"prompt_name": prompt_name, "blob_name": blob_name}
+                    )
+                    errors.append(error)
+                    continue
                 
-                # Add errors if any occurred
-                if errors:
-                    response["errors"] = errors
+                # Deduplicate findings and map them to the section and page they were quoted from
+                analysis["findings"] = self._dedupe_findings(analysis.get("findings", []))
+                locate_findings(analysis["findings"], document)
                 
-                return response
+                self._save_result(blob_name, prompt_name, analysis)
+                results[prompt_name] = analysis
+            
+            return self._build_response(blob_name, results, errors, pre_hits)
+        
+        except DocumentTooLargeError as e:
+            logging.error(f"Document too large to analyse {blob_name}: {e}")
+            error = create_error(ErrorCode.DOC05, detail=str(e), context={"blob_name": blob_name})
+            return {
+                "error": error["message"],
+                "blob_name": blob_name,
+                "errors": [error],
+                "status": "failed"
+            }
+        
+        except TimeoutError as e:
+            logging.error(f"Text extraction timed out for {blob_name}: {e}")
+            error = create_error(ErrorCode.DOC02, detail=str(e), context={"blob_name": blob_name})
+            return {
+                "error": error["message"],
+                "blob_name": blob_name,
+                "errors": [error],
+                "status": "failed"
+            }
                 
-            finally:
-                # Clean up temp file
-                if temp_file.exists():
-                    temp_file.unlink()
-                    
         except Exception as e:
             logging.error(f"Error processing SOW from blob {blob_name}: {e}", exc_info=True)
             return {
@@ -239,6 +224,194 @@ class SOWProcessor:
                 "blob_name": blob_name
             }
     
+    def _load_prompts(self) -> Dict[str, str]:
+        """Prompts from the database or the clause library, per USE_PROMPT_DATABASE"""
+        if self.use_database:
+            logging.info("Loading prompts from database...")
+            return load_prompts_from_database()
+        logging.info("Loading prompts from files...")
+        prompt_dir = Path(__file__).resolve().parents[3] / "resources" / "clause-lib"
+        return load_prompts(prompt_dir)
+    
+    @staticmethod
+    def _llm_error(response: Dict, prompt_name: str, blob_name: str) -> Dict:
+        """Structured error for a failed or unparseable LLM call"""
+        exception = response.get("exception")
+        if not response.get("error"):
+            # The call succeeded but the output was not JSON
+            return create_error(
+                ErrorCode.LL04,
+                detail="LLM did not return valid JSON",
+                context={"prompt_name": prompt_name, "blob_name": blob_name}
+            )
+        
+        # Determine error code based on exception type
+        if exception:
+            if is_config_error(exception):
+                error_code = ErrorCode.LL01
+            elif is_timeout_error(exception):
+                error_code = ErrorCode.LL02
+            elif is_rate_limit_error(exception):
+                error_code = ErrorCode.LL03
+            else:
+                error_code = ErrorCode.LL05
+        else:
+            error_code = ErrorCode.LL05
+        
+        return create_error(
+            error_code,
+            detail=response.get("error"),
+            context={"prompt_name": prompt_name, "blob_name": blob_name}
+        )
+    
+    @staticmethod
+    def _dedupe_findings(findings: list) -> list:
+        """Drop findings that quote the same text with the same compliance status"""
+        unique_findings = []
+        seen = set()
+        for finding in findings:
+            key = (
+                finding.get("original_text", "").strip(),
+                finding.get("compliance_status", "")
+            )
+            if key not in seen:
+                unique_findings.append(finding)
+                seen.add(key)
+        
+        if len(unique_findings) < len(findings):
+            logging.info(f"Filtered {len(findings) - len(unique_findings)} duplicate findings")
+        return unique_findings
+    
+    def _save_result(self, blob_name: str, prompt_name: str, analysis: Dict):
+        """Save an individual prompt result locally when WRITE_LOCAL_RESULTS is on"""
+        if self.write_local_results:
+            output_file = self.output_dir / f"{Path(blob_name).stem}__{prompt_name}.json"
+            output_file.write_text(dumps_compact(analysis), encoding="utf-8")
+            self.result_index.record(output_file, Path(blob_name).stem, prompt_name)
+    
+    @staticmethod
+    def _build_response(blob_name: str, results: Dict, errors: list, pre_hits: int) -> Dict:
+        # Check if all prompts failed
+        if not results and errors:
+            logging.error(f"All prompts failed for {blob_name}")
+            return {
+                "blob_name": blob_name,
+                "prompts_processed": 0,
+                "results": {},
+                "errors": errors,
+                "trigger_hits": pre_hits,
+                "status": "failed"
+            }
+        
+        logging.info(f"Completed processing {blob_name} with {len(results)} prompts")
+        
+        response = {
+            "blob_name": blob_name,
+            "prompts_processed": len(results),
+            "results": results,
+            "trigger_hits": pre_hits,
+            "status": "success" if not errors else "partial_success"
+        }
+        
+        # Add errors if any occurred
+        if errors:
+            response["errors"] = errors
+        
+        return response
+    
+    @staticmethod
+    def _is_large_pdf(blob_name: str, stream) -> bool:
+        """True for PDFs long enough to be analysed window by window (PDF_WINDOWED_MIN_PAGES)"""
+        if Path(blob_name).suffix.lower() != ".pdf":
+            return False
+        try:
+            page_count = pdf_page_count(stream)
+        except Exception as e:
+            # Let the regular extraction path report unreadable PDFs
+            logging.warning(f"Could not count pages of {blob_name}: {e}")
+            return False
+        finally:
+            stream.seek(0)
+        return page_count > PDF_WINDOWED_MIN_PAGES
+    
+    def _process_pdf_windows(self, blob_name: str, stream) -> Dict:
+        """
+        Analyse a large PDF one page-range window at a time
+        
+        Each window is chunked on section boundaries and every prompt runs over
+        every chunk (rule engine first for escalation prompts); per-prompt
+        results are merged as the windows stream past, so only one window of
+        text is in memory.
+        
+        Raises:
+            DocumentTooLargeError: PDF exceeds PDF_MAX_PAGES
+        """
+        prompts = self._load_prompts()
+        if not prompts:
+            logging.error("No prompts found")
+            return {
+                "error": "No prompts configured for analysis",
+                "blob_name": blob_name
+            }
+        
+        errors = []
+        pre_hits = 0
+        
+        def scanned_windows():
+            nonlocal pre_hits
+            for window in iter_pdf_text_windows(stream):
+                pre_hits += len(self.trigger_re.findall(window["text"]))
+                yield window
+        
+        def analyze_chunk(prompt_name: str, system_prompt: str, chunk: str) -> Optional[Dict]:
+            rule_analysis = None
+            llm_text = chunk
+            if self.use_rule_engine and prompt_name in self.rule_engine_prompts:
+                rule_analysis, remaining = analyze_escalation_clauses(chunk, clause_id=prompt_name)
+                llm_text = "\n\n".join(remaining)
+                if not llm_text:
+                    return rule_analysis
+            
+            try:
+                response = call_llm_single(system_prompt, make_user_prompt_full(llm_text))
+            except Exception as e:
+                logging.error(f"Unexpected error processing prompt {prompt_name}: {e}", exc_info=True)
+                errors.append(create_error(
+                    ErrorCode.GEN01,
+                    detail=str(e),
+                    context={"prompt_name": prompt_name, "blob_name": blob_name}
+                ))
+                return rule_analysis
+            
+            parsed = response.get("parsed")
+            if response.get("error") or not isinstance(parsed, dict):
+                error = self._llm_error(response, prompt_name, blob_name)
+                errors.append(error)
+                logging.error(f"LLM error for {prompt_name}: {error}")
+                return rule_analysis
+            if rule_analysis is not None:
+                return merge_rule_and_llm_analysis(rule_analysis, parsed)
+            return parsed
+        
+        aggregates = windowed_chunk_and_call(prompts, scanned_windows(), analyze_chunk)
+        logging.info(f"Pre-scan trigger hits: {pre_hits}")
+        
+        results = {}
+        for prompt_name, analysis in aggregates.items():
+            if not analysis["meta"]["chunks"]:
+                # Every chunk failed for this prompt; the errors are already recorded
+                continue
+            analysis["findings"] = self._dedupe_findings(analysis["findings"])
+            analysis["meta"].update({
+                "source_blob": blob_name,
+                "prompt_name": prompt_name,
+                "trigger_hits": pre_hits
+            })
+            self._save_result(blob_name, prompt_name, analysis)
+            results[prompt_name] = analysis
+        
+        return self._build_response(blob_name, results, errors, pre_hits)
+    
     def get_latest_result(self, blob_name: Optional[str] = None) -> Optional[Dict]:
         """
         Get the latest analysis result
@@ -250,22 +423,10 @@ class SOWProcessor:
             Latest analysis result or None
         """
         try:
-            # Find JSON files
-            if blob_name:
-                pattern = f"{Path(blob_name).stem}__*.json"
-            else:
-                pattern = "*.json"
-            
-            json_files = sorted(
-                self.output_dir.glob(pattern),
-                key=lambda p: p.stat().st_mtime,
-                reverse=True
-            )
-            
-            if not json_files:
+            latest_file = self.result_index.latest(blob_name)
+            if not latest_file:
                 return None
             
-            latest_file = json_files[0]
             content = latest_file.read_text(encoding="utf-8")
             return json.loads(content)
             
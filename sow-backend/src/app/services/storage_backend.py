@@ -0,0 +1,529 @@
+"""
+Pluggable storage for uploaded SOWs, analysis results and PDF reports
+
+The backend is selected through configuration:
+
+    STORAGE_BACKEND    azure (default) or local
+    LOCAL_STORAGE_DIR  root directory of the local backend (default resources/storage)
+
+AzureBlobService (azure_blob_service.py) implements StorageBackend for Azure
+Blob Storage. LocalStorageBackend keeps the same containers as directories on
+local disk, so single-box installs, tests and benchmarks run without an Azure
+account. Async endpoints use get_async_storage(), which returns the aio Azure
+client or a thread-offloading wrapper around the local backend.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import AsyncIterator, BinaryIO, Dict, Iterator, List, Optional
+from src.app.utils.result_codec import decode_result, encode_result
+
+UPLOADS_CONTAINER = "sow-uploads"
+RESULTS_CONTAINER = "sow-analysis-results"
+PDFS_CONTAINER = "sow-analysis-pdfs"
+
+META_SUFFIX = ".meta.json"
+
+
+class UploadTooLargeError(ValueError):
+    """Upload exceeds MAX_UPLOAD_BYTES"""
+
+
+class EmptyUploadError(ValueError):
+    """Upload contains no data"""
+
+
+def max_upload_bytes() -> int:
+    return int(os.getenv("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+
+
+def upload_chunk_bytes() -> int:
+    return int(os.getenv("UPLOAD_CHUNK_BYTES", str(4 * 1024 * 1024)))
+
+
+def blob_timestamp() -> str:
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def sow_blob_name(filename: str, timestamp: str) -> str:
+    """Unique upload blob name: timestamp prefix plus the original filename"""
+    return f"{timestamp}_{filename}"
+
+
+def result_blob_name_for(blob_name: str, timestamp: str) -> str:
+    """Analysis result blob name for a SOW blob"""
+    return f"{Path(blob_name).stem}__analysis__{timestamp}.json"
+
+
+def pdf_blob_name_for(result_blob_name: str) -> str:
+    """PDF report blob name for an analysis result blob"""
+    return f"{result_blob_name.replace('.json', '')}.pdf"
+
+
+class StorageBackend(ABC):
+    """Storage operations used by the API, SOWProcessor and pre-processing"""
+
+    name = ""
+
+    @abstractmethod
+    def upload_sow(self, file_content: bytes, filename: str,
+                   content_type: str = "application/octet-stream") -> dict:
+        """Store an uploaded SOW; returns blob_name, url, size, content_type, original_filename"""
+
+    @abstractmethod
+    def download_sow(self, blob_name: str) -> bytes:
+        """Full content of an uploaded SOW"""
+
+    @abstractmethod
+    def download_sow_stream(self, blob_name: str) -> BinaryIO:
+        """Seekable stream positioned at the start; the caller closes it"""
+
+    @abstractmethod
+    def get_blob_metadata(self, blob_name: str) -> dict:
+        """name, size, created, last_modified, content_type, metadata of an uploaded SOW"""
+
+    @abstractmethod
+    def list_sows(self, prefix: Optional[str] = None, limit: Optional[int] = 100) -> List[dict]:
+        """Uploaded SOWs in storage (limit None for all); used for reconciliation, not the /sows listing"""
+
+    @abstractmethod
+    def delete_sow(self, blob_name: str) -> bool:
+        """Delete an uploaded SOW"""
+
+    @abstractmethod
+    def store_analysis_result(self, blob_name: str, analysis_result: dict) -> dict:
+        """Store an analysis result; returns result_blob_name, url, size, content_encoding"""
+
+    @abstractmethod
+    def get_analysis_result(self, result_blob_name: str) -> Optional[dict]:
+        """dict with etag, data (parsed result) and metadata, or None if not found"""
+
+    @abstractmethod
+    def store_analysis_pdf(self, result_blob_name: str, pdf_buffer) -> dict:
+        """Store a PDF report and record it in analysis_results; returns pdf_blob_name, url, size, etag"""
+
+    @abstractmethod
+    def pdf_exists(self, result_blob_name: str) -> bool:
+        """True if a PDF report was generated for the result"""
+
+    def verify_containers(self):
+        """Create the upload, results and PDF containers if needed (called at startup)"""
+
+    def close(self):
+        """Release connections (called at shutdown)"""
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Storage on local disk
+
+    Each container is a directory; objects are stored under the SHA-1 of their
+    name, sharded two levels deep (<container>/ab/cd/<sha1>), so no directory
+    grows unbounded and blob names of any length or script map to a short file
+    name. The blob name, content type, metadata and ETag live in a
+    <sha1>.meta.json sidecar. Writes go to a temp file in the target directory and are moved
+    into place with os.replace, so readers never see a partial file.
+    """
+
+    name = "local"
+
+    def __init__(self, root: Optional[str] = None):
+        default_root = Path(__file__).resolve().parents[3] / "resources" / "storage"
+        self.root = Path(root or os.getenv("LOCAL_STORAGE_DIR", str(default_root)))
+        self.container_name = os.getenv("AZURE_STORAGE_CONTAINER_NAME", UPLOADS_CONTAINER)
+
+    def _path(self, container: str, name: str) -> Path:
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()
+        return self.root / container / digest[:2] / digest[2:4] / digest
+
+    def _read_meta(self, container: str, name: str) -> dict:
+        path = self._path(container, name)
+        meta_path = path.with_name(path.name + META_SUFFIX)
+        try:
+            return json.loads(meta_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            if not path.exists():
+                raise
+            # Data without a sidecar (e.g. copied in by hand)
+            stat = path.stat()
+            modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()
+            return {"name": name, "size": stat.st_size, "etag": f'"{int(stat.st_mtime_ns)}"',
+                    "content_type": None, "content_encoding": None, "metadata": {},
+                    "created": modified, "last_modified": modified}
+
+    def _atomic_write(self, path: Path, chunks) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _commit(self, container: str, name: str, size: int, digest: str,
+                content_type: Optional[str], content_encoding: Optional[str] = None,
+                metadata: Optional[Dict[str, str]] = None) -> dict:
+        """Write the sidecar for an object whose data is already in place"""
+        path = self._path(container, name)
+        now = datetime.now(timezone.utc).isoformat()
+        try:
+            created = self._read_meta(container, name).get("created", now)
+        except FileNotFoundError:
+            created = now
+        meta = {
+            "name": name,
+            "size": size,
+            "etag": f'"{digest[:32]}"',
+            "content_type": content_type,
+            "content_encoding": content_encoding,
+            "metadata": metadata or {},
+            "created": created,
+            "last_modified": now
+        }
+        self._atomic_write(path.with_name(path.name + META_SUFFIX), [json.dumps(meta).encode("utf-8")])
+        return meta
+
+    def _put(self, container: str, name: str, data: bytes, content_type: Optional[str],
+             content_encoding: Optional[str] = None, metadata: Optional[Dict[str, str]] = None) -> dict:
+        self._atomic_write(self._path(container, name), [data])
+        return self._commit(container, name, len(data), hashlib.sha256(data).hexdigest(),
+                            content_type, content_encoding, metadata)
+
+    def _url(self, container: str, name: str) -> str:
+        return self._path(container, name).resolve().as_uri()
+
+    def upload_sow(self, file_content: bytes, filename: str,
+                   content_type: str = "application/octet-stream") -> dict:
+        timestamp = blob_timestamp()
+        blob_name = sow_blob_name(filename, timestamp)
+        self._put(self.container_name, blob_name, file_content, content_type,
+                  metadata={"original_filename": filename, "upload_timestamp": timestamp})
+        logging.info(f"Stored SOW locally: {blob_name} ({len(file_content)} bytes)")
+        return {
+            "blob_name": blob_name,
+            "url": self._url(self.container_name, blob_name),
+            "size": len(file_content),
+            "content_type": content_type,
+            "original_filename": filename
+        }
+
+    def begin_upload(self) -> tempfile.NamedTemporaryFile:
+        """Temp file on the storage volume for a streamed upload (see commit_upload)"""
+        staging = self.root / ".staging"
+        staging.mkdir(parents=True, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=staging, delete=False)
+
+    def commit_upload(self, temp_path: str, filename: str, content_type: str,
+                      size: int, content_hash: str) -> dict:
+        """Move a fully written upload into place and record its metadata"""
+        timestamp = blob_timestamp()
+        blob_name = sow_blob_name(filename, timestamp)
+        path = self._path(self.container_name, blob_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(temp_path, path)
+        self._commit(self.container_name, blob_name, size, content_hash, content_type, metadata={
+            "original_filename": filename, "upload_timestamp": timestamp, "content_sha256": content_hash
+        })
+        logging.info(f"Stored SOW locally: {blob_name} ({size} bytes)")
+        return {
+            "blob_name": blob_name,
+            "url": self._url(self.container_name, blob_name),
+            "size": size,
+            "content_type": content_type,
+            "original_filename": filename,
+            "content_hash": content_hash
+        }
+
+    def download_sow(self, blob_name: str) -> bytes:
+        return self._path(self.container_name, blob_name).read_bytes()
+
+    def download_sow_stream(self, blob_name: str) -> BinaryIO:
+        return open(self._path(self.container_name, blob_name), "rb")
+
+    def get_blob_metadata(self, blob_name: str) -> dict:
+        meta = self._read_meta(self.container_name, blob_name)
+        return {
+            "blob_name": blob_name,
+            "size": meta["size"],
+            "created": meta["created"],
+            "last_modified": meta["last_modified"],
+            "content_type": meta["content_type"],
+            "metadata": meta["metadata"]
+        }
+
+    def _iter_meta(self, container: str) -> Iterator[dict]:
+        """Sidecars of the objects in a container (objects without one are not listed)"""
+        base = self.root / container
+        if not base.exists():
+            return
+        for meta_path in base.glob(f"*/*/*{META_SUFFIX}"):
+            try:
+                yield json.loads(meta_path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                # Deleted while listing
+                continue
+
+    def list_sows(self, prefix: Optional[str] = None, limit: Optional[int] = 100) -> List[dict]:
+        metas = sorted(
+            (m for m in self._iter_meta(self.container_name) if not prefix or m["name"].startswith(prefix)),
+            key=lambda m: m["name"]
+        )
+        results = []
+        for meta in metas[:limit]:
+            results.append({
+                "blob_name": meta["name"],
+                "size": meta["size"],
+                "created": meta["created"],
+                "last_modified": meta["last_modified"],
+                "content_type": meta["content_type"],
+                "metadata": meta["metadata"]
+            })
+        return results
+
+    def delete_sow(self, blob_name: str) -> bool:
+        path = self._path(self.container_name, blob_name)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            # Same error as the Azure backend so callers handle a missing blob once
+            from azure.core.exceptions import ResourceNotFoundError
+            raise ResourceNotFoundError(f"SOW not found: {blob_name}")
+        path.with_name(path.name + META_SUFFIX).unlink(missing_ok=True)
+        logging.info(f"Deleted local SOW: {blob_name}")
+        return True
+
+    def store_analysis_result(self, blob_name: str, analysis_result: dict) -> dict:
+        timestamp = blob_timestamp()
+        result_blob_name = result_blob_name_for(blob_name, timestamp)
+        result_bytes, content_encoding = encode_result(analysis_result)
+        self._put(RESULTS_CONTAINER, result_blob_name, result_bytes, "application/json", content_encoding, {
+            "source_blob": blob_name,
+            "analysis_timestamp": timestamp,
+            "prompts_processed": str(analysis_result.get("prompts_processed", 0))
+        })
+        logging.info(f"Stored analysis result locally: {result_blob_name} ({len(result_bytes)} bytes)")
+        return {
+            "result_blob_name": result_blob_name,
+            "url": self._url(RESULTS_CONTAINER, result_blob_name),
+            "size": len(result_bytes),
+            "content_encoding": content_encoding,
+            "container": RESULTS_CONTAINER,
+            "source_blob": blob_name
+        }
+
+    def download_analysis_result(self, result_blob_name: str) -> Optional[bytes]:
+        try:
+            return self._path(RESULTS_CONTAINER, result_blob_name).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def get_analysis_result(self, result_blob_name: str) -> Optional[dict]:
+        content = self.download_analysis_result(result_blob_name)
+        if content is None:
+            return None
+        meta = self._read_meta(RESULTS_CONTAINER, result_blob_name)
+        return {
+            "etag": meta["etag"],
+            "data": decode_result(content),
+            "metadata": {
+                "result_blob_name": result_blob_name,
+                "created": meta["created"],
+                "last_modified": meta["last_modified"],
+                "size": meta["size"],
+                "url": self._url(RESULTS_CONTAINER, result_blob_name)
+            }
+        }
+
+    def store_analysis_pdf(self, result_blob_name: str, pdf_buffer) -> dict:
+        from src.app.services.file_management_service import FileManagementService
+
+        pdf_blob_name = pdf_blob_name_for(result_blob_name)
+        pdf_bytes = pdf_buffer.getvalue()
+        meta = self._put(PDFS_CONTAINER, pdf_blob_name, pdf_bytes, "application/pdf", metadata={
+            "source_result_blob": result_blob_name,
+            "generated_timestamp": datetime.now().isoformat()
+        })
+        FileManagementService.record_analysis_pdf(result_blob_name, pdf_blob_name, len(pdf_bytes), meta["etag"])
+        logging.info(f"Stored analysis PDF locally: {pdf_blob_name} ({len(pdf_bytes)} bytes)")
+        return {
+            "pdf_blob_name": pdf_blob_name,
+            "url": self._url(PDFS_CONTAINER, pdf_blob_name),
+            "size": len(pdf_bytes),
+            "etag": meta["etag"],
+            "container": PDFS_CONTAINER,
+            "source_result_blob": result_blob_name
+        }
+
+    def pdf_exists(self, result_blob_name: str) -> bool:
+        from src.app.services.file_management_service import FileManagementService
+
+        state = FileManagementService.get_analysis_pdf_state(result_blob_name)
+        if state is not None:
+            return state["pdf_generated_at"] is not None
+        return self._path(PDFS_CONTAINER, pdf_blob_name_for(result_blob_name)).exists()
+
+    def get_pdf_properties(self, result_blob_name: str):
+        """size, etag and last_modified of a PDF report, or None if it does not exist"""
+        try:
+            meta = self._read_meta(PDFS_CONTAINER, pdf_blob_name_for(result_blob_name))
+        except FileNotFoundError:
+            return None
+        return SimpleNamespace(size=meta["size"], etag=meta["etag"], last_modified=meta["last_modified"])
+
+    def open_pdf(self, result_blob_name: str) -> BinaryIO:
+        return open(self._path(PDFS_CONTAINER, pdf_blob_name_for(result_blob_name)), "rb")
+
+    def verify_containers(self):
+        for container in (self.container_name, RESULTS_CONTAINER, PDFS_CONTAINER):
+            (self.root / container).mkdir(parents=True, exist_ok=True)
+
+
+class AsyncLocalStorage:
+    """
+    Async facade over LocalStorageBackend with the AsyncAzureBlobService interface
+
+    Disk I/O runs in worker threads so async endpoints don't block the event loop.
+    """
+
+    def __init__(self, backend: LocalStorageBackend):
+        self.backend = backend
+
+    async def upload_sow_stream(self, upload, filename: str,
+                                content_type: str = "application/octet-stream") -> dict:
+        """Stream an upload to disk in UPLOAD_CHUNK_BYTES chunks (see AsyncAzureBlobService.upload_sow_stream)"""
+        max_bytes = max_upload_bytes()
+        chunk_bytes = upload_chunk_bytes()
+        declared_size = getattr(upload, "size", None)
+        if declared_size is not None and declared_size > max_bytes:
+            raise UploadTooLargeError(f"File is {declared_size} bytes; the limit is {max_bytes} bytes")
+
+        sha256 = hashlib.sha256()
+        size = 0
+        temp_file = await asyncio.to_thread(self.backend.begin_upload)
+        try:
+            with temp_file:
+                while True:
+                    chunk = await upload.read(chunk_bytes)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise UploadTooLargeError(f"File exceeds the upload limit of {max_bytes} bytes")
+                    sha256.update(chunk)
+                    await asyncio.to_thread(temp_file.write, chunk)
+            if size == 0:
+                raise EmptyUploadError("Empty file")
+            return await asyncio.to_thread(
+                self.backend.commit_upload, temp_file.name, filename, content_type, size, sha256.hexdigest()
+            )
+        finally:
+            if os.path.exists(temp_file.name):
+                os.unlink(temp_file.name)
+
+    async def delete_sow(self, blob_name: str) -> bool:
+        return await asyncio.to_thread(self.backend.delete_sow, blob_name)
+
+    async def download_analysis_result(self, result_blob_name: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self.backend.download_analysis_result, result_blob_name)
+
+    async def pdf_exists(self, result_blob_name: str) -> bool:
+        return await asyncio.to_thread(self.backend.pdf_exists, result_blob_name)
+
+    async def get_pdf_properties(self, result_blob_name: str):
+        return await asyncio.to_thread(self.backend.get_pdf_properties, result_blob_name)
+
+    async def stream_pdf(self, result_blob_name: str, offset: Optional[int] = None,
+                         length: Optional[int] = None, etag: Optional[str] = None) -> AsyncIterator[bytes]:
+        chunk_bytes = upload_chunk_bytes()
+        f = await asyncio.to_thread(self.backend.open_pdf, result_blob_name)
+        try:
+            if offset:
+                f.seek(offset)
+            remaining = length
+            while remaining is None or remaining > 0:
+                size = chunk_bytes if remaining is None else min(chunk_bytes, remaining)
+                chunk = await asyncio.to_thread(f.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
+
+    async def store_analysis_pdf(self, result_blob_name: str, pdf_buffer) -> dict:
+        return await asyncio.to_thread(self.backend.store_analysis_pdf, result_blob_name, pdf_buffer)
+
+    async def close(self):
+        pass
+
+
+def storage_backend_name() -> str:
+    return os.getenv("STORAGE_BACKEND", "azure").lower()
+
+
+_storage: Optional[StorageBackend] = None
+_storage_lock = threading.Lock()
+_async_storage = None
+
+
+def get_storage() -> StorageBackend:
+    """
+    Shared storage backend for this process, per STORAGE_BACKEND
+    """
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                if storage_backend_name() == "local":
+                    _storage = LocalStorageBackend()
+                else:
+                    from src.app.services.azure_blob_service import get_blob_service
+                    _storage = get_blob_service()
+                logging.info(f"Using {_storage.name} storage backend")
+    return _storage
+
+
+def get_async_storage():
+    """
+    Async storage for async endpoints: AsyncAzureBlobService or AsyncLocalStorage
+    """
+    global _async_storage
+    if _async_storage is None:
+        backend = get_storage()
+        if isinstance(backend, LocalStorageBackend):
+            _async_storage = AsyncLocalStorage(backend)
+        else:
+            from src.app.services.async_azure_blob_service import get_async_blob_service
+            _async_storage = get_async_blob_service()
+    return _async_storage
+
+
+async def close_storage():
+    """Close the shared sync and async storage clients (called at shutdown)"""
+    global _storage, _async_storage
+    with _storage_lock:
+        backend, _storage = _storage, None
+    _async_storage = None
+    if backend is None or isinstance(backend, LocalStorageBackend):
+        return
+    from src.app.services.async_azure_blob_service import close_async_blob_service
+    from src.app.services.azure_blob_service import close_blob_service
+    close_blob_service()
+    await close_async_blob_service()
@@ -1,41 +1,408 @@
 import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from pathlib import Path
-from docx import Document
-from PyPDF2 import PdfReader
+from typing import Dict, Iterator, List, Optional, Tuple
+from .extraction_backends import Source, get_backend
+from .document_structure import build_structure
+from .extraction_cache import ExtractionCache, content_hash
 
-def extract_text_from_docx(path: Path) -> str:
+# PDF extraction runs in a dedicated process pool; large PDFs are split into page ranges
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "25"))
+PDF_EXTRACT_TIMEOUT_SECONDS = float(os.getenv("PDF_EXTRACT_TIMEOUT_SECONDS", "120"))
+
+# Size guards; PDFs above PDF_WINDOWED_MIN_PAGES are analysed window by window
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "2000"))
+PDF_WINDOW_PAGES = int(os.getenv("PDF_WINDOW_PAGES", "50"))
+PDF_WINDOWED_MIN_PAGES = int(os.getenv("PDF_WINDOWED_MIN_PAGES", "150"))
+EXTRACT_MAX_CHARS = int(os.getenv("EXTRACT_MAX_CHARS", "5000000"))
+
+
+class DocumentTooLargeError(ValueError):
+    """Document exceeds the configured extraction limits"""
+
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # spawn avoids forking the multi-threaded server process
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logging.info(f"Started PDF extraction pool with {PDF_EXTRACT_WORKERS} workers")
+        return _pdf_pool
+
+
+def _reset_pdf_pool():
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not None:
+            _pdf_pool.shutdown(wait=False, cancel_futures=True)
+            _pdf_pool = None
+
+
+def shutdown_extraction_pool():
+    """Stop the PDF extraction worker processes (called on application shutdown)"""
+    _reset_pdf_pool()
+
+
+def _extract_pdf_page_range(path: Source, start: int, end: int, deadline: float,
+                            backend_name: str) -> Tuple[int, List[str], List[float], int]:
+    """
+    Extract pages [start, end) of a PDF; runs inside a pool worker (or inline)
+
+    Returns:
+        Tuple of (start page, page texts, per-page milliseconds, failed page count)
+    """
+    backend = get_backend("pdf", backend_name)
+    texts = []
+    timings = []
+    failures = 0
+    page_start = time.perf_counter()
+    for i, t in enumerate(backend.iter_page_texts(path, start, end), start=start):
+        if t is None:
+            t = ""
+            failures += 1
+        timings.append((time.perf_counter() - page_start) * 1000)
+        texts.append(t)
+        if time.time() > deadline and i + 1 < end:
+            raise TimeoutError(f"PDF extraction deadline exceeded at page {i + 1}")
+        page_start = time.perf_counter()
+    return start, texts, timings, failures
+
+
+def _is_stream(source) -> bool:
+    return hasattr(source, "read")
+
+
+def _source_label(source, suffix: str = "") -> str:
+    return f"<stream{suffix}>" if _is_stream(source) else str(source)
+
+
+@contextmanager
+def _worker_path(source: Source, task_count: int):
+    """
+    Path the pool workers can open, or None to extract inline
+
+    Streams are only written to a temp file when more than one task would run.
+    """
+    if PDF_EXTRACT_WORKERS <= 0:
+        yield None
+    elif not _is_stream(source):
+        yield str(source)
+    elif task_count <= 1:
+        yield None
+    else:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
+            source.seek(0)
+            shutil.copyfileobj(source, temp_file)
+        try:
+            yield temp_file.name
+        finally:
+            os.unlink(temp_file.name)
+
+
+def _extract_pdf_range(source: Source, worker_path: Optional[str], backend_name: str,
+                       first: int, last: int,
+                       timeout: Optional[float] = None) -> Tuple[List[str], List[float], int, int, int]:
+    """
+    Extract pages [first, last) split into PDF_PAGES_PER_TASK tasks, within timeout
+    seconds (default PDF_EXTRACT_TIMEOUT_SECONDS)
+
+    Returns:
+        Tuple of (page texts, per-page milliseconds, failed pages, task count, workers used)
+    """
+    if timeout is None:
+        timeout = PDF_EXTRACT_TIMEOUT_SECONDS
+    deadline = time.time() + timeout
+    ranges = [(s, min(s + PDF_PAGES_PER_TASK, last)) for s in range(first, last, PDF_PAGES_PER_TASK)]
+
+    results = None
+    workers = 0
+    if worker_path and ranges:
+        try:
+            pool = _get_pdf_pool()
+            futures = [pool.submit(_extract_pdf_page_range, worker_path, s, e, deadline, backend_name) for s, e in ranges]
+            done, not_done = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+            if not_done:
+                for f in not_done:
+                    f.cancel()
+                failed = next((f for f in done if f.exception()), None)
+                if failed:
+                    raise failed.exception()
+                raise TimeoutError(f"PDF extraction exceeded {PDF_EXTRACT_TIMEOUT_SECONDS}s for {_source_label(source, '.pdf')}")
+            results = [f.result() for f in futures]
+            workers = min(PDF_EXTRACT_WORKERS, len(ranges))
+        except BrokenProcessPool as pool_err:
+            logging.warning(f"PDF extraction pool unavailable ({pool_err}); extracting inline")
+            _reset_pdf_pool()
+
+    if results is None:
+        results = [_extract_pdf_page_range(source, s, e, deadline, backend_name) for s, e in ranges]
+
+    pages = []
+    page_ms = []
+    failed_pages = 0
+    for _, texts, timings, failures in sorted(results, key=lambda r: r[0]):
+        pages.extend(texts)
+        page_ms.extend(timings)
+        failed_pages += failures
+    return pages, page_ms, failed_pages, len(ranges), workers
+
+
+def _check_page_limit(page_count: int, source: Source):
+    if page_count > PDF_MAX_PAGES:
+        raise DocumentTooLargeError(
+            f"{_source_label(source, '.pdf')} has {page_count} pages; the limit is {PDF_MAX_PAGES} (PDF_MAX_PAGES)"
+        )
+
+
+def pdf_page_count(source: Source, backend_name: Optional[str] = None) -> int:
+    """Number of pages in a PDF"""
+    return get_backend("pdf", backend_name).page_count(source)
+
+
+def extract_pdf_pages(path: Source, backend_name: Optional[str] = None) -> Tuple[List[str], Dict]:
+    """
+    Extract the text of every page of a PDF, in page order
+
+    Page ranges of PDF_PAGES_PER_TASK pages are processed in parallel in the
+    extraction pool (PDF_EXTRACT_WORKERS=0 extracts inline). The whole document
+    must finish within PDF_EXTRACT_TIMEOUT_SECONDS. The backend defaults to
+    TEXT_EXTRACTOR_PDF.
+
+    A stream that fits in one task is extracted in this process without
+    touching disk; larger streams are written to a temp file the workers can open.
+
+    Raises:
+        DocumentTooLargeError: More than PDF_MAX_PAGES pages
+        TimeoutError: Extraction exceeded PDF_EXTRACT_TIMEOUT_SECONDS
+
+    Returns:
+        Tuple of (page texts, stats with per-page timings and failure counts)
+    """
+    started = time.perf_counter()
+    backend = get_backend("pdf", backend_name)
+    page_count = backend.page_count(path)
+    _check_page_limit(page_count, path)
+
+    task_count = -(-page_count // PDF_PAGES_PER_TASK)
+    with _worker_path(path, task_count) as worker_path:
+        pages, page_ms, failed_pages, tasks, workers = _extract_pdf_range(
+            path, worker_path, backend.name, 0, page_count
+        )
+
+    stats = {
+        "backend": backend.name,
+        "pages": page_count,
+        "failed_pages": failed_pages,
+        "tasks": tasks,
+        "workers": workers,
+        "page_ms": [round(ms, 1) for ms in page_ms],
+        "total_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+    return pages, stats
+
+
+def iter_pdf_text_windows(source: Source, window_pages: Optional[int] = None,
+                          max_chars: Optional[int] = None,
+                          backend_name: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Extract a PDF as a sequence of page-range windows
+
+    Only one window of page text is held at a time, so memory does not grow
+    with the document. Each window is an extracted document (text, sections,
+    page_offsets, with absolute page numbers) plus its page range:
+
+        {"start_page": 1, "end_page": 50, "text": ..., "sections": [...],
+         "page_offsets": [...], "truncated": False}
+
+    Extraction stops once max_chars (EXTRACT_MAX_CHARS) characters have been
+    produced; the last window is cut at the budget and marked truncated.
+    PDF_EXTRACT_TIMEOUT_SECONDS applies to the extraction time of all windows
+    together (time spent by the caller between windows is not counted).
+
+    Raises:
+        DocumentTooLargeError: More than PDF_MAX_PAGES pages
+        TimeoutError: Extraction exceeded PDF_EXTRACT_TIMEOUT_SECONDS
+    """
+    window_pages = window_pages or PDF_WINDOW_PAGES
+    max_chars = max_chars or EXTRACT_MAX_CHARS
+    backend = get_backend("pdf", backend_name)
+    page_count = backend.page_count(source)
+    _check_page_limit(page_count, source)
+    label = _source_label(source, ".pdf")
+
+    chars = 0
+    extract_seconds = 0.0
+    task_count = -(-page_count // PDF_PAGES_PER_TASK)
+    with _worker_path(source, task_count) as worker_path:
+        for first in range(0, page_count, window_pages):
+            last = min(first + window_pages, page_count)
+            remaining_seconds = PDF_EXTRACT_TIMEOUT_SECONDS - extract_seconds
+            if remaining_seconds <= 0:
+                raise TimeoutError(f"PDF extraction exceeded {PDF_EXTRACT_TIMEOUT_SECONDS}s for {label} at page {first + 1}")
+            started = time.perf_counter()
+            pages, _, failed_pages, _, _ = _extract_pdf_range(
+                source, worker_path, backend.name, first, last, timeout=remaining_seconds
+            )
+            extract_seconds += time.perf_counter() - started
+
+            blocks = []
+            truncated = False
+            for page_no, page_text in enumerate(pages, start=first + 1):
+                if not page_text:
+                    continue
+                remaining = max_chars - chars
+                if len(page_text) > remaining:
+                    page_text = page_text[:remaining]
+                    truncated = True
+                chars += len(page_text)
+                blocks.extend((line, None, page_no) for line in page_text.split("\n"))
+                if truncated:
+                    break
+            del pages
+
+            window = build_structure(blocks)
+            window.update({"start_page": first + 1, "end_page": last, "truncated": truncated})
+            logging.info(
+                f"Extracted pages {first + 1}-{last} of {page_count} from {label} "
+                f"({len(window['text'])} chars, {failed_pages} failed)"
+            )
+            yield window
+
+            if truncated:
+                logging.warning(
+                    f"Stopped extracting {label} at page {last}: character budget of {max_chars} reached (EXTRACT_MAX_CHARS)"
+                )
+                return
+
+
+def extract_text_from_docx(path: Source) -> str:
     try:
-        doc = Document(path)
-        return "\n".join(p.text for p in doc.paragraphs)
+        return get_backend("docx").extract(path)
     except Exception as e:
-        logging.error(f"Failed to extract text from DOCX {path}: {e}")
+        logging.error(f"Failed to extract text from DOCX {_source_label(path, '.docx')}: {e}")
         return ""
 
-def extract_text_from_pdf(path: Path) -> str:
+def extract_text_from_pdf(path: Source) -> str:
     try:
-        reader = PdfReader(str(path))
-        parts = []
-        for p in reader.pages:
-            try:
-                t = p.extract_text() or ""
-            except Exception as page_err:
-                logging.warning(f"Failed to extract text from page in {path}: {page_err}")
-                t = ""
-            if t:
-                parts.append(t)
-        return "\n".join(parts)
+        pages, stats = extract_pdf_pages(path)
+        slowest = max(stats["page_ms"], default=0)
+        logging.info(
+            f"Extracted {stats['pages']} PDF pages from {_source_label(path, '.pdf')} with {stats['backend']} "
+            f"in {stats['total_ms']}ms ({stats['tasks']} tasks, {stats['workers']} workers, "
+            f"{stats['failed_pages']} failed, slowest page {slowest}ms)"
+        )
+        return "\n".join(t for t in pages if t)
+    except (DocumentTooLargeError, TimeoutError):
+        # Not an empty document; let the caller fail the analysis
+        raise
     except Exception as e:
-        logging.error(f"Failed to extract text from PDF {path}: {e}")
+        logging.error(f"Failed to extract text from PDF {_source_label(path, '.pdf')}: {e}")
         return ""
 
-def extract_text(path: Path) -> str:
-    suffix = path.suffix.lower()
+def _extract_blocks(source: Source, suffix: str):
+    """(text, heading level, page) blocks for build_structure"""
     if suffix == ".docx":
-        return extract_text_from_docx(path)
-    elif suffix == ".pdf":
-        return extract_text_from_pdf(path)
-    elif suffix == ".txt":
-        return path.read_text(encoding="utf-8", errors="ignore")
+        backend = get_backend("docx")
+        if hasattr(backend, "iter_blocks"):
+            return backend.name, list(backend.iter_blocks(source))
+        return backend.name, [(line, None, None) for line in backend.extract(source).split("\n")]
+    if suffix == ".pdf":
+        pages, stats = extract_pdf_pages(source)
+        logging.info(
+            f"Extracted {stats['pages']} PDF pages from {_source_label(source, suffix)} with {stats['backend']} "
+            f"in {stats['total_ms']}ms ({stats['tasks']} tasks, {stats['workers']} workers, "
+            f"{stats['failed_pages']} failed)"
+        )
+        # Empty pages are skipped, matching extract_text_from_pdf
+        return stats["backend"], [
+            (line, None, page_no)
+            for page_no, page_text in enumerate(pages, start=1) if page_text
+            for line in page_text.split("\n")
+        ]
+    if _is_stream(source):
+        source.seek(0)
+        text = source.read().decode("utf-8", errors="ignore")
     else:
-        logging.warning(f"Unsupported file type: {path.suffix} for file {path}")
-        return ""
+        text = Path(source).read_text(encoding="utf-8", errors="ignore")
+    return "text", [(line, None, None) for line in text.split("\n")]
+
+
+def _cache_backend_key(suffix: str) -> str:
+    return get_backend(suffix.lstrip(".")).name if suffix != ".txt" else "text"
+
+
+def cached_document(digest: str, suffix: str) -> Optional[Dict]:
+    """Extracted document from the cache by content hash, without reading the file"""
+    suffix = suffix.lower()
+    if suffix not in (".docx", ".pdf", ".txt"):
+        return None
+    return ExtractionCache().get(digest, _cache_backend_key(suffix))
+
+
+def extract_document(source: Source, suffix: Optional[str] = None) -> Dict:
+    """
+    Extract text plus its section tree and page offsets (see document_structure)
+
+    Args:
+        source: File path or seekable binary stream (e.g. from download_sow_stream)
+        suffix: File extension; required for streams, taken from the path otherwise
+
+    Results are cached by file content hash, so re-analysing the same document
+    does not re-parse it. Returns an empty document on failure.
+
+    Raises:
+        DocumentTooLargeError: PDF exceeds PDF_MAX_PAGES
+        TimeoutError: PDF extraction exceeded PDF_EXTRACT_TIMEOUT_SECONDS
+    """
+    if not _is_stream(source):
+        source = Path(source)
+        suffix = suffix or source.suffix
+    suffix = (suffix or "").lower()
+    label = _source_label(source, suffix)
+    empty = {"text": "", "sections": [], "page_offsets": []}
+    if suffix not in (".docx", ".pdf", ".txt"):
+        logging.warning(f"Unsupported file type: {suffix} for file {label}")
+        return empty
+
+    try:
+        digest = content_hash(source)
+        cache = ExtractionCache()
+        backend_key = _cache_backend_key(suffix)
+        cached = cache.get(digest, backend_key)
+        if cached is not None:
+            return cached
+
+        backend_name, blocks = _extract_blocks(source, suffix)
+        document = build_structure(blocks)
+        document["content_hash"] = digest
+        document["backend"] = backend_name
+        logging.info(f"Extracted {len(document['text'])} chars and {len(document['sections'])} sections from {label}")
+        if document["text"].strip():
+            cache.put(digest, backend_key, document)
+        return document
+    except (DocumentTooLargeError, TimeoutError):
+        raise
+    except Exception as e:
+        logging.error(f"Failed to extract document structure from {label}: {e}")
+        return empty
+
+
+def extract_text(path: Source, suffix: Optional[str] = None) -> str:
+    return extract_document(path, suffix)["text"]
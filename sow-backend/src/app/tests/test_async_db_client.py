@@ -0,0 +1,74 @@
+"""
+Test cases for the async database client
+"""
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.app.db import async_client
+
+
+def fake_connection(rows):
+    cursor = MagicMock()
+    cursor.fetchall = AsyncMock(return_value=rows)
+    cursor.fetchone = AsyncMock(return_value=rows[0] if rows else None)
+    cursor.rowcount = len(rows)
+    conn = MagicMock()
+    conn.execute = AsyncMock(return_value=cursor)
+    conn.commit = AsyncMock()
+
+    @asynccontextmanager
+    async def borrow():
+        yield conn
+
+    return conn, borrow
+
+
+class TestExecuteQueryAsync:
+    """Tests for execute_query_async / execute_update_async"""
+
+    def test_select_returns_dicts(self):
+        conn, borrow = fake_connection([{"id": 1}, {"id": 2}])
+        with patch.object(async_client, "async_db_connection", borrow):
+            rows = asyncio.run(async_client.execute_query_async("SELECT id FROM countries WHERE region = %s", ("EU",)))
+
+        assert rows == [{"id": 1}, {"id": 2}]
+        conn.execute.assert_awaited_once_with("SELECT id FROM countries WHERE region = %s", ("EU",))
+        conn.commit.assert_not_awaited()
+
+    def test_mutation_commits(self):
+        """Test INSERT ... RETURNING is committed after its row is fetched"""
+        conn, borrow = fake_connection([{"id": 7}])
+        with patch.object(async_client, "async_db_connection", borrow):
+            row = asyncio.run(async_client.execute_query_async(
+                "INSERT INTO countries (country_name) VALUES (%s) RETURNING id", ("Peru",), fetch_one=True
+            ))
+
+        assert row == {"id": 7}
+        conn.commit.assert_awaited_once()
+
+    def test_update_returns_id(self):
+        conn, borrow = fake_connection([{"id": 9}])
+        with patch.object(async_client, "async_db_connection", borrow):
+            result = asyncio.run(async_client.execute_update_async(
+                "INSERT INTO categories (category_name) VALUES (%s) RETURNING id", ("Legal",), return_id=True
+            ))
+
+        assert result == 9
+        conn.commit.assert_awaited_once()
+
+    def test_errors_propagate(self):
+        conn, borrow = fake_connection([])
+        conn.execute.side_effect = Exception("relation does not exist")
+        with patch.object(async_client, "async_db_connection", borrow):
+            with pytest.raises(Exception, match="relation does not exist"):
+                asyncio.run(async_client.execute_query_async("SELECT 1 FROM missing"))
+
+
+class TestAsyncPool:
+    """Tests for the shared async pool"""
+
+    def test_disabled_pool(self, monkeypatch):
+        monkeypatch.setenv("DB_ASYNC_POOL_MAX_SIZE", "0")
+        assert asyncio.run(async_client.get_async_pool()) is None
+        assert async_client.async_db_pool_stats() is None
@@ -0,0 +1,239 @@
+"""
+Test cases for the shared Azure Blob Storage service
+"""
+import asyncio
+import hashlib
+import io
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.app.core import blob_disk_cache
+from src.app.core.blob_disk_cache import BlobDiskCache
+from src.app.core.hybrid_cache import InProcessCache
+from src.app.services import async_azure_blob_service, azure_blob_service
+from src.app.services.async_azure_blob_service import AsyncAzureBlobService, UploadTooLargeError
+from src.app.services.azure_blob_service import (
+    get_blob_service, pdf_blob_name_for, result_blob_name_for, sow_blob_name
+)
+from src.app.utils.result_codec import encode_result
+
+
+@pytest.fixture
+def blob_client(monkeypatch):
+    """Patched BlobServiceClient with a fresh shared service and container memo"""
+    monkeypatch.setenv("AZURE_STORAGE_CONNECTION_STRING", "UseDevelopmentStorage=true")
+    monkeypatch.setattr(azure_blob_service, "_blob_service", None)
+    monkeypatch.setattr(azure_blob_service.AzureBlobService, "_verified_containers", set())
+    monkeypatch.setattr(blob_disk_cache, "_cache", None)
+    monkeypatch.setattr(blob_disk_cache, "_cache_loaded", True)
+    with patch.object(azure_blob_service, "BlobServiceClient") as mock_client_cls, \
+            patch.object(azure_blob_service, "FileManagementService"):
+        client = mock_client_cls.from_connection_string.return_value
+        client.get_container_client.return_value.exists.return_value = True
+        yield client
+
+
+class TestGetBlobService:
+    """Tests for get_blob_service"""
+
+    def test_single_client_per_process(self, blob_client):
+        """Test every caller shares one service and one BlobServiceClient"""
+        assert get_blob_service() is get_blob_service()
+        assert azure_blob_service.BlobServiceClient.from_connection_string.call_count == 1
+
+    def test_containers_checked_once(self, blob_client):
+        """Test container existence is checked once, not on every write"""
+        service = get_blob_service()
+        service.verify_containers()
+        service.store_analysis_result("sow.docx", {"prompts_processed": 1})
+        service.store_analysis_pdf("sow__analysis__1.json", io.BytesIO(b"%PDF"))
+
+        checked = [c.args[0] for c in blob_client.get_container_client.call_args_list]
+        assert sorted(checked) == ["sow-analysis-pdfs", "sow-analysis-results", "sow-uploads"]
+        assert blob_client.get_container_client.return_value.exists.call_count == 3
+
+    def test_missing_container_created(self, blob_client):
+        """Test a missing container is created and then remembered"""
+        blob_client.get_container_client.return_value.exists.return_value = False
+        service = get_blob_service()
+        service.verify_containers()
+        service.verify_containers()
+
+        assert blob_client.get_container_client.return_value.create_container.call_count == 3
+
+
+class TestPdfState:
+    """Tests for PDF availability recorded in analysis_results"""
+
+    def test_store_records_pdf_state(self, blob_client):
+        """Test storing a PDF records its blob name, size and etag"""
+        blob_client.get_blob_client.return_value.upload_blob.return_value = {"etag": '"0x1"'}
+        get_blob_service().store_analysis_pdf("sow__analysis__1.json", io.BytesIO(b"%PDF-1.4"))
+
+        azure_blob_service.FileManagementService.record_analysis_pdf.assert_called_once_with(
+            "sow__analysis__1.json", "sow__analysis__1.pdf", 8, '"0x1"'
+        )
+
+    def test_pdf_exists_trusts_database(self, blob_client):
+        """Test tracked results are answered from the database without a HEAD request"""
+        files = azure_blob_service.FileManagementService
+        service = get_blob_service()
+
+        files.get_analysis_pdf_state.return_value = {"pdf_generated_at": "2025-01-01T00:00:00"}
+        assert service.pdf_exists("sow__analysis__1.json") is True
+        files.get_analysis_pdf_state.return_value = {"pdf_generated_at": None}
+        assert service.pdf_exists("sow__analysis__1.json") is False
+        blob_client.get_blob_client.return_value.exists.assert_not_called()
+
+        # Results the database does not know about fall back to storage
+        files.get_analysis_pdf_state.return_value = None
+        blob_client.get_blob_client.return_value.exists.return_value = True
+        assert service.pdf_exists("legacy__analysis__1.json") is True
+
+
+class TestGetAnalysisResult:
+    """Tests for the ETag-validated analysis result cache"""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        InProcessCache.invalidate("*", category="analysis_results")
+        yield
+        InProcessCache.invalidate("*", category="analysis_results")
+
+    def downloader(self, etag, data):
+        downloader = MagicMock()
+        downloader.readinto.side_effect = lambda stream: stream.write(encode_result(data)[0])
+        downloader.properties.etag = etag
+        downloader.properties.size = 10
+        downloader.properties.creation_time = None
+        downloader.properties.last_modified = None
+        return downloader
+
+    def test_single_download_then_revalidate(self, blob_client):
+        """Test the first open downloads once and later opens are 304-revalidated"""
+        result_blob = blob_client.get_blob_client.return_value
+        result_blob.download_blob.side_effect = [
+            self.downloader('"v1"', {"prompts_processed": 2}),
+            azure_blob_service.ResourceNotModifiedError("not modified")
+        ]
+        service = get_blob_service()
+
+        first = service.get_analysis_result("sow__analysis__1.json")
+        second = service.get_analysis_result("sow__analysis__1.json")
+
+        assert first["data"] == {"prompts_processed": 2}
+        assert second is first
+        assert result_blob.download_blob.call_args.kwargs["etag"] == '"v1"'
+        result_blob.exists.assert_not_called()
+        result_blob.get_blob_properties.assert_not_called()
+
+    def test_changed_result_replaces_cache(self, blob_client):
+        """Test a new ETag replaces the cached copy"""
+        result_blob = blob_client.get_blob_client.return_value
+        result_blob.download_blob.side_effect = [
+            self.downloader('"v1"', {"version": 1}),
+            self.downloader('"v2"', {"version": 2})
+        ]
+        service = get_blob_service()
+
+        service.get_analysis_result("sow__analysis__1.json")
+        assert service.get_analysis_result("sow__analysis__1.json")["data"] == {"version": 2}
+
+    def test_disk_cache_after_restart(self, blob_client, monkeypatch, tmp_path):
+        """Test a result evicted from memory is revalidated and read from the disk cache"""
+        cache = BlobDiskCache(str(tmp_path), 1024 * 1024)
+        monkeypatch.setattr(blob_disk_cache, "_cache", cache)
+        result_blob = blob_client.get_blob_client.return_value
+        result_blob.download_blob.side_effect = [
+            self.downloader('"v1"', {"prompts_processed": 2}),
+            azure_blob_service.ResourceNotModifiedError("not modified")
+        ]
+        service = get_blob_service()
+
+        service.get_analysis_result("sow__analysis__1.json")
+        InProcessCache.invalidate("*", category="analysis_results")
+        result = service.get_analysis_result("sow__analysis__1.json")
+
+        assert result["data"] == {"prompts_processed": 2}
+        assert result["etag"] == '"v1"'
+        assert result_blob.download_blob.call_args.kwargs["etag"] == '"v1"'
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+
+class TestBlobNaming:
+    """Tests for the naming helpers shared by the sync and async services"""
+
+    def test_names(self):
+        """Test upload, result and PDF blob names"""
+        assert sow_blob_name("SOW A.docx", "20250101_120000") == "20250101_120000_SOW A.docx"
+        result = result_blob_name_for("20250101_120000_SOW A.docx", "20250102_090000")
+        assert result == "20250101_120000_SOW A__analysis__20250102_090000.json"
+        assert pdf_blob_name_for(result) == "20250101_120000_SOW A__analysis__20250102_090000.pdf"
+
+
+class TestAsyncAzureBlobService:
+    """Tests for AsyncAzureBlobService"""
+
+    @pytest.fixture
+    def aio_client(self, monkeypatch):
+        monkeypatch.setenv("AZURE_STORAGE_CONNECTION_STRING", "UseDevelopmentStorage=true")
+        monkeypatch.setattr(azure_blob_service.AzureBlobService, "_verified_containers", {"sow-uploads"})
+        with patch.object(async_azure_blob_service, "BlobServiceClient") as mock_client_cls, \
+                patch.object(async_azure_blob_service, "FileManagementService"):
+            client = mock_client_cls.from_connection_string.return_value
+            blob_client = MagicMock()
+            blob_client.upload_blob = AsyncMock()
+            blob_client.stage_block = AsyncMock()
+            blob_client.commit_block_list = AsyncMock()
+            blob_client.url = "https://example/blob"
+            client.get_blob_client.return_value = blob_client
+            yield client
+
+    def test_upload_awaits_sdk(self, aio_client):
+        """Test uploads await the aio client and skip verified containers"""
+        service = AsyncAzureBlobService()
+        result = asyncio.run(service.upload_sow(b"data", "sow.pdf", "application/pdf"))
+
+        assert result["blob_name"].endswith("_sow.pdf")
+        assert result["size"] == 4
+        aio_client.get_blob_client.return_value.upload_blob.assert_awaited_once()
+        aio_client.get_container_client.assert_not_called()
+
+    def test_stream_upload_in_blocks(self, aio_client, monkeypatch):
+        """Test uploads are staged chunk by chunk and hashed on the way"""
+        monkeypatch.setenv("UPLOAD_CHUNK_BYTES", "4")
+        data = b"0123456789"
+        upload = FakeUpload(data)
+
+        result = asyncio.run(AsyncAzureBlobService().upload_sow_stream(upload, "sow.pdf"))
+
+        blob_client = aio_client.get_blob_client.return_value
+        staged = [c.args[1] for c in blob_client.stage_block.call_args_list]
+        assert staged == [b"0123", b"4567", b"89"]
+        blob_client.commit_block_list.assert_awaited_once()
+        assert result["size"] == 10
+        assert result["content_hash"] == hashlib.sha256(data).hexdigest()
+
+    def test_stream_upload_over_limit(self, aio_client, monkeypatch):
+        """Test oversized uploads stop reading early and are never committed"""
+        monkeypatch.setenv("UPLOAD_CHUNK_BYTES", "4")
+        monkeypatch.setenv("MAX_UPLOAD_BYTES", "6")
+        upload = FakeUpload(b"x" * 100)
+
+        with pytest.raises(UploadTooLargeError):
+            asyncio.run(AsyncAzureBlobService().upload_sow_stream(upload, "big.pdf"))
+
+        assert upload.reads == 2
+        aio_client.get_blob_client.return_value.commit_block_list.assert_not_called()
+
+
+class FakeUpload:
+    """Minimal UploadFile stand-in with an async read(size)"""
+
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+        self.reads = 0
+
+    async def read(self, size=-1):
+        self.reads += 1
+        return self.stream.read(size)
@@ -0,0 +1,95 @@
+"""
+Test cases for the read-through blob disk cache
+"""
+import os
+import time
+import pytest
+from src.app.core.blob_disk_cache import STALE_TEMP_SECONDS, BlobDiskCache
+
+
+def store(cache, name, etag, data):
+    hit = cache.store("sow-uploads", name, etag, len(data), {"etag": etag}, lambda f: f.write(data))
+    if hit:
+        hit[0].close()
+    return hit
+
+
+class TestBlobDiskCache:
+    """Tests for BlobDiskCache"""
+
+    def test_store_and_open(self, tmp_path):
+        """Test an entry is served only for the ETag it was stored with"""
+        cache = BlobDiskCache(str(tmp_path), 1000)
+        store(cache, "a.pdf", '"v1"', b"hello")
+
+        assert cache.etag("sow-uploads", "a.pdf") == '"v1"'
+        assert cache.read("sow-uploads", "a.pdf", '"v1"') == b"hello"
+        assert cache.read("sow-uploads", "a.pdf", '"v2"') is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_new_etag_replaces_entry(self, tmp_path):
+        cache = BlobDiskCache(str(tmp_path), 1000)
+        store(cache, "a.pdf", '"v1"', b"old")
+        store(cache, "a.pdf", '"v2"', b"newer")
+
+        assert cache.read("sow-uploads", "a.pdf", '"v2"') == b"newer"
+        assert cache.stats()["entries"] == 1
+        assert cache.stats()["bytes"] == 5
+
+    def test_lru_eviction(self, tmp_path):
+        """Test the least recently used entry is evicted once over budget"""
+        cache = BlobDiskCache(str(tmp_path), 10)
+        store(cache, "a.pdf", '"a"', b"aaaa")
+        store(cache, "b.pdf", '"b"', b"bbbb")
+        cache.read("sow-uploads", "a.pdf", '"a"')
+        store(cache, "c.pdf", '"c"', b"cccc")
+
+        assert cache.etag("sow-uploads", "b.pdf") is None
+        assert cache.read("sow-uploads", "a.pdf", '"a"') == b"aaaa"
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] == 8
+
+    def test_too_large_bypassed(self, tmp_path):
+        cache = BlobDiskCache(str(tmp_path), 10)
+        assert store(cache, "big.pdf", '"x"', b"x" * 11) is None
+        assert cache.stats()["bypassed"] == 1
+        assert cache.stats()["entries"] == 0
+
+    def test_index_survives_restart(self, tmp_path):
+        """Test entries are reloaded from disk and stale leftovers are cleaned up"""
+        cache = BlobDiskCache(str(tmp_path), 1000)
+        store(cache, "a.pdf", '"v1"', b"hello")
+        (tmp_path / "ab").mkdir()
+        stale = tmp_path / "ab" / ".tmp-partial"
+        stale.write_bytes(b"partial")
+        old = time.time() - STALE_TEMP_SECONDS - 60
+        os.utime(stale, (old, old))
+
+        reloaded = BlobDiskCache(str(tmp_path), 1000)
+
+        assert reloaded.read("sow-uploads", "a.pdf", '"v1"') == b"hello"
+        assert not stale.exists()
+
+    def test_shared_directory_keeps_in_progress_writes(self, tmp_path):
+        """Test a worker starting up leaves another worker's in-progress temp files alone"""
+        (tmp_path / "ab").mkdir()
+        in_progress = [tmp_path / "ab" / ".tmp-download", tmp_path / "ab" / ".tmp-meta.json"]
+        for path in in_progress:
+            path.write_bytes(b"partial")
+
+        BlobDiskCache(str(tmp_path), 1000)
+
+        assert all(path.exists() for path in in_progress)
+
+    def test_failed_write_not_cached(self, tmp_path):
+        cache = BlobDiskCache(str(tmp_path), 1000)
+
+        def writer(f):
+            f.write(b"part")
+            raise IOError("connection reset")
+
+        with pytest.raises(IOError):
+            cache.store("sow-uploads", "a.pdf", '"v1"', 10, {}, writer)
+        assert cache.etag("sow-uploads", "a.pdf") is None
+        assert not list(tmp_path.rglob(".tmp-*"))
@@ -0,0 +1,113 @@
+"""
+Test cases for the database connection pool
+"""
+import threading
+import pytest
+from unittest.mock import MagicMock
+from src.app.db import pool as pool_module
+from src.app.db.pool import ConnectionPool, PooledConnection, PoolTimeout
+
+
+def fake_connect():
+    conn = MagicMock()
+    conn.closed = 0
+    conn.autocommit = False
+    conn.info.transaction_status = pool_module.extensions.TRANSACTION_STATUS_IDLE
+    return conn
+
+
+class TestConnectionPool:
+    """Tests for ConnectionPool"""
+
+    def test_connections_reused(self):
+        """Test a returned connection is handed out again instead of reconnecting"""
+        connect = MagicMock(side_effect=fake_connect)
+        pool = ConnectionPool(connect, min_size=0, max_size=2)
+
+        first = pool.getconn()
+        pool.putconn(first)
+        second = pool.getconn()
+
+        assert second is first
+        assert connect.call_count == 1
+        assert pool.stats()["reused"] == 1
+
+    def test_open_transaction_rolled_back(self):
+        conn = fake_connect()
+        conn.info.transaction_status = 2
+        pool = ConnectionPool(lambda: conn, min_size=0, max_size=1)
+
+        pool.putconn(pool.getconn())
+
+        conn.rollback.assert_called_once()
+        assert pool.stats()["idle"] == 1
+
+    def test_expired_connection_replaced(self):
+        """Test connections past max_lifetime are closed instead of reused"""
+        connect = MagicMock(side_effect=fake_connect)
+        pool = ConnectionPool(connect, min_size=0, max_size=1, max_lifetime=-1)
+
+        first = pool.getconn()
+        pool.putconn(first)
+        second = pool.getconn()
+
+        assert second is not first
+        first.close.assert_called_once()
+        assert pool.stats()["size"] == 1
+
+    def test_health_check_after_idle(self):
+        """Test idle connections are pinged and replaced if the ping fails"""
+        connect = MagicMock(side_effect=fake_connect)
+        pool = ConnectionPool(connect, min_size=0, max_size=1, health_check_after=0)
+
+        first = pool.getconn()
+        first.cursor.return_value.__enter__.return_value.execute.side_effect = Exception("server closed the connection")
+        pool.putconn(first)
+        second = pool.getconn()
+
+        assert second is not first
+        assert pool.stats()["discarded"] == 1
+
+    def test_waits_then_times_out(self):
+        """Test callers wait for a free connection and give up after the timeout"""
+        pool = ConnectionPool(fake_connect, min_size=0, max_size=1, timeout=0.05)
+        held = pool.getconn()
+
+        with pytest.raises(PoolTimeout):
+            pool.getconn()
+
+        threading.Timer(0.01, pool.putconn, args=(held,)).start()
+        pool.timeout = 2
+        assert pool.getconn() is held
+
+    def test_min_size_opened(self):
+        connect = MagicMock(side_effect=fake_connect)
+        pool = ConnectionPool(connect, min_size=3, max_size=5)
+        pool.open()
+        assert pool.stats()["idle"] == 3
+        pool.closeall()
+        assert pool.stats()["size"] == 0
+
+
+class TestPooledConnection:
+    """Tests for the connection wrapper handed to callers"""
+
+    def test_close_returns_to_pool(self):
+        pool = ConnectionPool(fake_connect, min_size=0, max_size=1)
+        conn = PooledConnection(pool, pool.getconn())
+
+        conn.cursor()
+        conn.close()
+        conn.close()
+
+        assert conn.closed
+        assert pool.stats()["idle"] == 1
+
+    def test_unclosed_connection_returned_on_release(self):
+        """Test a connection the caller forgot to close is not leaked"""
+        pool = ConnectionPool(fake_connect, min_size=0, max_size=1)
+        conn = PooledConnection(pool, pool.getconn())
+
+        del conn
+
+        assert pool.stats()["idle"] == 1
@@ -0,0 +1,88 @@
+"""
+Test cases for the extracted-document section tree
+"""
+from src.app.services.document_structure import (
+    build_structure, chunk_by_sections, detect_heading, find_sections, locate_findings, page_for_offset
+)
+
+
+def pdf_blocks(pages):
+    """Blocks as produced for a PDF: one per line, tagged with its page"""
+    return [(line, None, page_no) for page_no, text in enumerate(pages, start=1) for line in text.split("\n")]
+
+
+class TestDetectHeading:
+    """Tests for the plain-text heading heuristics"""
+
+    def test_headings(self):
+        """Test numbered, labeled and all-caps headings"""
+        assert detect_heading("4. Commercial Terms") == 1
+        assert detect_heading("4.2 Rate Schedule") == 2
+        assert detect_heading("EXHIBIT A - PRICING") == 1
+        assert detect_heading("TERMINATION") == 1
+
+    def test_body_text(self):
+        """Test numbered clauses and prose are not headings"""
+        assert detect_heading("3. The Supplier shall provide the services.") is None
+        assert detect_heading("Rates may be adjusted annually by CPI.") is None
+        assert detect_heading("") is None
+
+
+class TestBuildStructure:
+    """Tests for build_structure and offset lookups"""
+
+    def test_pdf_sections_and_pages(self):
+        """Test section offsets, nesting and page numbers from PDF pages"""
+        doc = build_structure(pdf_blocks([
+            "1. Scope\nBuild the app.",
+            "2. Pricing\n2.1 Rate Schedule\nRates may increase 3% annually.",
+        ]))
+
+        assert doc["text"] == "1. Scope\nBuild the app.\n2. Pricing\n2.1 Rate Schedule\nRates may increase 3% annually."
+        assert [(s["title"], s["level"], s["page"], s["parent"]) for s in doc["sections"]] == [
+            ("1. Scope", 1, 1, None), ("2. Pricing", 1, 2, None), ("2.1 Rate Schedule", 2, 2, 1)
+        ]
+        pricing = doc["sections"][1]
+        assert doc["text"][pricing["start"]:pricing["end"]].startswith("2. Pricing")
+        assert pricing["end"] == len(doc["text"])
+        assert page_for_offset(doc["page_offsets"], doc["text"].index("Rates may")) == 2
+        assert [s["title"] for s in find_sections(doc["sections"])] == ["2. Pricing", "2.1 Rate Schedule"]
+
+    def test_styled_headings_disable_heuristics(self):
+        """Test explicit heading levels are used as-is when present"""
+        doc = build_structure([("Overview", 1, 1), ("TERMINATION", None, 1)])
+        assert [s["title"] for s in doc["sections"]] == ["Overview"]
+
+    def test_locate_findings(self):
+        """Test findings get the section path and page of their quoted text"""
+        doc = build_structure(pdf_blocks([
+            "1. Scope\nBuild the app.",
+            "2. Pricing\n2.1 Rate Schedule\nRates may increase 3% annually.",
+        ]))
+        findings = [
+            {"original_text": "Rates may  increase 3% annually.", "section_hint": None},
+            {"original_text": "Paraphrased by the model"},
+        ]
+        locate_findings(findings, doc)
+
+        assert findings[0]["section_hint"] == "2. Pricing > 2.1 Rate Schedule"
+        assert findings[0]["page"] == 2
+        assert "page" not in findings[1]
+
+
+class TestChunkBySections:
+    """Tests for chunk_by_sections"""
+
+    def test_chunks_break_on_sections(self):
+        """Test sections are packed without splitting and chunks respect the size limit"""
+        doc = build_structure(pdf_blocks(["1. Scope\n" + "a" * 30 + "\n2. Pricing\n" + "b" * 30 + "\n3. Term\nc"]))
+        chunks = chunk_by_sections(doc["text"], doc["sections"], max_chars=50)
+
+        assert "".join(chunks) == doc["text"]
+        assert all(len(c) <= 50 for c in chunks)
+        assert chunks[1].startswith("2. Pricing")
+
+    def test_oversized_line_is_hard_split(self):
+        """Test a single line longer than the limit is still split"""
+        chunks = chunk_by_sections("x" * 120, [], max_chars=50)
+        assert [len(c) for c in chunks] == [50, 50, 20]
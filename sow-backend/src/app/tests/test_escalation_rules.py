@@ -0,0 +1,138 @@
+"""
+Test cases for the deterministic escalation rule engine
+"""
+import pytest
+from src.app.services.escalation_rules import (
+    analyze_escalation_clauses, classify_cap, extract_percentages, merge_rule_and_llm_analysis
+)
+
+
+class TestClassifyCap:
+    """Tests for the compliance decision rules"""
+
+    @pytest.mark.parametrize("cap,status", [
+        (6.0, "non_compliant"),
+        (5.0, "tighten"),
+        (4.5, "tighten"),
+        (4.0, "compliant"),
+        (3.0, "compliant"),
+        (None, "missing_cap"),
+    ])
+    def test_classify_cap(self, cap, status):
+        """Test cap thresholds from the decision rules"""
+        assert classify_cap(cap)[0] == status
+
+    def test_extract_spelled_out_percent(self):
+        """Test percentages written in words and digits are deduplicated"""
+        assert extract_percentages("not to exceed six percent (6%)") == [6.0]
+        assert extract_percentages("three and one-half percent") == [3.5]
+
+
+class TestAnalyzeEscalationClauses:
+    """Tests for analyze_escalation_clauses"""
+
+    def test_prompt_examples_resolved_without_llm(self):
+        """Test the examples from the ADM-E01 prompt are settled by the rules"""
+        text = "\n".join([
+            "Rates may be adjusted annually by CPI, not to exceed six percent (6%).",
+            "Annual adjustment equal to CPI-U, capped at three percent (3%).",
+            "Annual price increase shall be the lesser of CPI or five percent (5%).",
+            "Prices are subject to supplier's standard annual list update and inflation.",
+        ])
+        analysis, remaining = analyze_escalation_clauses(text)
+
+        assert remaining == []
+        assert analysis["detected"] is True
+        assert [f["compliance_status"] for f in analysis["findings"]] == [
+            "non_compliant", "compliant", "tighten", "missing_cap"
+        ]
+        assert analysis["findings"][1]["basis_index"] == "CPI-U"
+        assert analysis["overall_risk"] == "high"
+
+    def test_no_escalation_language(self):
+        """Test documents without trigger terms are not detected and go to the LLM whole"""
+        text = "The project kicks off in January.\nSupplier may raise its hourly rates by 8% each year."
+        analysis, remaining = analyze_escalation_clauses(text)
+
+        assert remaining == [text]
+        assert analysis["detected"] is False
+        assert analysis["overall_risk"] == "none"
+
+    def test_unsettled_paragraphs_left_for_llm(self):
+        """Test paragraphs without trigger terms still reach the LLM next to rule findings"""
+        text = "\n".join([
+            "Annual adjustment equal to CPI-U, capped at three percent (3%).",
+            "Supplier may raise its hourly rates by 8% each year.",
+        ])
+        analysis, remaining = analyze_escalation_clauses(text)
+
+        assert len(analysis["findings"]) == 1
+        assert remaining == ["Supplier may raise its hourly rates by 8% each year."]
+
+    @pytest.mark.parametrize("text", [
+        "Rates shall increase annually by CPI or 3%, whichever is greater.",
+        "Prices will be adjusted annually by CPI + 2%.",
+        "Rates will increase by 7% annually in addition to inflation.",
+        "Fees will increase 3% per year.",
+    ])
+    def test_uncapped_percentage_is_ambiguous(self, text):
+        """Test a percentage that is not a stated ceiling is not reported as a cap"""
+        analysis, remaining = analyze_escalation_clauses(text)
+
+        assert analysis["findings"] == []
+        assert analysis["meta"]["ambiguous_segments"] == 1
+        assert remaining == [text]
+
+    def test_non_annual_frequency_is_ambiguous(self):
+        """Test quarterly escalators are left to the LLM"""
+        analysis, remaining = analyze_escalation_clauses("Rates may increase quarterly by up to 2%.")
+
+        assert analysis["findings"] == []
+        assert len(remaining) == 1
+
+    def test_cap_in_following_clause_is_ambiguous(self):
+        """Test a cap stated in the next sub-clause is not reported as missing"""
+        text = "Rates will be adjusted annually based on CPI.\nSuch adjustment shall not exceed 3%."
+        analysis, remaining = analyze_escalation_clauses(text)
+
+        assert analysis["findings"] == []
+        assert remaining == [text]
+
+    @pytest.mark.parametrize("follow_on", [
+        "Rate increases are capped at 3% per year under CPI-U.",
+        "Fee adjustments may be up to 6% unless agreed.",
+    ])
+    def test_follow_on_paragraph_sent_once(self, follow_on):
+        """Test a sub-clause kept with an ambiguous paragraph is not also evaluated on its own"""
+        text = f"Fees will increase annually.\n{follow_on}\nPayment is due in 30 days."
+        analysis, remaining = analyze_escalation_clauses(text)
+
+        assert analysis["findings"] == []
+        assert analysis["meta"]["ambiguous_segments"] == 1
+        assert remaining == [text]
+
+    def test_follow_on_paragraph_not_duplicated_next_to_findings(self):
+        text = "\n".join([
+            "Annual adjustment equal to CPI-U, capped at three percent (3%).",
+            "Fees will increase annually.",
+            "Fee adjustments may be up to 6% unless agreed.",
+        ])
+        analysis, remaining = analyze_escalation_clauses(text)
+
+        assert len(analysis["findings"]) == 1
+        assert remaining == ["Fees will increase annually.\nFee adjustments may be up to 6% unless agreed."]
+
+    def test_merge_with_llm_analysis(self):
+        """Test rule findings are combined with the LLM verdict"""
+        rule_analysis, _ = analyze_escalation_clauses("Fees will increase annually, not to exceed 3%.")
+        llm_analysis = {
+            "detected": True,
+            "findings": [{"compliance_status": "non_compliant", "original_text": "x"}],
+            "overall_risk": "high",
+            "actions": ["Insert cap"]
+        }
+        merged = merge_rule_and_llm_analysis(rule_analysis, llm_analysis)
+
+        assert len(merged["findings"]) == 2
+        assert merged["overall_risk"] == "high"
+        assert merged["meta"]["engine"] == "rules+llm"
@@ -0,0 +1,193 @@
+"""
+Test cases for the text-extraction backend registry
+"""
+import io
+import zipfile
+from src.app.services.extraction_backends import (
+    DocxXmlBackend, PdfBackend, available_backends, get_backend
+)
+from src.app.services.text_extraction_helpers import extract_document
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+
+def write_docx(path, body_xml, header_xml=None, footer_xml=None):
+    """Write a minimal DOCX with word/document.xml and optional header/footer parts"""
+    document = f'<w:document xmlns:w="{W_NS}"><w:body>{body_xml}</w:body></w:document>'
+    rels = []
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("word/document.xml", document)
+        if header_xml:
+            zf.writestr("word/header1.xml", f'<w:hdr xmlns:w="{W_NS}">{header_xml}</w:hdr>')
+            rels.append(f'<Relationship Id="rId1" Type="{REL_TYPE}/header" Target="header1.xml"/>')
+        if footer_xml:
+            zf.writestr("word/footer1.xml", f'<w:ftr xmlns:w="{W_NS}">{footer_xml}</w:ftr>')
+            rels.append(f'<Relationship Id="rId2" Type="{REL_TYPE}/footer" Target="footer1.xml"/>')
+        if rels:
+            zf.writestr(
+                "word/_rels/document.xml.rels",
+                f'<Relationships xmlns="{REL_NS}">{"".join(rels)}</Relationships>'
+            )
+    return path
+
+
+def para(text):
+    return f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def cell(*paragraphs):
+    return f"<w:tc>{''.join(paragraphs)}</w:tc>"
+
+
+class TestBackendRegistry:
+    """Tests for get_backend and available_backends"""
+
+    def test_configured_backend(self, monkeypatch):
+        """Test TEXT_EXTRACTOR_DOCX selects the backend"""
+        monkeypatch.setenv("TEXT_EXTRACTOR_DOCX", "docx-xml")
+        assert isinstance(get_backend("docx"), DocxXmlBackend)
+
+    def test_unknown_backend_falls_back_to_default(self):
+        """Test an unknown name resolves to the default backend"""
+        assert get_backend("docx", "no-such-extractor").name == "docx-xml"
+
+    def test_docx_xml_always_available(self):
+        """Test the streaming DOCX backend needs no optional dependency"""
+        assert "docx-xml" in available_backends("docx")
+
+
+class HandleTrackingPdfBackend(PdfBackend):
+    """Three-page PDF backend that records opened and closed handles"""
+
+    name = "handle-tracking-pdf"
+
+    def __init__(self):
+        self.opened = []
+        self.closed = []
+
+    def open(self, path):
+        handle = object()
+        self.opened.append(handle)
+        return handle
+
+    def close(self, handle):
+        self.closed.append(handle)
+
+    def _count(self, handle):
+        return 3
+
+    def page_text(self, handle, index):
+        return f"Page {index + 1}"
+
+
+class TestPdfBackend:
+    """Tests for the PdfBackend handle lifecycle"""
+
+    def test_extract_opens_once_and_closes(self):
+        backend = HandleTrackingPdfBackend()
+
+        assert backend.extract("sow.pdf") == "Page 1\nPage 2\nPage 3"
+        assert len(backend.opened) == 1
+        assert backend.closed == backend.opened
+
+    def test_handles_closed(self):
+        """Test page_count and page ranges release their handles, even when stopped early"""
+        backend = HandleTrackingPdfBackend()
+        backend.page_count("sow.pdf")
+        assert list(backend.iter_page_texts("sow.pdf", 1, 3)) == ["Page 2", "Page 3"]
+        pages = backend.iter_page_texts("sow.pdf", 0, 3)
+        next(pages)
+        pages.close()
+
+        assert len(backend.opened) == 3
+        assert backend.closed == backend.opened
+
+
+class TestDocxXmlBackend:
+    """Tests for the streaming document.xml extractor"""
+
+    def test_paragraph_text(self, tmp_path):
+        """Test runs are joined per paragraph, with tabs and breaks preserved"""
+        path = write_docx(
+            tmp_path / "sample.docx",
+            '<w:p><w:r><w:t>Rates may </w:t></w:r><w:r><w:t>increase.</w:t></w:r></w:p>'
+            '<w:p><w:r><w:t>Fee</w:t><w:tab/><w:t>3%</w:t><w:br/><w:t>annually</w:t></w:r></w:p>'
+        )
+        assert DocxXmlBackend().extract(path) == "Rates may increase.\nFee\t3%\nannually"
+
+    def test_tables_headers_and_footers_in_order(self, tmp_path):
+        """Test table rows, headers and footers are emitted around the body in order"""
+        table = (
+            "<w:tbl>"
+            f"<w:tr>{cell(para('Role'))}{cell(para('Rate'))}</w:tr>"
+            f"<w:tr>{cell(para('Engineer'))}{cell(para('$120/hr'), para('+3% annually'))}</w:tr>"
+            "</w:tbl>"
+        )
+        path = write_docx(
+            tmp_path / "sample.docx",
+            para("Rate schedule:") + table + para("End of schedule."),
+            header_xml=para("ACME Corp - Confidential"),
+            footer_xml=para("Page footer")
+        )
+        assert DocxXmlBackend().extract(path).splitlines() == [
+            "ACME Corp - Confidential",
+            "Rate schedule:",
+            "Role | Rate",
+            "Engineer | $120/hr +3% annually",
+            "End of schedule.",
+            "Page footer",
+        ]
+
+    def test_header_parts_in_numeric_order(self, tmp_path):
+        """Test header10.xml is read after header2.xml"""
+        path = tmp_path / "headers.docx"
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("word/document.xml", f'<w:document xmlns:w="{W_NS}"><w:body>{para("Body")}</w:body></w:document>')
+            rels = []
+            for number in (10, 2):
+                zf.writestr(f"word/header{number}.xml", f'<w:hdr xmlns:w="{W_NS}">{para(f"Header {number}")}</w:hdr>')
+                rels.append(f'<Relationship Id="rId{number}" Type="{REL_TYPE}/header" Target="header{number}.xml"/>')
+            zf.writestr("word/_rels/document.xml.rels", f'<Relationships xmlns="{REL_NS}">{"".join(rels)}</Relationships>')
+
+        assert DocxXmlBackend().extract(path).splitlines() == ["Header 2", "Header 10", "Body"]
+
+    def test_nested_table_flattened_into_cell(self, tmp_path):
+        """Test a nested table's rows are kept inside the enclosing cell"""
+        nested = f"<w:tbl><w:tr>{cell(para('Year 2'))}{cell(para('3%'))}</w:tr></w:tbl>"
+        table = f"<w:tbl><w:tr>{cell(para('Escalation'))}{cell(nested)}</w:tr></w:tbl>"
+        path = write_docx(tmp_path / "nested.docx", table)
+
+        assert DocxXmlBackend().extract(path) == "Escalation | Year 2 | 3%"
+
+    def test_heading_styles_and_page_breaks(self, tmp_path):
+        """Test heading levels come from paragraph styles and pages from page breaks"""
+        heading = '<w:p><w:pPr><w:pStyle w:val="Heading2"/></w:pPr><w:r><w:t>Rate Schedule</w:t></w:r></w:p>'
+        page_break = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+        path = write_docx(tmp_path / "styled.docx", para("Intro") + page_break + heading + para("3% cap"))
+
+        blocks = list(DocxXmlBackend().iter_blocks(path))
+        assert blocks[2] == ("Rate Schedule", 2, 2)
+        assert blocks[0] == ("Intro", None, 1)
+
+
+class TestExtractDocument:
+    """Tests for extract_document on in-memory streams"""
+
+    def test_stream_extraction_is_cached(self, tmp_path, monkeypatch):
+        """Test a DOCX stream is extracted without a file path and cached by content hash"""
+        monkeypatch.setenv("EXTRACTION_CACHE_DIR", str(tmp_path / "cache"))
+        path = write_docx(tmp_path / "sow.docx", para("4. Commercial Terms") + para("Rates increase 3% annually."))
+        stream = io.BytesIO(path.read_bytes())
+
+        document = extract_document(stream, suffix=".docx")
+
+        assert document["text"] == "4. Commercial Terms\nRates increase 3% annually."
+        assert document["sections"][0]["title"] == "4. Commercial Terms"
+        assert len(list((tmp_path / "cache").iterdir())) == 1
+        assert extract_document(io.BytesIO(path.read_bytes()), suffix=".docx")["content_hash"] == document["content_hash"]
+
+    def test_stream_requires_supported_suffix(self):
+        """Test streams without a known suffix return an empty document"""
+        assert extract_document(io.BytesIO(b"data"))["text"] == ""
@@ -0,0 +1,110 @@
+"""
+Test cases for combined document access, analysis status and stats queries
+"""
+import asyncio
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+from src.app.services import file_management_service
+from src.app.services.file_management_service import FileManagementService
+
+
+@pytest.fixture
+def db():
+    with patch.object(file_management_service, "db_connection") as db_connection:
+        yield db_connection.return_value.__enter__.return_value
+
+
+class TestAccessibleDocument:
+    """Tests for get_accessible_document / claim_document_for_analysis"""
+
+    def test_row_and_access_in_one_query(self, db):
+        cursor = db.cursor.return_value
+        cursor.fetchone.return_value = {"id": 3, "blob_name": "a.pdf", "can_access": True}
+
+        document = FileManagementService.get_accessible_document(7, "a.pdf")
+
+        assert document == {"id": 3, "blob_name": "a.pdf", "can_access": True}
+        assert cursor.execute.call_count == 1
+        assert cursor.execute.call_args.args[1] == (7, "a.pdf")
+
+    def test_claim_marks_processing(self, db):
+        """Test a granted claim commits the status change and returns the updated row"""
+        cursor = db.cursor.return_value
+        cursor.fetchone.return_value = {"id": 3, "blob_name": "a.pdf", "analysis_status": "processing", "can_access": True}
+
+        document = FileManagementService.claim_document_for_analysis(7, "a.pdf")
+
+        assert document["analysis_status"] == "processing"
+        assert "UPDATE uploaded_documents" in cursor.execute.call_args.args[0]
+        db.commit.assert_called_once()
+
+    def test_claim_denied(self, db):
+        """Test a denied claim reports no access and leaks no columns"""
+        cursor = db.cursor.return_value
+        cursor.fetchone.return_value = {"id": None, "blob_name": None, "can_access": False}
+
+        assert FileManagementService.claim_document_for_analysis(7, "a.pdf") == {"can_access": False}
+
+    def test_claim_missing_document(self, db):
+        db.cursor.return_value.fetchone.return_value = None
+
+        assert FileManagementService.claim_document_for_analysis(7, "missing.pdf") is None
+
+
+class TestCompleteAnalysis:
+    """Tests for complete_analysis"""
+
+    def test_status_and_result_in_one_statement(self, db):
+        cursor = db.cursor.return_value
+        cursor.fetchone.return_value = {"id": 11}
+        analyzed_at = datetime(2025, 1, 2)
+
+        analysis_id = FileManagementService.complete_analysis(3, "a_results.json", 7, analyzed_at, 1500, "partial", "high")
+
+        query, params = cursor.execute.call_args.args
+        assert analysis_id == 11
+        assert cursor.execute.call_count == 1
+        assert "INSERT INTO analysis_results" in query and "UPDATE uploaded_documents" in query
+        assert params == (analyzed_at, 3, "a_results.json", 7, 1500, "partial", "high")
+        db.commit.assert_called_once()
+
+
+class TestDocumentStats:
+    """Tests for get_document_stats_async"""
+
+    def rows(self):
+        return [
+            {"analysis_status": "pending", "document_count": 2, "total_size_bytes": 300},
+            {"analysis_status": "completed", "document_count": 1, "total_size_bytes": 700}
+        ]
+
+    def test_grouped_aggregate(self, monkeypatch):
+        monkeypatch.delenv("DOCUMENT_STATS_ROLLUP", raising=False)
+        with patch.object(file_management_service, "execute_query_async", return_value=self.rows()) as query:
+            stats = asyncio.run(FileManagementService.get_document_stats_async(7))
+
+        assert stats == {"total_documents": 3, "total_size_bytes": 1000, "status_counts": {"pending": 2, "completed": 1}}
+        sql, params = query.call_args.args
+        assert "FROM uploaded_documents" in sql and "GROUP BY" in sql
+        assert params == (7,)
+
+    def test_rollup(self, monkeypatch):
+        """Test all-users stats are read from the rollup table when enabled"""
+        monkeypatch.setenv("DOCUMENT_STATS_ROLLUP", "true")
+        with patch.object(file_management_service, "execute_query_async", return_value=self.rows()) as query:
+            stats = asyncio.run(FileManagementService.get_document_stats_async())
+
+        assert stats["total_documents"] == 3
+        sql, params = query.call_args.args
+        assert "FROM document_stats_rollup" in sql and "uploaded_by" not in sql
+        assert params == ()
+
+    def test_rollup_missing_falls_back(self, monkeypatch):
+        monkeypatch.setenv("DOCUMENT_STATS_ROLLUP", "true")
+        with patch.object(file_management_service, "execute_query_async",
+                          side_effect=[Exception("relation does not exist"), self.rows()]) as query:
+            stats = asyncio.run(FileManagementService.get_document_stats_async(7))
+
+        assert stats["total_size_bytes"] == 1000
+        assert "FROM uploaded_documents" in query.call_args.args[0]
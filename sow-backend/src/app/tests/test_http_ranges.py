@@ -0,0 +1,53 @@
+"""
+Test cases for HTTP Range and If-None-Match handling
+"""
+import pytest
+from src.app.utils.http_ranges import RangeNotSatisfiable, content_range, etag_matches, parse_range_header
+
+
+class TestParseRangeHeader:
+    """Tests for parse_range_header"""
+
+    def test_no_range(self):
+        """Test missing, malformed and multi-range headers serve the whole file"""
+        assert parse_range_header(None, 100) is None
+        assert parse_range_header("items=0-10", 100) is None
+        assert parse_range_header("bytes=0-10,20-30", 100) is None
+
+    def test_ranges(self):
+        """Test closed, open-ended and suffix ranges"""
+        assert parse_range_header("bytes=0-9", 100) == (0, 9)
+        assert parse_range_header("bytes=90-", 100) == (90, 99)
+        assert parse_range_header("bytes=-10", 100) == (90, 99)
+        assert parse_range_header("bytes=-500", 100) == (0, 99)
+        assert parse_range_header("bytes=50-500", 100) == (50, 99)
+
+    def test_unsatisfiable(self):
+        """Test ranges past the end of the file"""
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range_header("bytes=100-", 100)
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range_header("bytes=20-10", 100)
+
+    def test_suffix_of_empty_resource(self):
+        """Test a suffix range on an empty file is unsatisfiable, not bytes 0--1"""
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range_header("bytes=-5", 0)
+
+    def test_content_range(self):
+        assert content_range(0, 9, 100) == "bytes 0-9/100"
+
+
+class TestEtagMatches:
+    """Tests for etag_matches"""
+
+    def test_matches(self):
+        """Test exact, weak, wildcard and list matches"""
+        assert etag_matches('"0x8DB"', '"0x8DB"')
+        assert etag_matches('W/"0x8DB"', '"0x8DB"')
+        assert etag_matches("*", '"0x8DB"')
+        assert etag_matches('"other", "0x8DB"', '"0x8DB"')
+
+    def test_no_match(self):
+        assert not etag_matches('"other"', '"0x8DB"')
+        assert not etag_matches(None, '"0x8DB"')
@@ -0,0 +1,135 @@
+"""
+Test cases for keyset pagination cursors, the document listing and analysis history queries
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+from src.app.utils.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+class TestCursor:
+    """Tests for encode_cursor / decode_cursor"""
+
+    def test_roundtrip(self):
+        """Test values, including datetimes, survive a roundtrip"""
+        values = {"sort": "upload_date", "order": "desc", "value": datetime(2025, 1, 2, 3, 4, 5), "id": 42}
+        cursor = encode_cursor(values)
+
+        assert "=" not in cursor
+        assert decode_cursor(cursor, expect={"sort": "upload_date", "order": "desc"}) == values
+
+    def test_first_page(self):
+        assert decode_cursor(None) is None
+        assert decode_cursor("") is None
+
+    def test_invalid(self):
+        """Test garbage and cursors issued for another ordering are rejected"""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor("not-a-cursor!")
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(encode_cursor({"sort": "upload_date"}), expect={"sort": "file_size_bytes"})
+
+
+class TestListDocuments:
+    """Tests for FileManagementService.list_documents"""
+
+    @pytest.fixture
+    def db(self):
+        from src.app.services import file_management_service
+        with patch.object(file_management_service, "db_connection") as db_connection:
+            yield db_connection.return_value.__enter__.return_value.cursor.return_value
+
+    def rows(self, ids):
+        return [{"id": i, "upload_date": datetime(2025, 1, i), "blob_name": f"{i}.pdf"} for i in ids]
+
+    def test_next_cursor_from_last_row(self, db):
+        """Test one extra row is fetched to detect the next page"""
+        from src.app.services.file_management_service import FileManagementService
+        db.fetchall.return_value = self.rows([9, 8, 7])
+
+        page = FileManagementService.list_documents(limit=2)
+
+        assert [d["id"] for d in page["documents"]] == [9, 8]
+        assert db.execute.call_args.args[1][-1] == 3
+        assert decode_cursor(page["next_cursor"])["id"] == 8
+
+    def test_cursor_continues_after_last_row(self, db):
+        """Test the cursor becomes a row comparison on (sort column, id)"""
+        from src.app.services.file_management_service import FileManagementService
+        db.fetchall.return_value = self.rows([7])
+        cursor = encode_cursor({"sort": "upload_date", "order": "desc", "value": datetime(2025, 1, 8), "id": 8})
+
+        page = FileManagementService.list_documents(limit=2, cursor=cursor, status="completed")
+
+        query, params = db.execute.call_args.args
+        assert "(upload_date, id) < (%s, %s)" in query
+        assert "ORDER BY upload_date desc, id desc" in query
+        assert params == ["completed", datetime(2025, 1, 8), 8, 3]
+        assert page["next_cursor"] is None
+
+    def test_rejects_unknown_sort(self, db):
+        from src.app.services.file_management_service import FileManagementService
+        with pytest.raises(ValueError):
+            FileManagementService.list_documents(sort="id; DROP TABLE users")
+        db.execute.assert_not_called()
+
+
+class TestAnalysisHistory:
+    """Tests for FileManagementService.get_analysis_history_async"""
+
+    @pytest.fixture
+    def query(self):
+        from unittest.mock import AsyncMock
+        from src.app.services import file_management_service
+        with patch.object(file_management_service, "execute_query_async", new_callable=AsyncMock) as execute:
+            yield execute
+
+    def history(self, **kwargs):
+        import asyncio
+        from src.app.services.file_management_service import FileManagementService
+        return asyncio.run(FileManagementService.get_analysis_history_async(**kwargs))
+
+    def row(self, day, kind, row_id):
+        return {"history_date": datetime(2025, 1, day), "history_kind": kind, "history_id": row_id}
+
+    def test_merges_both_branches(self, query):
+        """Test results and unanalysed documents are merged in one query with a cursor from the last row"""
+        query.return_value = [self.row(9, 1, 40), self.row(9, 0, 12), self.row(8, 1, 39)]
+
+        page = self.history(limit=2, uploaded_by=5)
+
+        sql, params = query.call_args.args
+        assert "UNION ALL" in sql
+        assert "ORDER BY history_date DESC, history_kind DESC, history_id DESC" in sql
+        assert params == (5, 3, 5, 3, 3)
+        assert len(page["rows"]) == 2
+        assert decode_cursor(page["next_cursor"]) == {"list": "analysis_history", "date": datetime(2025, 1, 9), "kind": 0, "id": 12}
+
+    def test_cursor_bounds_each_branch(self, query):
+        """Test a cursor on an unanalysed row excludes results from the same date in the analysed branch"""
+        query.return_value = []
+        cursor = encode_cursor({"list": "analysis_history", "date": datetime(2025, 1, 9), "kind": 0, "id": 12})
+
+        page = self.history(limit=2, cursor=cursor)
+
+        sql, params = query.call_args.args
+        assert "(ar.analysis_date, ar.id) < (%s, %s)" in sql
+        assert "(ud.upload_date, ud.id) < (%s, %s)" in sql
+        assert params == (datetime(2025, 1, 9), 0, 3, datetime(2025, 1, 9), 12, 3, 3)
+        assert page["next_cursor"] is None
+
+    def test_risk_filter_skips_unanalysed_branch(self, query):
+        query.return_value = []
+
+        self.history(limit=10, risk="high", status="completed")
+
+        sql, params = query.call_args.args
+        assert "UNION ALL" not in sql
+        assert params == ("completed", "high", 11, 11)
+
+    def test_rejects_bad_input(self, query):
+        with pytest.raises(ValueError):
+            self.history(risk="extreme")
+        with pytest.raises(InvalidCursorError):
+            self.history(cursor=encode_cursor({"sort": "upload_date", "order": "desc", "value": 1, "id": 2}))
+        query.assert_not_called()
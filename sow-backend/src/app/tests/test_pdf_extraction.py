@@ -0,0 +1,122 @@
+"""
+Test cases for parallel PDF page extraction and its deadline
+"""
+import io
+import pytest
+from src.app.services import extraction_backends, text_extraction_helpers
+from src.app.services.extraction_backends import PdfBackend
+from src.app.services.text_extraction_helpers import (
+    extract_document, extract_pdf_pages, extract_text_from_pdf, shutdown_extraction_pool
+)
+
+
+class CountingPdfBackend(PdfBackend):
+    """PDF backend whose 'file' is the page count; page 3 fails to extract"""
+
+    name = "counting-pdf"
+
+    def open(self, path):
+        path.seek(0)
+        return int(path.read())
+
+    def _count(self, handle):
+        return handle
+
+    def page_text(self, handle, index):
+        if index == 2:
+            raise ValueError("bad content stream")
+        return f"Page {index + 1}"
+
+
+def fake_pdf(pages):
+    return io.BytesIO(str(pages).encode())
+
+
+def make_pdf(pages):
+    """Minimal PDF with one line of text per page"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(pages))
+        + b"] /Count %d >>" % pages,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i in range(pages):
+        stream = b"BT /F1 12 Tf 72 720 Td (Page %d) Tj ET" % (i + 1)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i))
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+
+@pytest.fixture
+def inline(monkeypatch):
+    """Inline extraction with the counting backend registered for this test only"""
+    monkeypatch.setitem(extraction_backends._REGISTRY["pdf"], CountingPdfBackend.name, CountingPdfBackend)
+    monkeypatch.setattr(text_extraction_helpers, "PDF_EXTRACT_WORKERS", 0)
+    monkeypatch.setattr(text_extraction_helpers, "PDF_PAGES_PER_TASK", 4)
+
+
+class TestExtractPdfPages:
+    """Tests for extract_pdf_pages"""
+
+    def test_page_ranges_in_order(self, inline):
+        """Test pages are split into PDF_PAGES_PER_TASK ranges and returned in page order"""
+        pages, stats = extract_pdf_pages(fake_pdf(10), backend_name="counting-pdf")
+
+        assert pages == ["Page 1", "Page 2", ""] + [f"Page {i}" for i in range(4, 11)]
+        assert stats["tasks"] == 3
+        assert stats["workers"] == 0
+        assert stats["failed_pages"] == 1
+        assert len(stats["page_ms"]) == 10
+
+    def test_deadline(self, inline, monkeypatch):
+        """Test extraction stops once PDF_EXTRACT_TIMEOUT_SECONDS has passed"""
+        monkeypatch.setattr(text_extraction_helpers, "PDF_EXTRACT_TIMEOUT_SECONDS", 0)
+
+        with pytest.raises(TimeoutError):
+            extract_pdf_pages(fake_pdf(10), backend_name="counting-pdf")
+
+    def test_timeout_not_reported_as_empty(self, inline, monkeypatch):
+        """Test a timed-out PDF raises instead of looking like an empty document"""
+        monkeypatch.setattr(text_extraction_helpers, "PDF_EXTRACT_TIMEOUT_SECONDS", 0)
+        monkeypatch.setenv("TEXT_EXTRACTOR_PDF", "counting-pdf")
+        monkeypatch.setattr(text_extraction_helpers.ExtractionCache, "get", lambda *args: None)
+
+        with pytest.raises(TimeoutError):
+            extract_text_from_pdf(fake_pdf(10))
+        with pytest.raises(TimeoutError):
+            extract_document(fake_pdf(10), suffix=".pdf")
+
+
+class TestExtractionPool:
+    """Tests for extraction in the worker process pool"""
+
+    @pytest.fixture
+    def pool(self, monkeypatch):
+        pytest.importorskip("PyPDF2")
+        shutdown_extraction_pool()
+        monkeypatch.setattr(text_extraction_helpers, "PDF_EXTRACT_WORKERS", 2)
+        monkeypatch.setattr(text_extraction_helpers, "PDF_PAGES_PER_TASK", 2)
+        yield
+        shutdown_extraction_pool()
+
+    def test_pages_extracted_in_workers(self, pool, tmp_path):
+        path = tmp_path / "sow.pdf"
+        path.write_bytes(make_pdf(5))
+
+        pages, stats = extract_pdf_pages(path, backend_name="pypdf2")
+
+        assert [p.strip() for p in pages] == [f"Page {i}" for i in range(1, 6)]
+        assert stats["tasks"] == 3
+        assert stats["workers"] == 2
+        assert stats["failed_pages"] == 0
@@ -0,0 +1,68 @@
+"""
+Test cases for upload-time document pre-processing
+"""
+import io
+import zipfile
+from unittest.mock import patch
+from src.app.services import preprocessing_service
+from src.app.services.preprocessing_service import preprocess_document, summarize_document
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def docx_bytes(*paragraphs):
+    """Minimal DOCX containing the given paragraphs"""
+    body = "".join(f"<w:p><w:r><w:t>{p}</w:t></w:r></w:p>" for p in paragraphs)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr("word/document.xml", f'<w:document xmlns:w="{W_NS}"><w:body>{body}</w:body></w:document>')
+    return buffer.getvalue()
+
+
+class TestPreprocessDocument:
+    """Tests for preprocess_document"""
+
+    @patch('src.app.services.preprocessing_service.FileManagementService')
+    def test_ready_with_summary(self, mock_files, tmp_path, monkeypatch):
+        """Test uploaded bytes are extracted and the record marked ready"""
+        monkeypatch.setenv("EXTRACTION_CACHE_DIR", str(tmp_path))
+        content = docx_bytes("5. Rate Revision Clause", "Rates may be adjusted annually by CPI.")
+
+        summary = preprocess_document("uploads/sow.docx", content)
+
+        assert summary["sections"] == 1
+        assert summary["pricing_sections"] == ["5. Rate Revision Clause"]
+        assert summary["escalation_hits"] >= 1
+        statuses = [c.args[1] for c in mock_files.update_preprocessing_status.call_args_list]
+        assert statuses == ["processing", "ready"]
+        assert len(mock_files.update_preprocessing_status.call_args.kwargs["content_hash"]) == 64
+
+    @patch('src.app.services.preprocessing_service.FileManagementService')
+    def test_failed_when_no_text(self, mock_files, tmp_path, monkeypatch):
+        """Test documents without text are marked failed"""
+        monkeypatch.setenv("EXTRACTION_CACHE_DIR", str(tmp_path))
+
+        assert preprocess_document("uploads/empty.docx", docx_bytes()) is None
+        assert mock_files.update_preprocessing_status.call_args.args[1] == "failed"
+
+    @patch('src.app.services.preprocessing_service.FileManagementService')
+    def test_large_pdf_not_extracted(self, mock_files, monkeypatch):
+        """Test PDFs analysed window by window only record their page count"""
+        pages = preprocessing_service.PDF_WINDOWED_MIN_PAGES + 1
+        monkeypatch.setattr(preprocessing_service, "pdf_page_count", lambda stream: pages)
+        monkeypatch.setattr(preprocessing_service, "extract_document", None)
+
+        summary = preprocess_document("uploads/large.pdf", b"%PDF-1.7")
+
+        assert summary == {"pages": pages, "windowed": True}
+        assert mock_files.update_preprocessing_status.call_args.args[1] == "ready"
+
+
+class TestSummarizeDocument:
+    """Tests for summarize_document"""
+
+    def test_counts_trigger_hits(self):
+        """Test the pre-scan trigger count matches the analysis pre-scan"""
+        summary = summarize_document({"text": "CPI escalation and warranty", "sections": [], "page_offsets": []})
+        assert summary["trigger_hits"] == 3
+        assert summary["pages"] is None
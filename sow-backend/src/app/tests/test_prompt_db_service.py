@@ -0,0 +1,72 @@
+"""
+Test cases for database prompt loading and template compilation
+"""
+import pytest
+from unittest.mock import patch
+from src.app.core.hybrid_cache import InProcessCache
+from src.app.services import prompt_db_service
+from src.app.services.prompt_db_service import CompiledPrompt, PromptDatabaseService, invalidate_prompt_cache
+
+
+class TestCompiledPrompt:
+    """Tests for CompiledPrompt"""
+
+    def test_substitutes_all_variables(self):
+        prompt = CompiledPrompt("ADM-E01", "Rate audit", "Cap > {{max_cap}}%, prefer {{preferred_cap}}% ({{max_cap}})",
+                                {"max_cap": "5", "preferred_cap": "3.5"})
+
+        assert prompt.text == "Cap > 5%, prefer 3.5% (5)"
+
+    def test_unknown_placeholder_kept(self):
+        prompt = CompiledPrompt("ADM-E01", "Rate audit", "Cap {{max_cap}} in {{focus_sections}}", {"max_cap": "5"})
+
+        assert prompt.text == "Cap 5 in {{focus_sections}}"
+
+    def test_values_not_rescanned(self):
+        """Test a value containing a placeholder is inserted literally"""
+        prompt = CompiledPrompt("ADM-E01", "Rate audit", "{{examples}}", {"examples": "{{max_cap}}", "max_cap": "5"})
+
+        assert prompt.text == "{{max_cap}}"
+
+
+class TestLoadCompiledPrompts:
+    """Tests for PromptDatabaseService.load_compiled_prompts"""
+
+    @pytest.fixture
+    def db(self):
+        invalidate_prompt_cache()
+        with patch.object(prompt_db_service, "db_connection") as db_connection:
+            yield db_connection.return_value.__enter__.return_value.cursor.return_value
+        invalidate_prompt_cache()
+
+    def rows(self):
+        return [
+            {"id": 1, "clause_id": "ADM-E01", "name": "Rate audit", "prompt_text": "Cap {{max_cap}}", "variables": {"max_cap": "5"}},
+            {"id": 2, "clause_id": "ADM-E04", "name": "Warranty", "prompt_text": "No variables", "variables": {}}
+        ]
+
+    def test_single_query_then_cached(self, db):
+        """Test templates and variables come from one query and repeat loads hit the cache"""
+        db.fetchall.return_value = self.rows()
+        service = PromptDatabaseService()
+
+        assert service.fetch_all_active_prompts() == {"ADM-E01": "Cap 5", "ADM-E04": "No variables"}
+        assert service.fetch_prompt_by_clause_id("ADM-E01") == "Cap 5"
+        assert db.execute.call_count == 1
+        assert "json_object_agg" in db.execute.call_args.args[0]
+
+    def test_invalidated_after_write(self, db):
+        db.fetchall.return_value = self.rows()
+        service = PromptDatabaseService()
+        service.fetch_all_active_prompts()
+
+        invalidate_prompt_cache()
+        service.fetch_all_active_prompts()
+
+        assert db.execute.call_count == 2
+
+    def test_errors_not_cached(self, db):
+        db.execute.side_effect = Exception("connection refused")
+
+        assert PromptDatabaseService().fetch_all_active_prompts() == {}
+        assert InProcessCache.get(prompt_db_service.ACTIVE_PROMPTS_CACHE_KEY, category="prompts") is None
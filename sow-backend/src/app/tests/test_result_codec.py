@@ -0,0 +1,31 @@
+"""
+Test cases for analysis result encoding
+"""
+import json
+from src.app.utils.result_codec import decode_result, encode_result
+
+
+class TestResultCodec:
+    """Tests for encode_result / decode_result"""
+
+    def test_gzip_round_trip(self):
+        """Test compressed results decode to the original data"""
+        data = {"blob_name": "a.docx", "results": {"ADM-E01": {"findings": [{"reason": "Cap exceeds 5% – é"}]}}}
+        payload, encoding = encode_result(data, encoding="gzip")
+
+        assert encoding == "gzip"
+        assert payload[:2] == b"\x1f\x8b"
+        assert decode_result(payload) == data
+
+    def test_compact_uncompressed(self):
+        """Test uncompressed results are written without indentation"""
+        payload, encoding = encode_result({"a": [1, 2]}, encoding="identity")
+
+        assert encoding is None
+        assert payload == b'{"a":[1,2]}'
+
+    def test_decode_legacy_pretty_json(self):
+        """Test results stored before compression are still readable"""
+        legacy = json.dumps({"status": "success"}, indent=2).encode("utf-8")
+
+        assert decode_result(legacy) == {"status": "success"}
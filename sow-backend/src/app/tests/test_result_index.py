@@ -0,0 +1,78 @@
+"""
+Test cases for the local result artifact index
+"""
+import time
+import pytest
+from src.app.services.result_index import ResultIndex
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    monkeypatch.delenv("RESULT_INDEX_RETENTION_DAYS", raising=False)
+    monkeypatch.delenv("RESULT_INDEX_MAX_ENTRIES", raising=False)
+    monkeypatch.setenv("RESULT_INDEX_COMPACT_EVERY", "1")
+    return ResultIndex(tmp_path)
+
+
+def write(index, name, age_days=0):
+    path = index.output_dir / name
+    path.write_text("{}", encoding="utf-8")
+    index.record(path)
+    if age_days:
+        created_at = time.time() - age_days * 86400
+        conn = index._connect()
+        conn.execute("UPDATE artifacts SET created_at = ? WHERE file_name = ?", (created_at, name))
+        conn.commit()
+        conn.close()
+    return path
+
+
+class TestResultIndex:
+    """Tests for ResultIndex record / latest / compact"""
+
+    def test_latest_result(self, index):
+        write(index, "a__ADM-E01.json", age_days=2)
+        newest = write(index, "a__ADM-E04.json", age_days=1)
+        write(index, "b__ADM-E01.json", age_days=3)
+        write(index, "c__ADM-E01__raw.txt")
+
+        assert index.latest() == newest
+        assert index.latest("b.pdf") == index.output_dir / "b__ADM-E01.json"
+        assert index.latest("missing.pdf") is None
+
+    def test_latest_skips_removed_files(self, index):
+        older = write(index, "a__ADM-E01.json", age_days=2)
+        write(index, "a__ADM-E04.json", age_days=1).unlink()
+
+        assert index.latest("a.pdf") == older
+
+    def test_existing_artifacts_indexed(self, tmp_path):
+        """Test files written before the index existed are found"""
+        (tmp_path / "old__ADM-E01.json").write_text("{}", encoding="utf-8")
+
+        assert ResultIndex(tmp_path).latest() == tmp_path / "old__ADM-E01.json"
+
+    def test_no_retention_by_default(self, index):
+        """Test nothing is deleted unless a retention policy is configured"""
+        old = write(index, "a__ADM-E01.json", age_days=400)
+        write(index, "b__ADM-E01.json")
+
+        assert index.compact() == 0
+        assert old.exists()
+
+    def test_retention_days(self, index, monkeypatch):
+        old = write(index, "a__ADM-E01.json", age_days=40)
+        recent = write(index, "b__ADM-E01.json", age_days=1)
+        monkeypatch.setenv("RESULT_INDEX_RETENTION_DAYS", "30")
+
+        assert ResultIndex(index.output_dir).compact() == 1
+        assert not old.exists() and recent.exists()
+
+    def test_max_entries_on_record(self, index, monkeypatch):
+        """Test the newest RESULT_INDEX_MAX_ENTRIES artifacts are kept as records are written"""
+        monkeypatch.setenv("RESULT_INDEX_MAX_ENTRIES", "2")
+        index = ResultIndex(index.output_dir)
+        paths = [write(index, f"{name}__ADM-E01.json", age_days=age) for name, age in (("a", 3), ("b", 2))]
+        paths.append(write(index, "c__ADM-E01.json"))
+
+        assert [p.exists() for p in paths] == [False, True, True]
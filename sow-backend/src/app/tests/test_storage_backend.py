@@ -0,0 +1,167 @@
+"""
+Test cases for the pluggable storage backend and its local-disk implementation
+"""
+import asyncio
+import hashlib
+import io
+import pytest
+from unittest.mock import patch
+from azure.core.exceptions import ResourceNotFoundError
+from src.app.services import azure_blob_service, storage_backend
+from src.app.services.storage_backend import (
+    AsyncLocalStorage, LocalStorageBackend, UploadTooLargeError, get_async_storage, get_storage
+)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """LocalStorageBackend rooted in a temp directory, with PDF state patched out"""
+    with patch("src.app.services.file_management_service.FileManagementService") as files:
+        files.get_analysis_pdf_state.return_value = None
+        backend = LocalStorageBackend(root=str(tmp_path))
+        backend.files = files
+        yield backend
+
+
+class TestLocalStorageBackend:
+    """Tests for LocalStorageBackend"""
+
+    def test_upload_download_roundtrip(self, storage):
+        """Test an uploaded SOW can be read back, streamed, listed and described"""
+        info = storage.upload_sow(b"sow content", "SOW A.docx", "application/msword")
+
+        assert storage.download_sow(info["blob_name"]) == b"sow content"
+        with storage.download_sow_stream(info["blob_name"]) as stream:
+            assert stream.read() == b"sow content"
+        assert [s["blob_name"] for s in storage.list_sows()] == [info["blob_name"]]
+
+        metadata = storage.get_blob_metadata(info["blob_name"])
+        assert metadata["size"] == 11
+        assert metadata["content_type"] == "application/msword"
+        assert metadata["metadata"]["original_filename"] == "SOW A.docx"
+
+    def test_sharded_layout(self, storage, tmp_path):
+        """Test objects are stored two directories below their container with no temp files left over"""
+        info = storage.upload_sow(b"x", "a/b.pdf")
+        path = storage._path("sow-uploads", info["blob_name"])
+
+        assert path.exists()
+        assert path.relative_to(tmp_path).parts[0] == "sow-uploads"
+        assert len(path.relative_to(tmp_path).parts) == 4
+        assert not [p for p in tmp_path.rglob(".tmp-*")]
+
+    def test_delete(self, storage):
+        info = storage.upload_sow(b"x", "sow.pdf")
+        assert storage.delete_sow(info["blob_name"]) is True
+        assert storage.list_sows() == []
+        with pytest.raises(FileNotFoundError):
+            storage.download_sow(info["blob_name"])
+
+    def test_metadata_matches_azure_backend(self, storage, monkeypatch):
+        """Test GET /sows/{blob_name} returns the same keys whichever backend is configured"""
+        info = storage.upload_sow(b"x", "sow.pdf", "application/pdf")
+        monkeypatch.setenv("AZURE_STORAGE_CONNECTION_STRING", "UseDevelopmentStorage=true")
+        with patch.object(azure_blob_service, "BlobServiceClient") as client_cls:
+            properties = client_cls.from_connection_string.return_value.get_blob_client.return_value.get_blob_properties.return_value
+            properties.size = 1
+            properties.metadata = {}
+            azure_metadata = azure_blob_service.AzureBlobService().get_blob_metadata(info["blob_name"])
+
+        local_metadata = storage.get_blob_metadata(info["blob_name"])
+        assert local_metadata.keys() == azure_metadata.keys()
+        assert local_metadata["blob_name"] == azure_metadata["blob_name"] == info["blob_name"]
+
+    def test_delete_missing(self, storage):
+        """Test deleting a missing SOW raises the Azure backend's not-found error"""
+        with pytest.raises(ResourceNotFoundError):
+            storage.delete_sow("missing.pdf")
+
+    def test_long_non_ascii_name(self, storage):
+        """Test blob names longer than a file name limit are stored and listed"""
+        info = storage.upload_sow(b"x", "合同" * 40 + ".docx")
+
+        assert storage.download_sow(info["blob_name"]) == b"x"
+        assert [s["blob_name"] for s in storage.list_sows()] == [info["blob_name"]]
+
+    def test_analysis_result(self, storage):
+        """Test results are returned in the same shape as the Azure backend"""
+        stored = storage.store_analysis_result("20250101_sow.docx", {"prompts_processed": 3})
+        result = storage.get_analysis_result(stored["result_blob_name"])
+
+        assert result["data"] == {"prompts_processed": 3}
+        assert result["etag"]
+        assert result["metadata"]["result_blob_name"] == stored["result_blob_name"]
+        assert storage.get_analysis_result("missing.json") is None
+
+    def test_pdf(self, storage):
+        """Test storing a PDF records its state and serves its properties"""
+        stored = storage.store_analysis_pdf("sow__analysis__1.json", io.BytesIO(b"%PDF-1.4"))
+
+        storage.files.record_analysis_pdf.assert_called_once_with(
+            "sow__analysis__1.json", "sow__analysis__1.pdf", 8, stored["etag"]
+        )
+        assert storage.pdf_exists("sow__analysis__1.json") is True
+        assert storage.get_pdf_properties("sow__analysis__1.json").size == 8
+        assert storage.get_pdf_properties("other__analysis__1.json") is None
+
+
+class TestAsyncLocalStorage:
+    """Tests for the async facade over the local backend"""
+
+    def test_stream_upload(self, storage, monkeypatch):
+        """Test streamed uploads are hashed, committed and leave no staging files"""
+        monkeypatch.setenv("UPLOAD_CHUNK_BYTES", "4")
+        data = b"0123456789"
+        result = asyncio.run(AsyncLocalStorage(storage).upload_sow_stream(FakeUpload(data), "sow.pdf"))
+
+        assert result["content_hash"] == hashlib.sha256(data).hexdigest()
+        assert storage.download_sow(result["blob_name"]) == data
+        assert list((storage.root / ".staging").iterdir()) == []
+
+    def test_stream_upload_over_limit(self, storage, monkeypatch):
+        monkeypatch.setenv("UPLOAD_CHUNK_BYTES", "4")
+        monkeypatch.setenv("MAX_UPLOAD_BYTES", "6")
+        with pytest.raises(UploadTooLargeError):
+            asyncio.run(AsyncLocalStorage(storage).upload_sow_stream(FakeUpload(b"x" * 100), "big.pdf"))
+
+        assert storage.list_sows() == []
+        assert list((storage.root / ".staging").iterdir()) == []
+
+    def test_stream_pdf_range(self, storage, monkeypatch):
+        """Test byte ranges are streamed in chunks"""
+        monkeypatch.setenv("UPLOAD_CHUNK_BYTES", "3")
+        storage.store_analysis_pdf("sow__analysis__1.json", io.BytesIO(b"0123456789"))
+
+        async def collect():
+            stream = AsyncLocalStorage(storage).stream_pdf("sow__analysis__1.json", offset=2, length=5)
+            return [chunk async for chunk in stream]
+
+        assert asyncio.run(collect()) == [b"234", b"56"]
+
+
+class TestGetStorage:
+    """Tests for backend selection"""
+
+    def test_local_selected_by_config(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("STORAGE_BACKEND", "local")
+        monkeypatch.setenv("LOCAL_STORAGE_DIR", str(tmp_path))
+        monkeypatch.setattr(storage_backend, "_storage", None)
+        monkeypatch.setattr(storage_backend, "_async_storage", None)
+
+        backend = get_storage()
+        assert isinstance(backend, LocalStorageBackend)
+        assert backend is get_storage()
+        assert get_async_storage().backend is backend
+
+        asyncio.run(storage_backend.close_storage())
+        assert storage_backend._storage is None
+
+
+class FakeUpload:
+    """Minimal UploadFile stand-in with an async read(size)"""
+
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+
+    async def read(self, size=-1):
+        return self.stream.read(size)
@@ -0,0 +1,129 @@
+"""
+Test cases for windowed extraction and analysis of large PDFs
+"""
+import io
+import time
+import pytest
+from src.app.services import extraction_backends, text_extraction_helpers
+from src.app.services.extraction_backends import PdfBackend
+from src.app.services.fallback_chunking import windowed_chunk_and_call
+from src.app.services.text_extraction_helpers import DocumentTooLargeError, iter_pdf_text_windows
+
+
+class FakePdfBackend(PdfBackend):
+    """PDF backend whose 'file' is the page count, one line of text per page"""
+
+    name = "fake-pdf"
+
+    def open(self, path):
+        path.seek(0)
+        return int(path.read())
+
+    def _count(self, handle):
+        return handle
+
+    def page_text(self, handle, index):
+        if index == 4:
+            return "5. Rate Revision\nRates may be adjusted annually by CPI."
+        return f"Page {index + 1} text"
+
+
+def fake_pdf(pages):
+    return io.BytesIO(str(pages).encode())
+
+
+@pytest.fixture(autouse=True)
+def inline_extraction(monkeypatch):
+    """Extract inline with the fake backend registered for this test only"""
+    monkeypatch.setitem(extraction_backends._REGISTRY["pdf"], FakePdfBackend.name, FakePdfBackend)
+    monkeypatch.setattr(text_extraction_helpers, "PDF_EXTRACT_WORKERS", 0)
+
+
+class TestIterPdfTextWindows:
+    """Tests for iter_pdf_text_windows"""
+
+    def test_windows_cover_all_pages(self):
+        """Test windows have absolute page ranges and page offsets"""
+        windows = list(iter_pdf_text_windows(fake_pdf(12), window_pages=5, backend_name="fake-pdf"))
+
+        assert [(w["start_page"], w["end_page"]) for w in windows] == [(1, 5), (6, 10), (11, 12)]
+        assert windows[0]["sections"][0]["title"] == "5. Rate Revision"
+        assert windows[0]["sections"][0]["page"] == 5
+        assert windows[1]["text"].startswith("Page 6 text")
+        assert not any(w["truncated"] for w in windows)
+
+    def test_character_budget_stops_extraction(self):
+        """Test extraction stops and marks the window truncated at max_chars"""
+        windows = list(iter_pdf_text_windows(fake_pdf(100), window_pages=2, max_chars=30, backend_name="fake-pdf"))
+
+        assert len(windows) == 2
+        assert windows[-1]["truncated"] is True
+        assert sum(len(w["text"].replace("\n", "")) for w in windows) == 30
+
+    def test_page_limit(self, monkeypatch):
+        """Test documents over PDF_MAX_PAGES are rejected before extraction"""
+        monkeypatch.setattr(text_extraction_helpers, "PDF_MAX_PAGES", 10)
+        with pytest.raises(DocumentTooLargeError):
+            next(iter_pdf_text_windows(fake_pdf(11), backend_name="fake-pdf"))
+
+
+    def test_timeout_spans_windows(self, monkeypatch):
+        """Test PDF_EXTRACT_TIMEOUT_SECONDS covers all windows together, not each window"""
+        page_text = FakePdfBackend.page_text
+
+        def slow_page_text(self, handle, index):
+            time.sleep(0.02)
+            return page_text(self, handle, index)
+
+        monkeypatch.setattr(FakePdfBackend, "page_text", slow_page_text)
+        monkeypatch.setattr(text_extraction_helpers, "PDF_EXTRACT_TIMEOUT_SECONDS", 0.1)
+        windows = iter_pdf_text_windows(fake_pdf(20), window_pages=2, backend_name="fake-pdf")
+
+        with pytest.raises(TimeoutError):
+            for _ in windows:
+                pass
+
+class TestWindowedChunkAndCall:
+    """Tests for windowed_chunk_and_call"""
+
+    def test_aggregates_per_prompt(self):
+        """Test every prompt sees every window, findings keep their source page and actions are deduplicated"""
+        calls = []
+
+        def analyze_chunk(prompt_name, system_prompt, chunk):
+            calls.append(prompt_name)
+            if prompt_name == "ADM-E01" and "CPI" in chunk:
+                return {
+                    "detected": True,
+                    "overall_risk": "medium",
+                    "findings": [{"original_text": "Rates may be adjusted annually by CPI."}],
+                    "actions": ["Insert cap", "Clarify CPI index"]
+                }
+            if prompt_name == "ADM-W01":
+                return {
+                    "detected": True,
+                    "overall_risk": "low",
+                    "findings": [{"original_text": "Warranty of 90 days."}],
+                    "actions": ["Extend warranty"]
+                }
+            return {"detected": False, "overall_risk": "none", "findings": []}
+
+        windows = iter_pdf_text_windows(fake_pdf(12), window_pages=5, backend_name="fake-pdf")
+        results = windowed_chunk_and_call({"ADM-E01": "escalation", "ADM-W01": "warranty"}, windows, analyze_chunk)
+
+        assert calls.count("ADM-E01") == calls.count("ADM-W01") == 3
+        escalation = results["ADM-E01"]
+        assert escalation["detected"] is True
+        assert escalation["overall_risk"] == "medium"
+        assert escalation["findings"][0]["page"] == 5
+        assert escalation["meta"]["windows"] == 3
+        assert escalation["actions"] == ["Insert cap", "Clarify CPI index"]
+        assert results["ADM-W01"]["actions"] == ["Extend warranty"]
+
+    def test_failed_chunks_are_skipped(self):
+        """Test chunks the callable could not analyse are left out of the aggregate"""
+        windows = iter_pdf_text_windows(fake_pdf(4), backend_name="fake-pdf")
+        results = windowed_chunk_and_call({"ADM-E01": "escalation"}, windows, lambda *args: None)
+
+        assert results["ADM-E01"]["meta"]["chunks"] == 0
+        assert results["ADM-E01"]["overall_risk"] == "none"
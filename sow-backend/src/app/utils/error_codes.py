@@ -24,6 +24,7 @@ class ErrorCode:
     DOC02 = "DOC02"  # Text extraction failed
     DOC03 = "DOC03"  # Empty document
     DOC04 = "DOC04"  # Corrupted document
+    DOC05 = "DOC05"  # Document exceeds size limits
     
     # Database errors (DB prefix)
     DB01 = "DB01"  # Database connection failure
@@ -54,6 +55,7 @@ ERROR_MESSAGES = {
     ErrorCode.DOC02: "Failed to extract text from document",
     ErrorCode.DOC03: "Document is empty or contains no text",
     ErrorCode.DOC04: "Document appears to be corrupted",
+    ErrorCode.DOC05: "Document exceeds the configured size limits",
     
     ErrorCode.DB01: "Database connection failed",
     ErrorCode.DB02: "Failed to execute database query",
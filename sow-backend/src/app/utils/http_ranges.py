@@ -0,0 +1,72 @@
+"""
+HTTP Range and conditional request helpers for streamed downloads
+"""
+import re
+from typing import Optional, Tuple
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(ValueError):
+    """Range header does not overlap the resource"""
+
+
+def parse_range_header(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header
+
+    Args:
+        header: Range header value, e.g. "bytes=0-1023", "bytes=1024-" or "bytes=-500"
+        size: Resource size in bytes
+
+    Returns:
+        Inclusive (start, end) byte positions, or None to serve the whole resource
+        (no header, a malformed header or a multi-range request)
+
+    Raises:
+        RangeNotSatisfiable: The range starts beyond the end of the resource, or
+            asks for a suffix of an empty one
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(size - length, 0), size - 1
+
+    first = int(start)
+    last = int(end) if end else size - 1
+    if first >= size or (end and last < first):
+        raise RangeNotSatisfiable(header)
+    return first, min(last, size - 1)
+
+
+def content_range(start: int, end: int, size: int) -> str:
+    return f"bytes {start}-{end}/{size}"
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """
+    True if an If-None-Match header matches the ETag (weak comparison, as RFC 9110 requires)
+    """
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        return tag.strip('"')
+
+    return any(opaque(candidate) == opaque(etag) for candidate in if_none_match.split(","))
@@ -0,0 +1,59 @@
+"""
+Opaque cursors for keyset-paginated listings
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class InvalidCursorError(ValueError):
+    """Cursor is malformed or was issued for a different sort"""
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """
+    Encode the keyset position of the last row on a page
+
+    Datetimes are stored as ISO strings and restored by decode_cursor.
+    """
+    def default(value):
+        if isinstance(value, datetime):
+            return {"$dt": value.isoformat()}
+        raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+    raw = json.dumps(values, default=default, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], expect: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Decode a cursor from encode_cursor
+
+    Args:
+        cursor: Cursor string from a previous page, or None for the first page
+        expect: Keys that must match (e.g. {"sort": "upload_date", "order": "desc"}),
+            so a cursor cannot be replayed against a different ordering
+
+    Raises:
+        InvalidCursorError: The cursor cannot be decoded or does not match expect
+    """
+    if not cursor:
+        return None
+
+    def object_hook(obj):
+        if set(obj) == {"$dt"}:
+            return datetime.fromisoformat(obj["$dt"])
+        return obj
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw, object_hook=object_hook)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+    if not isinstance(values, dict):
+        raise InvalidCursorError("Invalid cursor")
+    for key, expected in (expect or {}).items():
+        if values.get(key) != expected:
+            raise InvalidCursorError(f"Cursor does not match {key}={expected}")
+    return values
@@ -0,0 +1,78 @@
+"""
+Compact, compressed encoding for analysis result JSON
+"""
+import gzip
+import json
+import logging
+import os
+from typing import Any, Optional, Tuple
+
+try:
+    import zstandard
+except Exception:
+    zstandard = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def get_result_encoding() -> Optional[str]:
+    """
+    Content-Encoding used for stored analysis results (RESULT_COMPRESSION: gzip, zstd or none)
+    """
+    encoding = os.getenv("RESULT_COMPRESSION", "gzip").lower()
+    if encoding in ("none", "identity", ""):
+        return None
+    if encoding == "zstd" and zstandard is None:
+        logging.warning("RESULT_COMPRESSION=zstd but zstandard is not installed; using gzip")
+        return "gzip"
+    if encoding not in ("gzip", "zstd"):
+        logging.warning(f"Unknown RESULT_COMPRESSION '{encoding}'; using gzip")
+        return "gzip"
+    return encoding
+
+
+def dumps_compact(data: Any) -> str:
+    """Serialize to JSON without indentation or padding"""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def encode_result(data: Any, encoding: Optional[str] = None) -> Tuple[bytes, Optional[str]]:
+    """
+    Encode an analysis result as compact, optionally compressed JSON
+
+    Args:
+        data: JSON-serializable result
+        encoding: gzip, zstd or identity; defaults to RESULT_COMPRESSION
+
+    Returns:
+        Tuple of (payload bytes, content encoding or None)
+    """
+    if encoding is None:
+        encoding = get_result_encoding()
+    elif encoding == "identity":
+        encoding = None
+
+    raw = dumps_compact(data).encode("utf-8")
+    if encoding == "gzip":
+        return gzip.compress(raw, compresslevel=6, mtime=0), "gzip"
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=6).compress(raw), "zstd"
+    return raw, None
+
+
+def decode_result(payload: bytes) -> Any:
+    """
+    Decode a stored analysis result
+
+    The compression is detected from the payload's magic bytes, so results written
+    before compression was introduced, and bodies already decompressed by the HTTP
+    transport, are read the same way.
+    """
+    if payload[:2] == GZIP_MAGIC:
+        payload = gzip.decompress(payload)
+    elif payload[:4] == ZSTD_MAGIC:
+        if zstandard is None:
+            raise RuntimeError("Result is zstd-compressed but zstandard is not installed")
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    return json.loads(payload.decode("utf-8"))
@@ -21,15 +21,25 @@ if db_url:
     safe_url = db_url.split('@')[1] if '@' in db_url else 'configured'
     print(f"Database host: ...@{safe_url}")
 
+from src.app.db.async_client import close_async_db_pool
 from src.app.services.prompt_service import get_all_prompts
+import asyncio
 import json
 
+
+async def fetch_prompts():
+    """get_all_prompts() is async; close the async pool before the event loop ends"""
+    try:
+        return await get_all_prompts()
+    finally:
+        await close_async_db_pool()
+
 print("=" * 60)
 print("Testing get_all_prompts()")
 print("=" * 60)
 
 try:
-    prompts = get_all_prompts()
+    prompts = asyncio.run(fetch_prompts())
     
     print(f"\n✅ Successfully fetched prompts")
     print(f"📊 Type: {type(prompts)}")